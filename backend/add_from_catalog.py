@@ -12,40 +12,22 @@ sys.path.insert(0, os.path.dirname(__file__))
 
 from opera_catalog_browser import OperaCatalogBrowser
 from database import save_embed
-import requests
+from tmdb_client import search_movie
 import time
 
-# TMDB API Key
-TMDB_API_KEY = "909fc389a150847bdd4ffcd92809cff7"
-
 
 def search_tmdb(title):
-    """Busca filme no TMDB pelo título"""
-    try:
-        url = "https://api.themoviedb.org/3/search/movie"
-        params = {
-            "api_key": TMDB_API_KEY,
-            "query": title,
-            "language": "pt-BR",
-            "page": 1,
+    """Busca filme no TMDB pelo título (cache + rate limit em tmdb_client)"""
+    movie = search_movie(title)
+    if movie:
+        return {
+            "id": str(movie["id"]),
+            "title": movie["title"],
+            "poster_path": movie.get("poster_path"),
+            "backdrop_path": movie.get("backdrop_path"),
+            "overview": movie.get("overview"),
+            "release_date": movie.get("release_date", ""),
         }
-
-        response = requests.get(url, params=params, timeout=10)
-        data = response.json()
-
-        if data.get("results") and len(data["results"]) > 0:
-            movie = data["results"][0]
-            return {
-                "id": str(movie["id"]),
-                "title": movie["title"],
-                "poster_path": movie.get("poster_path"),
-                "backdrop_path": movie.get("backdrop_path"),
-                "overview": movie.get("overview"),
-                "release_date": movie.get("release_date", ""),
-            }
-    except Exception as e:
-        print(f"   ⚠️  Erro TMDB: {e}")
-
     return None
 
 
@@ -1,8 +1,10 @@
-from flask import Flask, request, jsonify
+
+from flask import Flask, Response, abort, request, jsonify, stream_with_context
 from flask_cors import CORS
 import logging
 import os
 import threading
+import time
 from datetime import datetime, timedelta
 from functools import wraps
 
@@ -15,15 +17,13 @@ from database import (
     init_users_table,
     get_cached_embed,
     get_cached_embed_by_id,
-    save_embed,
     get_cache_count,
     get_cached_ids,
     get_cached_statuses,
-    get_catalog_movies,
-    get_catalog_series,
-    get_series_seasons,
-    get_season_episodes,
-    get_series_by_id,
+    get_catalog_movies_page,
+    iter_catalog_movies,
+    get_catalog_series_page,
+    get_series_with_seasons,
     get_series_count,
     create_user,
     get_user_by_username,
@@ -40,9 +40,16 @@ from database import (
     is_in_my_list_series,
     search_movies_locally,
     search_series_locally,
+    get_scrape_failure,
+    scrape_failure_key,
 )
-from scraper import scrape_for_title
-from validator import validate_embed
+import compression
+import resource_blocking
+import response_cache
+import scrape_jobs
+import validator
+from singleflight import SingleFlight
+from validator import validate_embed_cached
 
 # Simple token storage
 active_tokens = {}
@@ -70,9 +77,115 @@ def require_auth(f):
         return f(dummy_user_id, *args, **kwargs)
     return decorated
 
+# Cache-Control max-age (seconds) per cached read endpoint
+CACHE_MAX_AGE = {
+    "catalog": 60,
+    "series": 60,
+    "series_detail": 300,
+    "search": 30,
+}
+
+# Negative cache for titles whose scrape failed: skip re-scraping for
+# NEGATIVE_CACHE_BASE_SECONDS * 2^(attempts-1), capped at NEGATIVE_CACHE_MAX_SECONDS
+NEGATIVE_CACHE_BASE_SECONDS = int(os.environ.get("NEGATIVE_CACHE_BASE_SECONDS", 30 * 60))
+NEGATIVE_CACHE_MAX_SECONDS = int(os.environ.get("NEGATIVE_CACHE_MAX_SECONDS", 24 * 3600))
+
+def scrape_retry_after(title, tmdb_id):
+    """Seconds until a failed title may be scraped again (0 if it may now)."""
+    failure = get_scrape_failure(title, tmdb_id)
+    if not failure:
+        return 0
+    window = min(NEGATIVE_CACHE_BASE_SECONDS * 2 ** (failure["attempts"] - 1), NEGATIVE_CACHE_MAX_SECONDS)
+    return max(0, int(failure["failed_at"] + window - time.time()))
+
+# Concurrent /api/get-embed calls for the same title share one cache lookup
+EMBED_LOOKUP_TIMEOUT = int(os.environ.get("EMBED_LOOKUP_TIMEOUT", 15))
+embed_lookups = SingleFlight(timeout=EMBED_LOOKUP_TIMEOUT)
+
+def lookup_cached_embed(title, tmdb_id):
+    """Validated cached embed for tmdb_id or title, or None."""
+    if tmdb_id:
+        cached_by_id = get_cached_embed_by_id(tmdb_id)
+        if cached_by_id and validate_embed_cached(cached_by_id):
+            return cached_by_id
+    cached = get_cached_embed(title)
+    if cached and validate_embed_cached(cached):
+        return cached
+    return None
+
+# Server-side cap on ?limit= for list endpoints (use /api/catalog/export for everything)
+MAX_PAGE_SIZE = int(os.environ.get("API_MAX_PAGE_SIZE", 1000))
+
+def int_arg(name, default):
+    """Integer query arg; a non-numeric value is a 400, like a bad cursor."""
+    try:
+        return int(request.args.get(name, default))
+    except ValueError:
+        response = jsonify({"error": f"Parâmetro '{name}' inválido"})
+        response.status_code = 400
+        abort(response)
+
+def page_limit(default):
+    return max(1, min(int_arg("limit", default), MAX_PAGE_SIZE))
+
+def cached_json(endpoint, args, loader):
+    """
+    Serve a read endpoint through the response cache with conditional GET.
+
+    The ETag is derived from the catalog generation, so a matching
+    If-None-Match gets a 304 without loading or serializing anything.
+    Returns None if loader() produced nothing (e.g. unknown id).
+    """
+    generation = response_cache.current_generation()
+    etag = response_cache.make_etag(endpoint, args, generation)
+    cache_control = f"public, max-age={CACHE_MAX_AGE[endpoint]}"
+
+    # Compressed bodies carry an encoding-suffixed ETag (see compress_response)
+    variants = [etag] + [f"{etag}-{enc}" for enc in ("gzip", "br")]
+    matched = next((v for v in variants if request.if_none_match.contains(v)), None)
+    if matched:
+        # 304s are not compressed: answer with the variant the client holds
+        response = app.response_class(status=304)
+        response.set_etag(matched)
+    else:
+        payload = response_cache.get_or_set(endpoint, args, loader, generation)
+        if payload is None:
+            return None
+        response = jsonify(payload)
+        response.set_etag(etag)
+    response.headers["Cache-Control"] = cache_control
+    return response
+
 app = Flask(__name__)
 CORS(app, resources={r"/*": {"origins": "*", "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"], "allow_headers": ["Content-Type", "Authorization", "Accept"]}})
 
+@app.after_request
+def compress_response(response):
+    """gzip/brotli-encode JSON bodies when the client accepts it."""
+    response.vary.add("Accept-Encoding")
+    if (
+        response.direct_passthrough
+        or response.is_streamed
+        or response.status_code != 200
+        or "Content-Encoding" in response.headers
+        or response.mimetype != "application/json"
+    ):
+        return response
+    encoding = compression.choose_encoding(request.accept_encodings)
+    if not encoding:
+        return response
+    data = response.get_data()
+    if len(data) < compression.COMPRESS_MIN_SIZE:
+        return response
+
+    response.set_data(compression.compress(data, encoding))
+    response.headers["Content-Encoding"] = encoding
+    # A strong ETag must differ between encodings of the same resource
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f"{etag}-{encoding}", weak)
+    return response
+
 # Global OPTIONS handler
 @app.route('/api/<path:path>', methods=['OPTIONS'])
 def handle_api_options(path):
@@ -90,7 +203,7 @@ try:
     init_users_table()
     print("✅ Database initialized")
 except Exception as e:
-    print(f"⚠️ DB init warning: {e}
+    print(f"⚠️ DB init warning: {e}")
 
 # Create default admin
 def create_default_admin():
@@ -105,6 +218,14 @@ def create_default_admin():
 
 create_default_admin()
 
+# Background scrape workers (SCRAPE_WORKERS=0 to run them as a separate process)
+try:
+    scrape_jobs.init_jobs_table()
+    if scrape_jobs.SCRAPE_WORKERS > 0:
+        scrape_jobs.start_workers(on_saved=response_cache.invalidate)
+except Exception as e:
+    print(f"⚠️ Scrape queue warning: {e}")
+
 @app.route("/", methods=["GET"])
 def root():
     return jsonify({"status": "ok", "message": "Filfil API", "endpoints": ["/api/health", "/api/catalog", "/api/series", "/api/search"]})
@@ -118,32 +239,65 @@ def health():
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
+@app.route("/api/cache/stats", methods=["GET"])
+def cache_stats():
+    stats = response_cache.stats()
+    stats["singleflight"] = {
+        "embed_lookups": embed_lookups.stats(),
+        "embed_checks": validator.checks.stats(),
+        "scrapes": scrape_jobs.scrapes.stats(),
+    }
+    stats["resource_blocking"] = resource_blocking.stats()
+    return jsonify(stats)
+
 @app.route("/api/catalog", methods=["GET"])
 def get_catalog():
-    limit = int(request.args.get("limit", 100))
-    offset = int(request.args.get("offset", 0))
-    movies = get_catalog_movies(limit, offset)
-    return jsonify({"results": movies})
+    limit = page_limit(100)
+    offset = max(0, int_arg("offset", 0))
+    cursor = request.args.get("cursor")
+
+    def load():
+        movies, next_cursor = get_catalog_movies_page(limit, offset, cursor)
+        return {"results": movies, "next": next_cursor}
+
+    try:
+        return cached_json("catalog", (limit, offset, cursor), load)
+    except ValueError:
+        return jsonify({"error": "Cursor inválido"}), 400
+
+@app.route("/api/catalog/export", methods=["GET"])
+def export_catalog():
+    """Full catalog as one JSON document, streamed row by row from the cursor."""
+    encoding = compression.choose_encoding(request.accept_encodings)
+    body = compression.stream_json({}, "results", iter_catalog_movies(), encoding=encoding)
+    response = Response(stream_with_context(body), mimetype="application/json")
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    return response
 
 @app.route("/api/search/all", methods=["GET", "POST"])
 def unified_search_all():
     """Search movies and series locally."""
     query = request.args.get("q", "") or (request.json.get("q") if request.is_json else "")
     query = query.strip()
-    limit = int(request.args.get("limit", 50))
+    limit = page_limit(50)
     
     if not query:
         return jsonify({"results": []})
     
-    try:
+    def load():
         movies = search_movies_locally(query, limit)
         series = search_series_locally(query, limit)
         results = movies + series
-        
-        # Sort by title
-        results.sort(key=lambda x: x.get('title', '').lower())
-        
-        return jsonify({"results": results[:limit]})
+
+        # Both lists are already relevance-ranked; stable sort keeps that order
+        # but puts title prefix matches from either list first
+        prefix = query.lower()
+        results.sort(key=lambda x: 0 if (x.get('title') or '').lower().startswith(prefix) else 1)
+        return {"results": results[:limit]}
+
+    try:
+        return cached_json("search", (query.lower(), limit), load)
     except Exception as e:
         logging.error(f"Search error: {e}")
         return jsonify({"error": str(e)}), 500
@@ -158,45 +312,55 @@ def get_embed():
     if not title:
         return jsonify({"error": "Título é obrigatório"}), 400
 
-    # Check cache by ID
-    if tmdb_id:
-        cached_by_id = get_cached_embed_by_id(tmdb_id)
-        if cached_by_id and validate_embed(cached_by_id):
-            return jsonify({"embedUrl": cached_by_id, "cached": True})
-
-    # Check cache by title
-    cached = get_cached_embed(title)
-    if cached and validate_embed(cached):
+    try:
+        cached = embed_lookups.do(scrape_failure_key(title, tmdb_id), lambda: lookup_cached_embed(title, tmdb_id))
+    except TimeoutError:
+        cached = lookup_cached_embed(title, tmdb_id)
+    if cached:
         return jsonify({"embedUrl": cached, "cached": True})
 
-    # Scrape
-    embed = scrape_for_title(title, tmdb_id, year=year)
-    if embed and validate_embed(embed):
-        save_embed(title, embed, tmdb_id)
-        return jsonify({"embedUrl": embed, "cached": False})
+    # Recently failed: don't launch another scrape yet
+    retry_after = scrape_retry_after(title, tmdb_id)
+    if retry_after:
+        response = jsonify({"error": "Embed não encontrado", "cached": True, "retryAfter": retry_after})
+        response.headers["Retry-After"] = str(retry_after)
+        return response, 404
+
+    # Queue a background scrape; the client polls /api/jobs/<id> until it finishes
+    job = scrape_jobs.enqueue(title, tmdb_id, year)
+    response = jsonify({"jobId": job["id"], "status": job["status"], "cached": False})
+    response.headers["Location"] = f"/api/jobs/{job['id']}"
+    return response, 202
 
-    return jsonify({"error": "Embed não encontrado"}), 404
+@app.route("/api/jobs/<int:job_id>", methods=["GET"])
+def get_scrape_job(job_id):
+    job = scrape_jobs.get_job(job_id)
+    if not job:
+        return jsonify({"error": "Job não encontrado"}), 404
+    return jsonify(job)
 
 @app.route("/api/series", methods=["GET"])
 def get_series():
-    limit = int(request.args.get("limit", 50))
-    offset = int(request.args.get("offset", 0))
-    series = get_catalog_series(limit, offset)
-    total = get_series_count()
-    return jsonify({"results": series, "total": total, "limit": limit, "offset": offset})
+    limit = page_limit(50)
+    offset = max(0, int_arg("offset", 0))
+    cursor = request.args.get("cursor")
+
+    def load():
+        series, next_cursor = get_catalog_series_page(limit, offset, cursor)
+        total = get_series_count()
+        return {"results": series, "total": total, "limit": limit, "offset": offset, "next": next_cursor}
+
+    try:
+        return cached_json("series", (limit, offset, cursor), load)
+    except ValueError:
+        return jsonify({"error": "Cursor inválido"}), 400
 
 @app.route("/api/series/<int:series_id>", methods=["GET"])
 def get_series_detail(series_id):
-    series = get_series_by_id(series_id)
-    if not series:
+    response = cached_json("series_detail", (series_id,), lambda: get_series_with_seasons(series_id))
+    if response is None:
         return jsonify({"error": "Série não encontrada"}), 404
-    
-    seasons = get_series_seasons(series_id)
-    for season in seasons:
-        season["episodes"] = get_season_episodes(season["id"])
-    
-    series["seasons"] = seasons
-    return jsonify(series)
+    return response
 
 @app.route("/api/mylist/movies", methods=["GET"])
 def get_my_list_movies_endpoint():
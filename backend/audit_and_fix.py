@@ -10,9 +10,10 @@ import os
 
 sys.path.insert(0, os.path.dirname(__file__))
 
-from database import get_conn, save_embed
+from database import canonical_key, extract_source_video_id, get_conn, save_embed
 from strict_opera_scraper import scrape_with_strict_validation
 from opera_scraper import get_dedicated_scraper
+from title_match import TitleIndex
 
 
 def audit_all_movies():
@@ -103,8 +104,8 @@ def audit_all_movies():
                 conn = get_conn()
                 c = conn.cursor()
                 c.execute(
-                    "UPDATE links SET embed_url = ?, original_raw_title = ? WHERE id = ?",
-                    (new_url, scraped_title, link_id),
+                    "UPDATE links SET embed_url = ?, source_video_id = ?, original_raw_title = ?, canonical_key = ? WHERE id = ?",
+                    (new_url, extract_source_video_id(new_url), scraped_title, canonical_key(scraped_title), link_id),
                 )
                 conn.commit()
                 conn.close()
@@ -175,8 +176,8 @@ def fix_specific_movie(title: str):
         conn = get_conn()
         c = conn.cursor()
         c.execute(
-            "UPDATE links SET embed_url = ?, original_raw_title = ? WHERE id = ?",
-            (new_url, scraped_title, link_id),
+            "UPDATE links SET embed_url = ?, source_video_id = ?, original_raw_title = ?, canonical_key = ? WHERE id = ?",
+            (new_url, extract_source_video_id(new_url), scraped_title, canonical_key(scraped_title), link_id),
         )
         conn.commit()
         conn.close()
@@ -241,6 +242,59 @@ def show_mismatches():
             print(f"   TMDB: {item['tmdb_id']}")
 
 
+def show_near_duplicates(threshold=0.92):
+    """
+    Lista pares de filmes com títulos quase iguais (possíveis duplicatas)
+    """
+    print("\n" + "=" * 80)
+    print("🔍 TÍTULOS QUASE DUPLICADOS")
+    print("=" * 80)
+
+    # Trigram index over links.title_norm: each title is scored against the
+    # whole catalog in one pass instead of a pairwise loop
+    index = TitleIndex.from_links()
+    print(f"\n📊 Filmes indexados: {len(index)}")
+
+    pairs = []
+    for title in index.titles:
+        for other, score in index.matches(title, threshold=threshold):
+            if other != title and title < other:
+                pairs.append((score, title, other))
+
+    pairs.sort(reverse=True)
+    print(f"📊 Pares com similaridade >= {threshold:.0%}: {len(pairs)}")
+    for score, title, other in pairs[:50]:
+        print(f"   {score:.2%}  {title}  <->  {other}")
+
+
+def match_raw_titles(threshold=0.85):
+    """
+    Casa títulos do catalog_raw sem link exato com o link mais parecido
+    """
+    print("\n" + "=" * 80)
+    print("🔍 CATALOG_RAW SEM LINK EXATO")
+    print("=" * 80)
+
+    conn = get_conn()
+    c = conn.cursor()
+    c.execute("""
+        SELECT c.raw_title FROM catalog_raw c
+        WHERE NOT EXISTS (SELECT 1 FROM links l WHERE l.canonical_key = c.canonical_key)
+    """)
+    raw_titles = [row[0] for row in c.fetchall()]
+    conn.close()
+
+    index = TitleIndex.from_links()
+    matched = 0
+    for raw_title in raw_titles:
+        title, score = index.best_match(raw_title, threshold=threshold)
+        if title:
+            matched += 1
+            print(f"   {score:.2%}  {raw_title}  ->  {title}")
+
+    print(f"\n📊 {matched}/{len(raw_titles)} títulos com match >= {threshold:.0%}")
+
+
 if __name__ == "__main__":
     import argparse
     import re
@@ -254,6 +308,12 @@ if __name__ == "__main__":
     parser.add_argument(
         "--show-mismatches", action="store_true", help="Mostrar potenciais mismatches"
     )
+    parser.add_argument(
+        "--duplicates", action="store_true", help="Mostrar títulos quase duplicados"
+    )
+    parser.add_argument(
+        "--match-raw", action="store_true", help="Casar catalog_raw sem link com links parecidos"
+    )
 
     args = parser.parse_args()
 
@@ -263,7 +323,13 @@ if __name__ == "__main__":
         fix_specific_movie(args.fix)
     elif args.show_mismatches:
         show_mismatches()
+    elif args.duplicates:
+        show_near_duplicates()
+    elif args.match_raw:
+        match_raw_titles()
     else:
         print("Use --audit-all para auditar todos os filmes")
         print("Use --fix 'Nome do Filme' para corrigir um específico")
         print("Use --show-mismatches para ver lista de suspeitos")
+        print("Use --duplicates para ver títulos quase duplicados")
+        print("Use --match-raw para casar catalog_raw com links parecidos")
@@ -0,0 +1,164 @@
+"""
+Pool of logged-in Playwright sessions.
+
+Playwright's sync API is bound to the thread that started it, so it cannot
+be driven from Flask request threads or shared between them. Each slot of
+the pool is therefore a dedicated owner thread holding its own browser and
+logged-in OperaScraper session; callers hand work to whichever slot is free
+and wait for the result:
+
+    pool = get_pool()
+    url = pool.scrape_title("Interestelar", year="2014", timeout=120)
+
+A slot restarts its browser after RECYCLE_AFTER tasks (caps Chromium memory
+growth) or after a task leaves the session dead.
+"""
+
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+POOL_SIZE = int(os.environ.get("BROWSER_POOL_SIZE", max(1, min(4, (os.cpu_count() or 2) // 2))))
+RECYCLE_AFTER = int(os.environ.get("BROWSER_RECYCLE_AFTER", 50))
+# How long a caller waits for a free slot plus the task itself
+DEFAULT_TIMEOUT = int(os.environ.get("BROWSER_POOL_TIMEOUT", 180))
+
+_STOP = object()
+
+
+class BrowserPool:
+    def __init__(self, size=POOL_SIZE, recycle_after=RECYCLE_AFTER, headless=True, scraper_factory=None):
+        self.size = size
+        self.recycle_after = recycle_after
+        self.headless = headless
+        self._scraper_factory = scraper_factory
+        self._tasks = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.failed = 0
+        self.recycles = 0
+        self.timeouts = 0
+
+    def _new_scraper(self):
+        if self._scraper_factory:
+            return self._scraper_factory()
+        from playwright_scraper import OperaScraper
+        return OperaScraper()
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.size):
+                t = threading.Thread(target=self._slot_loop, name=f"browser-slot-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def stop(self):
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._tasks.put(_STOP)
+        for t in threads:
+            t.join(timeout=30)
+
+    def _slot_loop(self):
+        scraper = None
+        pages = 0
+        while True:
+            item = self._tasks.get()
+            if item is _STOP:
+                break
+            fn, future = item
+            if not future.set_running_or_notify_cancel():
+                continue  # caller gave up while the task was queued
+
+            try:
+                if scraper is None or not scraper.is_running:
+                    scraper = self._new_scraper()
+                    scraper.start_session(headless=self.headless)
+                    pages = 0
+                future.set_result(fn(scraper))
+                with self._lock:
+                    self.completed += 1
+            except BaseException as e:
+                future.set_exception(e)
+                with self._lock:
+                    self.failed += 1
+            pages += 1
+
+            if scraper is not None and (pages >= self.recycle_after or not scraper.is_running):
+                logging.info(f"[{threading.current_thread().name}] Recycling browser after {pages} tasks")
+                try:
+                    scraper.stop_session()
+                except Exception:
+                    pass
+                scraper = None
+                with self._lock:
+                    self.recycles += 1
+
+        if scraper is not None:
+            try:
+                scraper.stop_session()
+            except Exception:
+                pass
+
+    def submit(self, fn):
+        """Queue fn(scraper) for the next free slot; returns a Future."""
+        self.start()
+        future = Future()
+        self._tasks.put((fn, future))
+        return future
+
+    def run(self, fn, timeout=DEFAULT_TIMEOUT):
+        """
+        Run fn(scraper) on a pooled session and return its result.
+
+        Raises TimeoutError if no slot finished the task within `timeout`
+        seconds; a task still waiting in the queue is then dropped.
+        """
+        future = self.submit(fn)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout:
+            future.cancel()
+            with self._lock:
+                self.timeouts += 1
+            raise TimeoutError(f"browser pool task timed out after {timeout}s")
+
+    def scrape_title(self, title, year=None, timeout=DEFAULT_TIMEOUT):
+        return self.run(lambda s: s.scrape_title(title, year), timeout=timeout)
+
+    def get_video_source(self, detail_url, expected_title=None, timeout=DEFAULT_TIMEOUT):
+        return self.run(lambda s: s.get_video_source(detail_url, expected_title=expected_title), timeout=timeout)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": self.size,
+                "queued": self._tasks.qsize(),
+                "completed": self.completed,
+                "failed": self.failed,
+                "recycles": self.recycles,
+                "timeouts": self.timeouts,
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(size=None):
+    """
+    Process-wide pool, started on first use. `size` (default POOL_SIZE)
+    only applies to that first call; sequential callers should pass 1.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool(size=size or POOL_SIZE)
+            _pool.start()
+        return _pool
@@ -1,17 +1,15 @@
-import requests
 import time
 import logging
-import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from scraper import scrape_for_title
 from database import init_db, save_embed, get_cached_embed
 from validator import validate_embed
+from tmdb_client import list_movies
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
-API_KEY = "909fc389a150847bdd4ffcd92809cff7"
-BASE_URL = "https://api.themoviedb.org/3"
-
 CATEGORIES = [
     "/trending/all/week",
     "/movie/popular",
@@ -19,17 +17,8 @@ CATEGORIES = [
 ]
 
 def fetch_movies(endpoint):
-    url = f"{BASE_URL}{endpoint}?api_key={API_KEY}&language=pt-BR&page=1"
-    try:
-        res = requests.get(url)
-        if res.status_code == 200:
-            return res.json().get("results", [])
-        else:
-            logging.error(f"Failed to fetch {endpoint}: {res.status_code}")
-            return []
-    except Exception as e:
-        logging.error(f"Error fetching {endpoint}: {e}")
-        return []
+    # Shared TMDB client: keep-alive session, rate limit and cached lists
+    return list_movies(endpoint)
 
 # State tracking
 SCRAPER_STATE = {
@@ -65,14 +54,9 @@ def run_bulk_scrape():
     try:
         init_db()
         
-        # Start persistent session
-        from playwright_scraper import get_scraper
-        scraper_instance = get_scraper()
-        try:
-            scraper_instance.start_session(headless=True)
-        except Exception as e:
-            log_state(f"Failed to start scraper session: {e}", "ERROR")
-            return
+        # Pooled browser sessions: titles are scraped concurrently, one per slot
+        from browser_pool import get_pool
+        pool = get_pool()
 
         all_movies = []
         
@@ -88,58 +72,55 @@ def run_bulk_scrape():
         log_state(f"Found {len(unique_movies)} unique movies to process.")
         
         SCRAPER_STATE["progress"]["total"] = len(unique_movies)
+        SCRAPER_STATE["progress"]["current"] = 0
         
-        # 2. Scrape each
-        count = 0
-        for movie in unique_movies:
-            # Check if session is still alive
-            if not scraper_instance.is_running:
-                 log_state("Scraper session died, restarting...", "WARNING")
-                 scraper_instance.start_session(headless=True)
+        # 2. Scrape each (one in flight per browser slot)
+        progress_lock = threading.Lock()
 
-            SCRAPER_STATE["progress"]["current"] = count + 1
-            
+        def process(movie):
             title = movie.get("title") or movie.get("name")
             tmdb_id = str(movie["id"])
             
             if not title:
-                continue
-                
-            SCRAPER_STATE["current_movie"] = title
-            log_state(f"[{count+1}/{len(unique_movies)}] Checking: {title} (ID: {tmdb_id})")
+                return
+
+            with progress_lock:
+                SCRAPER_STATE["progress"]["current"] += 1
+                current = SCRAPER_STATE["progress"]["current"]
+                SCRAPER_STATE["current_movie"] = title
+            log_state(f"[{current}/{len(unique_movies)}] Checking: {title} (ID: {tmdb_id})")
             
             # Check DB first
             cached = get_cached_embed(title)
             if cached:
                 log_state(f" -> Already in DB: {cached}")
-                count += 1
-                continue
+                return
                 
             # Scrape
             try:
-                log_state(" -> Scraping...")
+                log_state(f" -> Scraping {title}...")
                 embed = scrape_for_title(title, tmdb_id)
                 if embed and validate_embed(embed):
                     save_embed(title, embed, tmdb_id)
-                    log_state(" -> Saved!")
+                    log_state(f" -> Saved {title}!")
                 else:
                     # Save as NOT_FOUND so we know we checked it
                     save_embed(title, "NOT_FOUND", tmdb_id)
-                    log_state(" -> No embed found (marked as NOT_FOUND).", "WARNING")
+                    log_state(f" -> No embed found for {title} (marked as NOT_FOUND).", "WARNING")
             except Exception as e:
-                log_state(f" -> Failed: {e}", "ERROR")
+                log_state(f" -> Failed {title}: {e}", "ERROR")
                 # Optionally also mark as checked/error? For now just log.
-                
-            count += 1
-            time.sleep(1) # Reduced sleep since we don't need to be as nice to our own session, but still good practice
+
+        with ThreadPoolExecutor(max_workers=pool.size) as executor:
+            list(executor.map(process, unique_movies))
             
     except Exception as e:
          log_state(f"Fatal Scraper Error: {e}", "ERROR")
     finally:
-        # Close session
+        # Close sessions
         try:
-            if 'scraper_instance' in locals():
-                scraper_instance.stop_session()
+            if 'pool' in locals():
+                pool.stop()
         except: pass
         
         SCRAPER_STATE["is_running"] = False
@@ -85,7 +85,7 @@ def cleanup_youtube_links():
     # Update all YouTube links to NOT_FOUND
     c.execute("""
         UPDATE links 
-        SET embed_url = 'NOT_FOUND'
+        SET embed_url = 'NOT_FOUND', source_video_id = NULL
         WHERE embed_url LIKE '%youtube%' 
         AND embed_url NOT LIKE '%NOT_FOUND%'
     """)
@@ -128,6 +128,23 @@ def show_integrity_report():
     print(f"   • Links válidos (MP4/jt0x): {valid}")
     print(f"   • Aguardando link (NOT_FOUND): {not_found}")
 
+    # Results of the last link_checker run (no network here)
+    c.execute("""
+        SELECT
+            SUM(CASE WHEN h.ok = 1 THEN 1 ELSE 0 END),
+            SUM(CASE WHEN h.ok = 0 THEN 1 ELSE 0 END),
+            SUM(CASE WHEN h.url IS NULL THEN 1 ELSE 0 END)
+        FROM links l
+        LEFT JOIN link_health h ON h.url = l.embed_url
+        WHERE l.embed_url IS NOT NULL AND l.embed_url != 'NOT_FOUND'
+    """)
+    online, offline, unchecked = (n or 0 for n in c.fetchone())
+    print(f"   • Links respondendo (última verificação): {online}")
+    print(f"   • Links offline (última verificação): {offline}")
+    print(f"   • Nunca verificados: {unchecked}")
+    if offline or unchecked:
+        print("     (python3 link_checker.py revalida o catálogo)")
+
     # Check for duplicates again
     c.execute("""
         SELECT embed_url, COUNT(*) as count
@@ -0,0 +1,77 @@
+"""
+Response compression and streamed JSON encoding for the API.
+
+gzip always works (stdlib); brotli is used when the optional `brotli`
+package is installed and the client asks for it.
+"""
+
+import gzip
+import json
+import os
+import zlib
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+# Bodies smaller than this are not worth compressing
+COMPRESS_MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", 1024))
+GZIP_LEVEL = int(os.environ.get("GZIP_LEVEL", 6))
+BROTLI_QUALITY = int(os.environ.get("BROTLI_QUALITY", 5))
+
+
+def choose_encoding(accept_encodings):
+    """Pick the best supported encoding from a werkzeug Accept-Encoding header."""
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best = accept_encodings.best_match(candidates)
+    if best and accept_encodings[best] > 0:
+        return best
+    return None
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL)
+
+
+def _compressor(encoding):
+    if encoding == "br":
+        c = brotli.Compressor(quality=BROTLI_QUALITY)
+        return c.process, c.finish
+    if encoding == "gzip":
+        c = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+        return c.compress, c.flush
+    return (lambda chunk: chunk), (lambda: b"")
+
+
+def stream_json(prefix: dict, key: str, items, encoding=None, chunk_size=64 * 1024):
+    """
+    Yield `{...prefix, key: [items...]}` as JSON without building it in memory.
+
+    Items are encoded one at a time as they come off the iterator (e.g. a
+    DB cursor) and flushed in ~chunk_size pieces, compressed on the fly when
+    `encoding` is given.
+    """
+    process, finish = _compressor(encoding)
+    head = json.dumps(prefix)[:-1]
+    head += (", " if prefix else "") + json.dumps(key) + ": ["
+
+    buf = [head]
+    size = len(head)
+    first = True
+    for item in items:
+        piece = json.dumps(item) if first else "," + json.dumps(item)
+        first = False
+        buf.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            out = process("".join(buf).encode())
+            buf, size = [], 0
+            if out:
+                yield out
+    buf.append("]}")
+    out = process("".join(buf).encode()) + finish()
+    if out:
+        yield out
@@ -1,5 +1,5 @@
 from playwright_scraper import OperaScraper
-from database import get_conn
+from database import canonical_key, get_conn
 import time
 import logging
 
@@ -11,9 +11,9 @@ def save_raw_item(item):
         c = conn.cursor()
         # raw_title is unique, so INSERT OR IGNORE avoids duplicates
         c.execute("""
-            INSERT OR IGNORE INTO catalog_raw (raw_title, year, detail_url)
-            VALUES (?, ?, ?)
-        """, (item['raw_title'], item['year'], item['detail_url']))
+            INSERT OR IGNORE INTO catalog_raw (raw_title, canonical_key, year, detail_url)
+            VALUES (?, ?, ?, ?)
+        """, (item['raw_title'], canonical_key(item['raw_title']), item['year'], item['detail_url']))
         conn.commit()
         return c.rowcount > 0
     except Exception as e:
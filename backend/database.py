@@ -1,23 +1,21 @@
 import sqlite3
 from datetime import datetime
+import base64
+import json
 import os
+import re
+import time
 from typing import Optional
 
+from db_pool import get_conn as get_pooled_conn
+from title_match import normalize_title
+
 DB_PATH = os.environ.get("DB_FILE_PATH", os.path.join(os.path.dirname(__file__), "links.db"))
 
 
 def get_conn():
-    # Ensure directory exists (critical for Railway Volumes)
-    db_dir = os.path.dirname(DB_PATH)
-    if db_dir and not os.path.exists(db_dir):
-        try:
-            os.makedirs(db_dir, exist_ok=True)
-        except Exception:
-            pass # Handle permissions or other issues gracefully if needed
-            
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    # One pooled, WAL-mode connection per thread (see db_pool)
+    return get_pooled_conn(DB_PATH)
 
 
 def init_db():
@@ -44,6 +42,23 @@ def init_db():
             c.execute("ALTER TABLE links ADD COLUMN year TEXT")
         except sqlite3.OperationalError:
             pass # Column already exists
+        # Migration: Opera/Xtream video id parsed from embed_url (dedupe lookups)
+        try:
+            c.execute("ALTER TABLE links ADD COLUMN source_video_id TEXT")
+            new_column = True
+        except sqlite3.OperationalError:
+            new_column = False
+        c.execute("CREATE INDEX IF NOT EXISTS idx_links_source_video_id ON links(source_video_id)")
+        if new_column:
+            # Every writer sets the column since; rows without an id stay NULL
+            backfill_source_video_ids(c)
+        # Migration: normalized title (title_match.normalize_title) for fuzzy matching
+        try:
+            c.execute("ALTER TABLE links ADD COLUMN title_norm TEXT")
+        except sqlite3.OperationalError:
+            pass
+        c.execute("CREATE INDEX IF NOT EXISTS idx_links_title_norm ON links(title_norm)")
+        backfill_title_norms(c)
         c.execute(
             """CREATE TABLE IF NOT EXISTS catalog_raw (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -54,9 +69,317 @@ def init_db():
                 scraped_at DATETIME DEFAULT CURRENT_TIMESTAMP
             )"""
         )
+        # Migration: canonical_key joins links and catalog_raw by plain equality
+        for table in ("links", "catalog_raw"):
+            try:
+                c.execute(f"ALTER TABLE {table} ADD COLUMN canonical_key TEXT")
+            except sqlite3.OperationalError:
+                pass
+            c.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_canonical_key ON {table}(canonical_key)")
+        backfill_canonical_keys(c)
+        _create_catalog_meta(c)
+        c.execute(
+            """CREATE TABLE IF NOT EXISTS link_health (
+                url TEXT PRIMARY KEY,
+                ok INTEGER NOT NULL,
+                status_code INTEGER,
+                error TEXT,
+                checked_at REAL NOT NULL
+            )"""
+        )
+        c.execute(
+            """CREATE TABLE IF NOT EXISTS scrape_failures (
+                key TEXT PRIMARY KEY,
+                title TEXT,
+                tmdb_id TEXT,
+                attempts INTEGER NOT NULL DEFAULT 1,
+                failed_at REAL NOT NULL
+            )"""
+        )
+        conn.commit()
+    init_catalog_indexes()
+    init_search_index()
+    init_generation_triggers()
+    # Imported here: enrichment/work_items import this module
+    from enrichment import init_enrichment_tables
+    init_enrichment_tables()
+
+
+# ==================== SOURCE VIDEO IDS ====================
+
+# .../movie/<user>/<pass>/217376.mp4 -> "217376"
+_SOURCE_VIDEO_ID_RE = re.compile(r"/(\d+)\.(?:mp4|mkv|m3u8)", re.IGNORECASE)
+
+
+def extract_source_video_id(embed_url: Optional[str]) -> Optional[str]:
+    """Numeric stream id from an Opera/Xtream video URL, or None."""
+    if not embed_url:
+        return None
+    match = _SOURCE_VIDEO_ID_RE.search(embed_url)
+    return match.group(1) if match else None
+
+
+def backfill_source_video_ids(c) -> int:
+    """
+    Fill source_video_id for rows written before the column existed (run
+    once, by the init_db migration that adds it).
+    """
+    c.execute(
+        "SELECT id, embed_url FROM links WHERE source_video_id IS NULL AND embed_url IS NOT NULL"
+    )
+    updates = [
+        (video_id, row_id)
+        for row_id, embed_url in c.fetchall()
+        if (video_id := extract_source_video_id(embed_url))
+    ]
+    if updates:
+        c.executemany("UPDATE links SET source_video_id = ? WHERE id = ?", updates)
+    return len(updates)
+
+
+def existing_source_video_ids(video_ids) -> set:
+    """Which of `video_ids` are already in links (one indexed query per 500 ids)."""
+    wanted = list({str(v) for v in video_ids if v})
+    found = set()
+    with get_conn() as conn:
+        c = conn.cursor()
+        for i in range(0, len(wanted), 500):
+            chunk = wanted[i:i + 500]
+            c.execute(
+                f"SELECT source_video_id FROM links WHERE source_video_id IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            found.update(row[0] for row in c.fetchall())
+    return found
+
+
+def backfill_title_norms(c) -> int:
+    """Fill title_norm for rows written before the column existed."""
+    c.execute("SELECT id, title FROM links WHERE title_norm IS NULL AND title IS NOT NULL")
+    updates = [(normalize_title(title), row_id) for row_id, title in c.fetchall()]
+    if updates:
+        c.executemany("UPDATE links SET title_norm = ? WHERE id = ?", updates)
+    return len(updates)
+
+
+# ==================== CANONICAL KEYS ====================
+
+def canonical_key(raw_title: Optional[str]) -> Optional[str]:
+    """
+    Join key between links and catalog_raw: the normalized catalog title
+    (catalog_raw.raw_title, or links.original_raw_title falling back to
+    links.title).
+    """
+    return normalize_title(raw_title) or None
+
+
+def link_canonical_key(title: Optional[str], original_raw_title: Optional[str] = None) -> Optional[str]:
+    return canonical_key(original_raw_title or title)
+
+
+def backfill_canonical_keys(c) -> int:
+    """Fill canonical_key for links and catalog_raw rows that don't have it yet."""
+    c.execute("SELECT id, title, original_raw_title FROM links WHERE canonical_key IS NULL")
+    link_updates = [
+        (key, row_id)
+        for row_id, title, raw_title in c.fetchall()
+        if (key := link_canonical_key(title, raw_title))
+    ]
+    if link_updates:
+        c.executemany("UPDATE links SET canonical_key = ? WHERE id = ?", link_updates)
+
+    c.execute("SELECT id, raw_title FROM catalog_raw WHERE canonical_key IS NULL")
+    raw_updates = [
+        (key, row_id) for row_id, raw_title in c.fetchall() if (key := canonical_key(raw_title))
+    ]
+    if raw_updates:
+        c.executemany("UPDATE catalog_raw SET canonical_key = ? WHERE id = ?", raw_updates)
+    return len(link_updates) + len(raw_updates)
+
+
+# ==================== CATALOG GENERATION ====================
+
+def _create_catalog_meta(c):
+    c.execute(
+        """CREATE TABLE IF NOT EXISTS catalog_meta (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL DEFAULT 0
+        )"""
+    )
+
+
+GENERATION_TABLES = ("links", "series", "seasons", "episodes")
+
+
+def init_generation_triggers():
+    """
+    Bump the catalog generation from triggers on every catalog table, inside
+    the writer's own transaction. Read caches (response_cache) and ETags key
+    on this value, so a write from any process - including scripts using
+    plain SQL - invalidates them.
+    """
+    with get_conn() as conn:
+        c = conn.cursor()
+        _create_catalog_meta(c)
+        c.execute("INSERT OR IGNORE INTO catalog_meta (key, value) VALUES ('generation', 0)")
+        for table in GENERATION_TABLES:
+            if not _table_exists(c, table):
+                continue
+            for event in ("INSERT", "UPDATE", "DELETE"):
+                c.execute(
+                    f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_generation_{event.lower()}
+                        AFTER {event} ON {table}
+                        BEGIN
+                            UPDATE catalog_meta SET value = value + 1 WHERE key = 'generation';
+                        END"""
+                )
         conn.commit()
 
 
+def get_catalog_generation() -> int:
+    with get_conn() as conn:
+        c = conn.cursor()
+        try:
+            c.execute("SELECT value FROM catalog_meta WHERE key = 'generation'")
+        except sqlite3.OperationalError:
+            return 0
+        row = c.fetchone()
+        return row[0] if row else 0
+
+
+def _table_exists(c, name):
+    c.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,))
+    return c.fetchone() is not None
+
+
+def init_catalog_indexes():
+    """Composite indexes backing the keyset-paginated catalog listings."""
+    with get_conn() as conn:
+        c = conn.cursor()
+        if _table_exists(c, "links"):
+            # Legacy rows have a NULL added_at; they sort (and page) as ''
+            c.execute("DROP INDEX IF EXISTS idx_links_added_at")
+            c.execute(
+                "CREATE INDEX IF NOT EXISTS idx_links_added_at_key "
+                "ON links(COALESCE(added_at, '') DESC, id DESC)"
+            )
+        if _table_exists(c, "series"):
+            c.execute(
+                "CREATE INDEX IF NOT EXISTS idx_series_status_created "
+                "ON series(status, created_at DESC, id DESC)"
+            )
+        conn.commit()
+
+
+# ==================== KEYSET CURSORS ====================
+
+def encode_cursor(sort_key, row_id) -> str:
+    """Opaque pagination cursor for the row that ended a page."""
+    raw = json.dumps([sort_key, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Inverse of encode_cursor. Raises ValueError on a malformed cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_key, row_id = json.loads(raw)
+    except Exception:
+        raise ValueError("invalid cursor")
+    if not isinstance(sort_key, str) or not isinstance(row_id, int):
+        raise ValueError("invalid cursor")
+    return sort_key, row_id
+
+
+# ==================== FULL-TEXT SEARCH ====================
+
+# Accent-folding tokenizer so "acao" finds "Ação" (Portuguese titles)
+FTS_TOKENIZER = "unicode61 remove_diacritics 2"
+
+# Column weights for bm25(): title matters most, overview least
+LINKS_FTS_WEIGHTS = (10.0, 5.0, 1.0)
+SERIES_FTS_WEIGHTS = (10.0, 1.0)
+
+# A missing FTS table is re-checked after this many seconds, so processes
+# started before init_search_index() pick the index up once it exists
+FTS_MISSING_RECHECK = 30.0
+
+# table -> True once found, or the monotonic time a missing table is re-checked
+_fts_ready = {}
+
+
+def _create_fts(c, table, source, columns):
+    """Create an external-content FTS5 index over `source` plus sync triggers."""
+    exists = _table_exists(c, table)
+
+    cols = ", ".join(columns)
+    new_vals = ", ".join(f"new.{col}" for col in columns)
+    old_vals = ", ".join(f"old.{col}" for col in columns)
+
+    c.execute(
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5(
+            {cols}, content='{source}', content_rowid='id', tokenize='{FTS_TOKENIZER}'
+        )"""
+    )
+    c.execute(
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_ai AFTER INSERT ON {source} BEGIN
+            INSERT INTO {table}(rowid, {cols}) VALUES (new.id, {new_vals});
+        END"""
+    )
+    c.execute(
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_ad AFTER DELETE ON {source} BEGIN
+            INSERT INTO {table}({table}, rowid, {cols}) VALUES ('delete', old.id, {old_vals});
+        END"""
+    )
+    c.execute(
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_au AFTER UPDATE OF {cols} ON {source} BEGIN
+            INSERT INTO {table}({table}, rowid, {cols}) VALUES ('delete', old.id, {old_vals});
+            INSERT INTO {table}(rowid, {cols}) VALUES (new.id, {new_vals});
+        END"""
+    )
+    if not exists:
+        # Backfill rows that predate the index
+        c.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+
+
+def init_search_index():
+    """Create the FTS5 search indexes for links and (if present) series."""
+    with get_conn() as conn:
+        c = conn.cursor()
+        try:
+            if _table_exists(c, "links"):
+                _create_fts(c, "links_fts", "links", ("title", "original_raw_title", "overview"))
+            if _table_exists(c, "series"):
+                _create_fts(c, "series_fts", "series", ("title", "overview"))
+        except sqlite3.OperationalError as e:
+            # SQLite built without FTS5: searches fall back to LIKE
+            print(f"⚠️ FTS5 unavailable, using LIKE search: {e}")
+            conn.rollback()
+            return
+        conn.commit()
+    _fts_ready.clear()
+
+
+def _has_fts(conn, table):
+    state = _fts_ready.get(table)
+    if state is True:
+        return True
+    now = time.monotonic()
+    if state is not None and now < state:
+        return False
+    if _table_exists(conn.cursor(), table):
+        _fts_ready[table] = True
+        return True
+    _fts_ready[table] = now + FTS_MISSING_RECHECK
+    return False
+
+
+def _fts_query(query: str) -> str:
+    """Turn user input into an FTS5 prefix query: 'star wa' -> '"star"* "wa"*'."""
+    tokens = re.findall(r"\w+", query)
+    return " ".join(f'"{t}"*' for t in tokens)
+
+
 def get_cached_embed(title: str):
     with get_conn() as conn:
         c = conn.cursor()
@@ -98,13 +421,17 @@ def save_embed(
         if existing:
             c.execute(
                 """UPDATE links 
-                   SET embed_url = ?, added_at = ?, tmdb_id = COALESCE(?, tmdb_id), 
+                   SET embed_url = ?, source_video_id = ?, title_norm = ?, canonical_key = ?,
+                       added_at = ?, tmdb_id = COALESCE(?, tmdb_id), 
                        poster_path = COALESCE(?, poster_path), backdrop_path = COALESCE(?, backdrop_path), 
                        overview = COALESCE(?, overview), original_raw_title = COALESCE(?, original_raw_title),
                        year = COALESCE(?, year)
                    WHERE title = ?""",
                 (
                     embed_url,
+                    extract_source_video_id(embed_url),
+                    normalize_title(title),
+                    link_canonical_key(title, original_raw_title or existing[4]),
                     datetime.utcnow(),
                     tmdb_id,
                     poster_path,
@@ -118,12 +445,15 @@ def save_embed(
         else:
             c.execute(
                 """INSERT INTO links 
-                   (tmdb_id, title, embed_url, added_at, poster_path, backdrop_path, overview, original_raw_title, year) 
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                   (tmdb_id, title, title_norm, canonical_key, embed_url, source_video_id, added_at, poster_path, backdrop_path, overview, original_raw_title, year) 
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
                 (
                     tmdb_id,
                     title,
+                    normalize_title(title),
+                    link_canonical_key(title, original_raw_title),
                     embed_url,
+                    extract_source_video_id(embed_url),
                     datetime.utcnow(),
                     poster_path,
                     backdrop_path,
@@ -134,6 +464,81 @@ def save_embed(
             )
         conn.commit()
 
+    # Playable link still without a poster: hand it to poster_daemon
+    if not (poster_path or (existing and existing[1])) and embed_url and embed_url != "NOT_FOUND":
+        from enrichment import enqueue_enrichment
+        enqueue_enrichment(title)
+
+
+# ==================== VALIDATION & NEGATIVE CACHES ====================
+
+def get_link_health(url: str):
+    """Last recorded check for an embed URL, or None if never checked."""
+    with get_conn() as conn:
+        c = conn.cursor()
+        c.execute(
+            "SELECT url, ok, status_code, error, checked_at FROM link_health WHERE url = ?",
+            (url,),
+        )
+        row = c.fetchone()
+        return dict(row) if row else None
+
+
+def record_link_health(url: str, ok: bool, status_code=None, error=None, checked_at=None):
+    record_link_health_many([(url, ok, status_code, error, checked_at)])
+
+
+def record_link_health_many(results):
+    """Upsert (url, ok, status_code, error, checked_at) rows in one transaction."""
+    now = time.time()
+    with get_conn() as conn:
+        conn.executemany(
+            """INSERT INTO link_health (url, ok, status_code, error, checked_at)
+               VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT(url) DO UPDATE SET
+                   ok = excluded.ok, status_code = excluded.status_code,
+                   error = excluded.error, checked_at = excluded.checked_at""",
+            [
+                (url, 1 if ok else 0, status_code, error, checked_at or now)
+                for url, ok, status_code, error, checked_at in results
+            ],
+        )
+        conn.commit()
+
+
+def scrape_failure_key(title: str, tmdb_id=None) -> str:
+    return f"tmdb:{tmdb_id}" if tmdb_id else f"title:{(title or '').strip().lower()}"
+
+
+def get_scrape_failure(title: str, tmdb_id=None):
+    """Recorded scrape failure for a title/tmdb_id ({attempts, failed_at}) or None."""
+    with get_conn() as conn:
+        c = conn.cursor()
+        c.execute(
+            "SELECT attempts, failed_at FROM scrape_failures WHERE key = ?",
+            (scrape_failure_key(title, tmdb_id),),
+        )
+        row = c.fetchone()
+        return dict(row) if row else None
+
+
+def record_scrape_failure(title: str, tmdb_id=None):
+    with get_conn() as conn:
+        conn.execute(
+            """INSERT INTO scrape_failures (key, title, tmdb_id, attempts, failed_at)
+               VALUES (?, ?, ?, 1, ?)
+               ON CONFLICT(key) DO UPDATE SET
+                   attempts = attempts + 1, failed_at = excluded.failed_at""",
+            (scrape_failure_key(title, tmdb_id), title, str(tmdb_id) if tmdb_id else None, time.time()),
+        )
+        conn.commit()
+
+
+def clear_scrape_failure(title: str, tmdb_id=None):
+    with get_conn() as conn:
+        conn.execute("DELETE FROM scrape_failures WHERE key = ?", (scrape_failure_key(title, tmdb_id),))
+        conn.commit()
+
 
 def get_cache_count():
     with get_conn() as conn:
@@ -182,50 +587,98 @@ def get_cached_statuses(tmdb_ids: list) -> dict:
         return {str(row["tmdb_id"]): row["embed_url"] for row in rows}
 
 
+def _movie_from_row(row):
+    # Use tmdb_id if available, otherwise generate ID from embed_url or title
+    movie_id = row["tmdb_id"]
+    if not movie_id:
+        # Extract ID from embed_url (e.g., .../217376.mp4 -> 217376)
+        match = re.search(r"/(\d+)\.mp4", row["embed_url"] or "")
+        if match:
+            movie_id = match.group(1)
+        else:
+            # Fallback: use title hash
+            movie_id = str(hash(row["title"]) % 10000000)
+
+    is_valid = row["embed_url"] and row["embed_url"] != "NOT_FOUND" 
+    return {
+        "id": movie_id,
+        "title": row["title"],
+        "poster_path": row["poster_path"],
+        "backdrop_path": row["backdrop_path"],
+        "overview": row["overview"],
+        "isAvailable": is_valid,
+        "embedUrl": row["embed_url"],
+    }
+
+
 def get_catalog_movies(limit=100, offset=0):
     """Retrieve enriched movies from the catalog (links table) locally."""
+    return get_catalog_movies_page(limit, offset)[0]
+
+
+def get_catalog_movies_page(limit=100, offset=0, cursor=None):
+    """
+    Retrieve a page of the movie catalog plus the cursor for the next page.
+
+    With a cursor (from a previous page) the query seeks straight to the
+    next row through idx_links_added_at_key; otherwise LIMIT/OFFSET is used.
+    Rows without added_at come last, ordered by id. Returns
+    (movies, next_cursor); next_cursor is None on the last page.
+    """
     with get_conn() as conn:
         conn.row_factory = sqlite3.Row
+        c = conn.cursor()
+        if cursor:
+            added_at, last_id = decode_cursor(cursor)
+            c.execute(
+                """
+                SELECT id, tmdb_id, title, embed_url, poster_path, backdrop_path, overview, added_at,
+                       COALESCE(added_at, '') AS sort_key
+                FROM links
+                WHERE COALESCE(added_at, '') <= ? AND (COALESCE(added_at, '') < ? OR id < ?)
+                ORDER BY COALESCE(added_at, '') DESC, id DESC
+                LIMIT ?
+            """,
+                (added_at, added_at, last_id, limit),
+            )
+        else:
+            c.execute(
+                """
+                SELECT id, tmdb_id, title, embed_url, poster_path, backdrop_path, overview, added_at,
+                       COALESCE(added_at, '') AS sort_key
+                FROM links
+                ORDER BY COALESCE(added_at, '') DESC, id DESC
+                LIMIT ? OFFSET ?
+            """,
+                (limit, offset),
+            )
+        rows = c.fetchall()
+
+        movies = [_movie_from_row(row) for row in rows]
+
+        next_cursor = None
+        if rows and len(rows) == limit:
+            next_cursor = encode_cursor(str(rows[-1]["sort_key"]), rows[-1]["id"])
+        return movies, next_cursor
+
+
+def iter_catalog_movies(batch_size=500):
+    """Yield every catalog movie straight off the cursor (for streamed exports)."""
+    with get_conn() as conn:
         c = conn.cursor()
         c.execute(
             """
-            SELECT tmdb_id, title, embed_url, poster_path, backdrop_path, overview
+            SELECT id, tmdb_id, title, embed_url, poster_path, backdrop_path, overview, added_at
             FROM links
-            ORDER BY added_at DESC
-            LIMIT ? OFFSET ?
-        """,
-            (limit, offset),
+            ORDER BY COALESCE(added_at, '') DESC, id DESC
+        """
         )
-        rows = c.fetchall()
-
-        movies = []
-        for row in rows:
-            # Use tmdb_id if available, otherwise generate ID from embed_url or title
-            movie_id = row["tmdb_id"]
-            if not movie_id:
-                # Extract ID from embed_url (e.g., .../217376.mp4 -> 217376)
-                import re
-
-                match = re.search(r"/(\d+)\.mp4", row["embed_url"] or "")
-                if match:
-                    movie_id = match.group(1)
-                else:
-                    # Fallback: use title hash
-                    movie_id = str(hash(row["title"]) % 10000000)
-
-            is_valid = row["embed_url"] and row["embed_url"] != "NOT_FOUND" 
-            movies.append(
-                {
-                    "id": movie_id,
-                    "title": row["title"],
-                    "poster_path": row["poster_path"],
-                    "backdrop_path": row["backdrop_path"],
-                    "overview": row["overview"],
-                    "isAvailable": is_valid,
-                    "embedUrl": row["embed_url"],
-                }
-            )
-        return movies
+        while True:
+            rows = c.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield _movie_from_row(row)
 
 
 def search_movies_locally(query: str, limit=50):
@@ -236,19 +689,39 @@ def search_movies_locally(query: str, limit=50):
     with get_conn() as conn:
         conn.row_factory = sqlite3.Row
         c = conn.cursor()
-        # Search by title, ensuring we only get items with valid embeds
-        c.execute(
-            """
-            SELECT id, tmdb_id, title, embed_url, poster_path, backdrop_path, overview, year, added_at
-            FROM links
-            WHERE title LIKE ? 
-            ORDER BY 
-              CASE WHEN title LIKE ? THEN 1 ELSE 2 END, -- Exact start match priority
-              added_at DESC
-            LIMIT ?
-        """,
-            (f"%{query}%", f"{query}%", limit),
-        )
+        if _has_fts(conn, "links_fts"):
+            match = _fts_query(query)
+            if not match:
+                return []
+            # Prefix matches on the title first, then bm25 relevance
+            c.execute(
+                f"""
+                SELECT l.id, l.tmdb_id, l.title, l.embed_url, l.poster_path, l.backdrop_path,
+                       l.overview, l.year, l.added_at
+                FROM links_fts
+                JOIN links l ON l.id = links_fts.rowid
+                WHERE links_fts MATCH ?
+                ORDER BY
+                  CASE WHEN l.title LIKE ? THEN 1 ELSE 2 END,
+                  bm25(links_fts, {", ".join(map(str, LINKS_FTS_WEIGHTS))}),
+                  l.added_at DESC
+                LIMIT ?
+            """,
+                (match, f"{query}%", limit),
+            )
+        else:
+            c.execute(
+                """
+                SELECT id, tmdb_id, title, embed_url, poster_path, backdrop_path, overview, year, added_at
+                FROM links
+                WHERE title LIKE ? 
+                ORDER BY 
+                  CASE WHEN title LIKE ? THEN 1 ELSE 2 END, -- Exact start match priority
+                  added_at DESC
+                LIMIT ?
+            """,
+                (f"%{query}%", f"{query}%", limit),
+            )
         rows = c.fetchall()
 
         results = []
@@ -277,19 +750,40 @@ def search_series_locally(query: str, limit=50):
     with get_conn() as conn:
         conn.row_factory = sqlite3.Row
         c = conn.cursor()
-        c.execute(
-            """
-            SELECT id, title, overview, poster_path, backdrop_path, tmdb_id, year, rating
-            FROM series
-            WHERE title LIKE ?
-              AND EXISTS (SELECT 1 FROM episodes e WHERE e.series_id = series.id LIMIT 1)
-            ORDER BY 
-              CASE WHEN title LIKE ? THEN 1 ELSE 2 END,
-              created_at DESC
-            LIMIT ?
-        """,
-            (f"%{query}%", f"{query}%", limit),
-        )
+        if _has_fts(conn, "series_fts"):
+            match = _fts_query(query)
+            if not match:
+                return []
+            c.execute(
+                f"""
+                SELECT s.id, s.title, s.overview, s.poster_path, s.backdrop_path, s.tmdb_id,
+                       s.year, s.rating
+                FROM series_fts
+                JOIN series s ON s.id = series_fts.rowid
+                WHERE series_fts MATCH ?
+                  AND EXISTS (SELECT 1 FROM episodes e WHERE e.series_id = s.id LIMIT 1)
+                ORDER BY
+                  CASE WHEN s.title LIKE ? THEN 1 ELSE 2 END,
+                  bm25(series_fts, {", ".join(map(str, SERIES_FTS_WEIGHTS))}),
+                  s.created_at DESC
+                LIMIT ?
+            """,
+                (match, f"{query}%", limit),
+            )
+        else:
+            c.execute(
+                """
+                SELECT id, title, overview, poster_path, backdrop_path, tmdb_id, year, rating
+                FROM series
+                WHERE title LIKE ?
+                  AND EXISTS (SELECT 1 FROM episodes e WHERE e.series_id = series.id LIMIT 1)
+                ORDER BY 
+                  CASE WHEN title LIKE ? THEN 1 ELSE 2 END,
+                  created_at DESC
+                LIMIT ?
+            """,
+                (f"%{query}%", f"{query}%", limit),
+            )
         rows = c.fetchall()
 
         results = []
@@ -314,13 +808,22 @@ def search_series_locally(query: str, limit=50):
 
 def get_catalog_series(limit=100, offset=0):
     """Retrieve series from the database (only series with at least 1 episode)."""
+    return get_catalog_series_page(limit, offset)[0]
+
+
+def get_catalog_series_page(limit=100, offset=0, cursor=None):
+    """
+    Retrieve a page of series plus the cursor for the next page.
+
+    Same contract as get_catalog_movies_page, seeking on
+    idx_series_status_created when a cursor is given.
+    """
     with get_conn() as conn:
         c = conn.cursor()
         # Only return series that have at least 1 episode
-        c.execute(
-            """
+        base = """
             SELECT s.id, s.opera_id, s.tmdb_id, s.title, s.overview, s.poster_path, 
-                   s.backdrop_path, s.year, s.genres, s.rating, s.status
+                   s.backdrop_path, s.year, s.genres, s.rating, s.status, s.created_at
             FROM series s
             WHERE s.status = 'active'
               AND EXISTS (
@@ -328,11 +831,27 @@ def get_catalog_series(limit=100, offset=0):
                   WHERE e.series_id = s.id 
                   LIMIT 1
               )
-            ORDER BY s.created_at DESC
+        """
+        if cursor:
+            created_at, last_id = decode_cursor(cursor)
+            c.execute(
+                base
+                + """
+              AND s.created_at <= ? AND (s.created_at < ? OR s.id < ?)
+            ORDER BY s.created_at DESC, s.id DESC
+            LIMIT ?
+        """,
+                (created_at, created_at, last_id, limit),
+            )
+        else:
+            c.execute(
+                base
+                + """
+            ORDER BY s.created_at DESC, s.id DESC
             LIMIT ? OFFSET ?
         """,
-            (limit, offset),
-        )
+                (limit, offset),
+            )
         rows = c.fetchall()
 
         series = []
@@ -351,7 +870,11 @@ def get_catalog_series(limit=100, offset=0):
                     "rating": row["rating"],
                 }
             )
-        return series
+
+        next_cursor = None
+        if rows and len(rows) == limit and rows[-1]["created_at"] is not None:
+            next_cursor = encode_cursor(str(rows[-1]["created_at"]), rows[-1]["id"])
+        return series, next_cursor
 
 
 def get_series_seasons(series_id):
@@ -451,6 +974,70 @@ def get_series_by_id(series_id):
         }
 
 
+def get_series_with_seasons(series_id):
+    """
+    Get a series with all of its seasons and episodes.
+
+    Builds the series -> seasons -> episodes tree from two queries on one
+    connection (the series row, then seasons LEFT JOIN episodes) instead of
+    one query per season.
+    """
+    series = get_series_by_id(series_id)
+    if not series:
+        return None
+
+    with get_conn() as conn:
+        c = conn.cursor()
+        c.execute(
+            """
+            SELECT se.id AS season_id, se.season_number, se.title AS season_title,
+                   se.overview AS season_overview, se.poster_path, se.episode_count,
+                   se.air_date AS season_air_date,
+                   e.id AS episode_id, e.episode_number, e.title, e.overview,
+                   e.still_path, e.video_url, e.video_type, e.duration, e.air_date
+            FROM seasons se
+            LEFT JOIN episodes e ON e.season_id = se.id
+            WHERE se.series_id = ?
+            ORDER BY se.season_number, e.episode_number
+        """,
+            (series_id,),
+        )
+
+        seasons = []
+        current = None
+        for row in c:
+            if current is None or current["id"] != row["season_id"]:
+                current = {
+                    "id": row["season_id"],
+                    "season_number": row["season_number"],
+                    "title": row["season_title"],
+                    "overview": row["season_overview"],
+                    "poster_path": row["poster_path"],
+                    "episode_count": row["episode_count"],
+                    "air_date": row["season_air_date"],
+                    "episodes": [],
+                }
+                seasons.append(current)
+            if row["episode_id"] is None:
+                continue
+            current["episodes"].append(
+                {
+                    "id": row["episode_id"],
+                    "episode_number": row["episode_number"],
+                    "title": row["title"],
+                    "overview": row["overview"],
+                    "still_path": row["still_path"],
+                    "video_url": row["video_url"],
+                    "video_type": row["video_type"],
+                    "duration": row["duration"],
+                    "air_date": row["air_date"],
+                }
+            )
+
+    series["seasons"] = seasons
+    return series
+
+
 def get_series_count():
     """Get total count of series (only series with at least 1 episode)."""
     with get_conn() as conn:
@@ -8,21 +8,19 @@ import sqlite3
 import os
 from datetime import datetime
 
+from database import (
+    init_catalog_indexes,
+    init_generation_triggers,
+    init_search_index,
+)
+from db_pool import get_conn as get_pooled_conn
+
 DB_PATH = os.environ.get("DB_FILE_PATH", os.path.join(os.path.dirname(__file__), "links.db"))
 
 
 def get_conn():
-    # Ensure directory exists
-    db_dir = os.path.dirname(DB_PATH)
-    if db_dir and not os.path.exists(db_dir):
-        try:
-            os.makedirs(db_dir, exist_ok=True)
-        except Exception:
-            pass
-
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    # One pooled, WAL-mode connection per thread (see db_pool)
+    return get_pooled_conn(DB_PATH)
 
 
 def init_series_tables():
@@ -97,7 +95,12 @@ def init_series_tables():
         c.execute("CREATE INDEX IF NOT EXISTS idx_episodes_series ON episodes(series_id)")
         
         conn.commit()
-        print("✅ Tabelas de séries criadas com sucesso!")
+
+    # Índices de paginação e de busca (FTS5) para a tabela series
+    init_catalog_indexes()
+    init_search_index()
+    init_generation_triggers()
+    print("✅ Tabelas de séries criadas com sucesso!")
 
 
 def save_series(opera_id, title, overview=None, poster_path=None, backdrop_path=None,
@@ -181,6 +184,131 @@ def save_episode(series_id, season_id, episode_number, title=None, overview=None
         return result[0] if result else None
 
 
+# Colunas aceitas pelos upserts em lote
+SERIES_FIELDS = ("opera_id", "title", "overview", "poster_path", "backdrop_path",
+                 "tmdb_id", "category_id", "year", "genres", "rating", "status")
+SEASON_FIELDS = ("series_id", "season_number", "title", "overview", "poster_path",
+                 "episode_count", "air_date")
+EPISODE_FIELDS = ("series_id", "season_id", "episode_number", "title", "overview",
+                  "still_path", "video_url", "video_type", "duration", "air_date", "status")
+
+# Limite seguro de parâmetros por SELECT ... IN (...)
+_IN_CHUNK = 500
+
+
+def _upsert_many(c, table, conflict, records, allowed):
+    """
+    INSERT ... ON CONFLICT DO UPDATE com executemany.
+
+    As colunas vêm das chaves de cada registro; registros com conjuntos de
+    chaves diferentes vão em executemany separados. Só as colunas presentes
+    são atualizadas no conflito, então campos omitidos (ex.: tmdb_id
+    preenchido pelo enrich) são preservados.
+    """
+    shapes = {}
+    for r in records:
+        shapes.setdefault(tuple(r), []).append(r)
+
+    unknown = sorted({col for columns in shapes for col in columns if col not in allowed})
+    if unknown:
+        raise ValueError(f"Campos desconhecidos para {table}: {', '.join(unknown)}")
+
+    for columns, group in shapes.items():
+        updates = ", ".join(f"{col}=excluded.{col}" for col in columns if col not in conflict)
+        c.executemany(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT({', '.join(conflict)}) DO " + (f"UPDATE SET {updates}" if updates else "NOTHING"),
+            [tuple(r[col] for col in columns) for r in group],
+        )
+
+
+def _select_in(c, sql, values):
+    """Roda `sql` (com um IN ({marks})) em blocos e junta as linhas"""
+    values = list(values)
+    rows = []
+    for i in range(0, len(values), _IN_CHUNK):
+        chunk = values[i:i + _IN_CHUNK]
+        c.execute(sql.format(marks=",".join("?" * len(chunk))), chunk)
+        rows.extend(c.fetchall())
+    return rows
+
+
+def _bulk_write(conn, write):
+    """Roda write(cursor) numa transação; com `conn` do chamador, o commit é dele"""
+    own = conn is None
+    if own:
+        conn = get_conn()
+    c = conn.cursor()
+    try:
+        result = write(c)
+        if own:
+            conn.commit()
+        return result
+    except Exception:
+        if own:
+            conn.rollback()
+        raise
+
+
+def save_series_bulk(records, conn=None):
+    """
+    Upsert de várias séries (dicts com campos de SERIES_FIELDS, opera_id
+    obrigatório) numa única transação. Retorna {opera_id: series_id}.
+    """
+    records = [dict(r) for r in records]
+    if not records:
+        return {}
+    now = datetime.utcnow()
+
+    def write(c):
+        _upsert_many(c, "series", ("opera_id",), [{**r, "updated_at": now} for r in records],
+                     SERIES_FIELDS + ("updated_at",))
+        rows = _select_in(c, "SELECT opera_id, id FROM series WHERE opera_id IN ({marks})",
+                          {str(r["opera_id"]) for r in records})
+        return {row[0]: row[1] for row in rows}
+
+    return _bulk_write(conn, write)
+
+
+def save_seasons_bulk(records, conn=None):
+    """
+    Upsert de várias temporadas (series_id e season_number obrigatórios).
+    Retorna {(series_id, season_number): season_id}.
+    """
+    records = [dict(r) for r in records]
+    if not records:
+        return {}
+
+    def write(c):
+        _upsert_many(c, "seasons", ("series_id", "season_number"), records, SEASON_FIELDS)
+        rows = _select_in(c, "SELECT series_id, season_number, id FROM seasons WHERE series_id IN ({marks})",
+                          {r["series_id"] for r in records})
+        return {(row[0], row[1]): row[2] for row in rows}
+
+    return _bulk_write(conn, write)
+
+
+def save_episodes_bulk(records, conn=None):
+    """
+    Upsert de vários episódios (series_id, season_id e episode_number
+    obrigatórios). Retorna {(series_id, season_id, episode_number): episode_id}.
+    """
+    records = [dict(r) for r in records]
+    if not records:
+        return {}
+
+    def write(c):
+        _upsert_many(c, "episodes", ("series_id", "season_id", "episode_number"), records, EPISODE_FIELDS)
+        rows = _select_in(
+            c,
+            "SELECT series_id, season_id, episode_number, id FROM episodes WHERE season_id IN ({marks})",
+            {r["season_id"] for r in records},
+        )
+        return {(row[0], row[1], row[2]): row[3] for row in rows}
+
+    return _bulk_write(conn, write)
+
+
 def get_series_with_episodes():
     """Retorna séries com contagem de episódios"""
     with get_conn() as conn:
@@ -0,0 +1,126 @@
+"""
+Shared SQLite connection layer.
+
+Every module that talks to links.db (API, daemons, scrapers) goes through
+get_conn(), which hands out one long-lived connection per thread instead of
+opening a new one on every call. Connections run in WAL mode so readers are
+never blocked by the poster_daemon / repair_catalog writers.
+"""
+
+import os
+import sqlite3
+import threading
+
+DB_PATH = os.environ.get("DB_FILE_PATH", os.path.join(os.path.dirname(__file__), "links.db"))
+
+# Tuning (overridable through the environment)
+BUSY_TIMEOUT_MS = int(os.environ.get("DB_BUSY_TIMEOUT_MS", 15000))
+MMAP_SIZE = int(os.environ.get("DB_MMAP_SIZE", 256 * 1024 * 1024))
+CACHE_SIZE_KB = int(os.environ.get("DB_CACHE_SIZE_KB", 16000))
+CACHED_STATEMENTS = int(os.environ.get("DB_CACHED_STATEMENTS", 256))
+
+_local = threading.local()
+_dirs_checked = set()
+_dirs_lock = threading.Lock()
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    Connection that survives close().
+
+    Legacy callers do `conn = get_conn(); ...; conn.close()`. Closing the
+    shared per-thread connection would force a reconnect on the next call, so
+    close() only rolls back whatever the caller left uncommitted (the same
+    thing a real close does) and keeps the handle open.
+
+    Every get_conn() in a thread returns this same handle, so a helper
+    closing it must not roll back its caller's open transaction: get_conn()
+    counts holders, close() and the `with` block release one, and only the
+    last holder's close() rolls back.
+    """
+
+    holders = 0
+
+    def close(self):
+        self.holders = max(self.holders - 1, 0)
+        if self.holders:
+            return
+        if self.in_transaction:
+            self.rollback()
+        # Callers sometimes swap the row factory; restore the default
+        self.row_factory = sqlite3.Row
+
+    def __exit__(self, *exc):
+        try:
+            return super().__exit__(*exc)
+        finally:
+            self.holders = max(self.holders - 1, 0)
+
+    def really_close(self):
+        super().close()
+
+
+def _ensure_dir(path):
+    # Ensure directory exists (critical for Railway Volumes), once per path
+    db_dir = os.path.dirname(path)
+    if not db_dir or db_dir in _dirs_checked:
+        return
+    with _dirs_lock:
+        if db_dir in _dirs_checked:
+            return
+        try:
+            os.makedirs(db_dir, exist_ok=True)
+        except Exception:
+            pass  # Handle permissions or other issues gracefully
+        _dirs_checked.add(db_dir)
+
+
+def _open(path):
+    _ensure_dir(path)
+    conn = sqlite3.connect(
+        path,
+        timeout=BUSY_TIMEOUT_MS / 1000.0,
+        cached_statements=CACHED_STATEMENTS,
+        factory=PooledConnection,
+    )
+    conn.row_factory = sqlite3.Row
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+    except sqlite3.OperationalError:
+        pass  # Another process holds the lock while switching; WAL is persistent anyway
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+    conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KB}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+def get_conn(path=None):
+    """
+    Return this thread's connection to `path` (defaults to DB_PATH).
+
+    Works both as `with get_conn() as conn:` (commit/rollback on exit) and as
+    a plain handle. Connections are also keyed by pid so a forked worker never
+    reuses its parent's handle.
+    """
+    path = path or DB_PATH
+    pid = os.getpid()
+    conns = getattr(_local, "conns", None)
+    if conns is None or getattr(_local, "pid", None) != pid:
+        conns = _local.conns = {}
+        _local.pid = pid
+
+    conn = conns.get(path)
+    if conn is None:
+        conn = conns[path] = _open(path)
+    conn.holders += 1
+    return conn
+
+
+def close_conn(path=None):
+    """Really close this thread's connection (shutdown, tests)."""
+    conns = getattr(_local, "conns", None) or {}
+    conn = conns.pop(path or DB_PATH, None)
+    if conn is not None:
+        conn.really_close()
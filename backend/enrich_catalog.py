@@ -1,14 +1,5 @@
-import sqlite3
-import os
-import requests
-import time
 from database import get_conn, save_embed
-
-# Reuse TMDB logic or import? Better to import if possible, but bulk_scrape_tmdb has mixed logic.
-# Let's simple implementation here for clarity.
-
-TMDB_API_KEY = "909fc389a150847bdd4ffcd92809cff7"
-BASE_URL = "https://api.themoviedb.org/3"
+from tmdb_client import search_movie
 
 
 def clean_title(title):
@@ -22,34 +13,8 @@ def clean_title(title):
 
 
 def search_tmdb(title, year=None):
-    try:
-        cleaned_title = clean_title(title)
-        url = f"{BASE_URL}/search/movie"
-
-        # Try with year first if provided
-        params = {
-            "api_key": TMDB_API_KEY,
-            "query": cleaned_title,
-            "language": "pt-BR",
-            "page": 1,
-        }
-        if year:
-            params["year"] = year
-
-        res = requests.get(url, params=params)
-        data = res.json()
-
-        # If no result with year, try without year
-        if not data.get("results") and year:
-            del params["year"]
-            res = requests.get(url, params=params)
-            data = res.json()
-
-        if data.get("results"):
-            return data["results"][0]
-    except Exception as e:
-        print(f"Error searching TMDB: {e}")
-    return None
+    # Cached, rate-limited TMDB search; retries without the year by itself
+    return search_movie(clean_title(title), year)
 
 
 def enrich_catalog():
@@ -228,8 +193,6 @@ def enrich_catalog():
             else:
                 print("  -> No TMDB match found.")
 
-            time.sleep(0.5)
-
     finally:
         scraper.stop_session()
         conn.close()
@@ -0,0 +1,112 @@
+"""
+Poster enrichment queue.
+
+save_embed() queues a title (work_items kind "enrich") whenever it leaves a
+playable link without a poster; poster_daemon claims only items that are
+due instead of rescanning links every cycle. A title TMDB could not match
+goes back to the queue with exponential backoff, so known-bad titles are
+retried hours or days later rather than every minute, and every attempt is
+recorded in enrich_attempts:
+
+    enqueue_enrichment("Interestelar")
+    item = claim_enrichment(owner)
+    ...
+    finish_attempt(item, owner, "no_match", score=0.4)
+"""
+
+import logging
+import os
+import sqlite3
+import time
+
+import work_items
+from database import get_conn
+
+ENRICH_KIND = "enrich"
+# Retry delay after the n-th failed attempt: BASE * 2^(n-1), capped at MAX
+ENRICH_BACKOFF_BASE = int(os.environ.get("ENRICH_BACKOFF_BASE", 30 * 60))
+ENRICH_BACKOFF_MAX = int(os.environ.get("ENRICH_BACKOFF_MAX", 7 * 24 * 3600))
+ENRICH_LEASE_SECONDS = int(os.environ.get("ENRICH_LEASE_SECONDS", 300))
+
+# Outcomes that end the item; anything else is retried with backoff
+SUCCESS_OUTCOMES = ("matched", "resolved")
+
+
+def init_enrichment_tables():
+    work_items.init_work_items_table()
+    with get_conn() as conn:
+        c = conn.cursor()
+        c.execute(
+            """CREATE TABLE IF NOT EXISTS enrich_attempts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                attempt INTEGER NOT NULL,
+                outcome TEXT NOT NULL,
+                score REAL,
+                tmdb_id TEXT,
+                attempted_at REAL NOT NULL
+            )"""
+        )
+        c.execute("CREATE INDEX IF NOT EXISTS idx_enrich_attempts_title ON enrich_attempts(title, attempted_at)")
+        conn.commit()
+
+
+def backoff_delay(attempts: int) -> int:
+    return min(ENRICH_BACKOFF_BASE * 2 ** max(attempts - 1, 0), ENRICH_BACKOFF_MAX)
+
+
+def enqueue_enrichment(titles):
+    """
+    Queue title(s) for enrichment. Titles already waiting keep their backoff;
+    titles enriched before are queued again.
+    """
+    if isinstance(titles, str):
+        titles = [titles]
+    try:
+        return work_items.enqueue(ENRICH_KIND, [(t, 0) for t in titles if t])
+    except sqlite3.OperationalError as e:
+        # Tables not created yet (init_db never ran against this database)
+        logging.debug(f"Enrichment queue unavailable: {e}")
+        return 0
+
+
+def claim_enrichment(owner, limit=1):
+    """Up to `limit` due items, best first."""
+    claimed = []
+    while len(claimed) < limit:
+        item = work_items.claim(ENRICH_KIND, owner, lease_seconds=ENRICH_LEASE_SECONDS)
+        if item is None:
+            break
+        claimed.append(item)
+    return claimed
+
+
+def record_attempt(title, attempt, outcome, score=None, tmdb_id=None):
+    with get_conn() as conn:
+        conn.execute(
+            """INSERT INTO enrich_attempts (title, attempt, outcome, score, tmdb_id, attempted_at)
+               VALUES (?, ?, ?, ?, ?, ?)""",
+            (title, attempt, outcome, score, tmdb_id, time.time()),
+        )
+        conn.commit()
+
+
+def finish_attempt(item, owner, outcome, score=None, tmdb_id=None):
+    """Record the attempt and complete the item, or requeue it with backoff."""
+    record_attempt(item["key"], item["attempts"], outcome, score, tmdb_id)
+    if outcome in SUCCESS_OUTCOMES:
+        work_items.complete(item, owner)
+    else:
+        work_items.retry(item, owner, delay=backoff_delay(item["attempts"]), error=outcome)
+
+
+def get_attempts(title):
+    """Attempt history of one title, oldest first."""
+    with get_conn() as conn:
+        c = conn.cursor()
+        c.execute(
+            """SELECT attempt, outcome, score, tmdb_id, attempted_at FROM enrich_attempts
+               WHERE title = ? ORDER BY attempted_at""",
+            (title,),
+        )
+        return [dict(row) for row in c.fetchall()]
@@ -9,7 +9,7 @@ import os
 
 sys.path.insert(0, os.path.dirname(__file__))
 
-from database import get_conn, save_embed
+from database import canonical_key, extract_source_video_id, get_conn, save_embed
 from opera_catalog_browser import OperaCatalogBrowser
 import time
 
@@ -75,8 +75,8 @@ def fill_missing_links():
                     conn = get_conn()
                     c = conn.cursor()
                     c.execute(
-                        "UPDATE links SET embed_url = ?, original_raw_title = ? WHERE id = ?",
-                        (video_url, result["scraped_title"], link_id),
+                        "UPDATE links SET embed_url = ?, source_video_id = ?, original_raw_title = ?, canonical_key = ? WHERE id = ?",
+                        (video_url, extract_source_video_id(video_url), result["scraped_title"], canonical_key(result["scraped_title"]), link_id),
                     )
                     conn.commit()
                     conn.close()
@@ -50,7 +50,9 @@ def fix_posters():
         query = """
             SELECT l.title, l.tmdb_id, l.embed_url, c.year, c.raw_title
             FROM links l
-            LEFT JOIN catalog_raw c ON (l.title = c.raw_title OR l.original_raw_title = c.raw_title)
+            LEFT JOIN catalog_raw c ON c.id = (
+                SELECT MIN(id) FROM catalog_raw WHERE canonical_key = l.canonical_key
+            )
             WHERE (l.poster_path IS NULL OR l.poster_path = '')
               AND l.embed_url IS NOT NULL 
               AND l.embed_url != 'NOT_FOUND'
@@ -10,40 +10,22 @@ import os
 sys.path.insert(0, os.path.dirname(__file__))
 
 from database import get_conn
-import requests
-import time
-
-TMDB_API_KEY = "909fc389a150847bdd4ffcd92809cff7"
+from tmdb_client import search_movie
 
 
 def search_movie_by_name(title):
-    """Busca filme no TMDB por nome"""
-    try:
-        url = "https://api.themoviedb.org/3/search/movie"
-        params = {
-            "api_key": TMDB_API_KEY,
-            "query": title,
-            "language": "pt-BR",
-            "page": 1,
+    """Busca filme no TMDB por nome (cache + rate limit em tmdb_client)"""
+    # Pega o primeiro resultado
+    movie = search_movie(title)
+    if movie:
+        return {
+            "id": str(movie["id"]),
+            "title": movie["title"],
+            "poster_path": movie.get("poster_path"),
+            "backdrop_path": movie.get("backdrop_path"),
+            "overview": movie.get("overview"),
+            "vote_average": movie.get("vote_average"),
         }
-
-        response = requests.get(url, params=params, timeout=10)
-        data = response.json()
-
-        if data.get("results") and len(data["results"]) > 0:
-            # Pega o primeiro resultado
-            movie = data["results"][0]
-            return {
-                "id": str(movie["id"]),
-                "title": movie["title"],
-                "poster_path": movie.get("poster_path"),
-                "backdrop_path": movie.get("backdrop_path"),
-                "overview": movie.get("overview"),
-                "vote_average": movie.get("vote_average"),
-            }
-    except Exception as e:
-        print(f"   ⚠️  Erro: {e}")
-
     return None
 
 
@@ -117,7 +99,6 @@ def fix_missing_posters():
         else:
             print(f"   ❌ Não encontrado por nome")
 
-        time.sleep(0.5)  # Respeitar rate limit
 
     print("\n" + "=" * 80)
     print("📊 RESUMO")
@@ -5,12 +5,14 @@ Handles popups, better timeouts, flexible title matching
 
 import logging
 import urllib.parse
-import time
 import re
-import unicodedata
-from difflib import SequenceMatcher
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
 
+import resource_blocking
+from opera_session import SEARCH_INPUT, SEARCH_URL, new_context, open_logged_in
+from title_match import normalize_title, similarity
+from video_capture import VideoCapture
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,11 +24,15 @@ class ImprovedOperaScraper:
     - Busca flexível com variações de título
     """
 
+    # Requests to skip (see resource_blocking.PROFILES)
+    block_profile = "scrape"
+
     def __init__(self):
         self.playwright = None
         self.browser = None
         self.context = None
         self.page = None
+        self.video_capture = None
         self.is_running = False
 
     def start_session(self, headless=True):
@@ -35,42 +41,22 @@ class ImprovedOperaScraper:
             logger.info("[Improved Opera] Starting session...")
             self.playwright = sync_playwright().start()
             self.browser = self.playwright.chromium.launch(headless=headless)
-            self.context = self.browser.new_context(
+            self.context = new_context(
+                self.browser,
                 user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
                 viewport={"width": 1920, "height": 1080},
             )
+            resource_blocking.install(self.context, self.block_profile)
             self.page = self.context.new_page()
+            self.video_capture = VideoCapture(self.page)
             self.is_running = True
 
-            # Login
-            base_url = "http://web.operatopzera.net/#/"
-            logger.info(f"[Improved Opera] Navigating to {base_url}")
-            self.page.goto(base_url, timeout=60000)
-            self.page.wait_for_load_state("networkidle", timeout=60000)
-
-            # Handle login
-            try:
-                login_selector = "input[name='username']"
-                if self.page.locator(login_selector).is_visible(timeout=5000):
-                    logger.info("[Improved Opera] Logging in...")
-                    self.page.fill("input[name='username']", "t2TGgarYJ")
-                    self.page.fill("input[name='password']", "66e74xKRJ")
-                    self.page.click("button:has-text('Login')")
-                    self.page.wait_for_url("**/#/", timeout=30000)
-                    time.sleep(3)
-                    logger.info("[Improved Opera] Login successful")
-            except Exception as e:
-                logger.warning(f"[Improved Opera] Login warning: {e}")
-
-            # Navigate to search page
-            search_url = "http://web.operatopzera.net/#/movie/search/"
-            self.page.goto(search_url, timeout=30000)
+            # Login só acontece se o estado salvo expirou
+            logger.info(f"[Improved Opera] Navigating to {SEARCH_URL}")
+            open_logged_in(self.page, SEARCH_URL, SEARCH_INPUT)
 
             # Handle any initial popups/modals
             self._close_popups()
-
-            INPUT_SELECTOR = "input[placeholder='Search stream...']"
-            self.page.wait_for_selector(INPUT_SELECTOR, state="visible", timeout=15000)
             logger.info("[Improved Opera] Session ready")
 
         except Exception as e:
@@ -124,7 +110,7 @@ class ImprovedOperaScraper:
                     if self.page.locator(selector).is_visible(timeout=1000):
                         self.page.click(selector, timeout=2000)
                         logger.info(f"[Improved Opera] Closed popup: {selector}")
-                        time.sleep(0.5)
+                        self.page.wait_for_timeout(500)
                 except:
                     pass
         except:
@@ -132,12 +118,7 @@ class ImprovedOperaScraper:
 
     def _normalize_title(self, title):
         """Normaliza título para comparação (remove acentos, lowercase)"""
-        # Remove acentos
-        normalized = unicodedata.normalize("NFKD", title)
-        normalized = "".join([c for c in normalized if not unicodedata.combining(c)])
-        # Remove caracteres especiais e converte para lowercase
-        normalized = re.sub(r"[^\w\s]", "", normalized.lower())
-        return normalized.strip()
+        return normalize_title(title)
 
     def _generate_title_variations(self, title):
         """Gera variações do título para busca"""
@@ -162,16 +143,8 @@ class ImprovedOperaScraper:
         return list(set(variations))  # Remove duplicatas
 
     def _calculate_similarity(self, str1, str2):
-        """Calcula similaridade entre strings"""
-        s1 = self._normalize_title(str1)
-        s2 = self._normalize_title(str2)
-
-        # Se um contém o outro, é match forte
-        if s1 in s2 or s2 in s1:
-            return max(len(s1), len(s2)) / max(len(s1), len(s2)) * 0.9
-
-        # Usa SequenceMatcher
-        return SequenceMatcher(None, s1, s2).ratio()
+        """Calcula similaridade entre strings (um contém o outro = match forte)"""
+        return similarity(str1, str2, containment_score=0.9)
 
     def _extract_video_id(self, url):
         """Extrai ID do vídeo do URL jt0x"""
@@ -248,12 +221,12 @@ class ImprovedOperaScraper:
 
                 # Clear and type search
                 self.page.fill(INPUT_SELECTOR, "")
-                time.sleep(0.3)
+                self.page.wait_for_timeout(300)
                 self.page.fill(INPUT_SELECTOR, title_variation)
-                time.sleep(0.3)
+                self.page.wait_for_timeout(300)
 
                 self.page.keyboard.press("Enter")
-                time.sleep(2)
+                self.page.wait_for_timeout(2000)
 
                 # Close any popups that appeared
                 self._close_popups()
@@ -317,6 +290,8 @@ class ImprovedOperaScraper:
                     # Try to click with multiple strategies
                     click_success = False
 
+                    self.video_capture.reset()
+
                     # Strategy 1: Normal click
                     try:
                         best_match.click(timeout=5000)
@@ -345,7 +320,6 @@ class ImprovedOperaScraper:
                         result["error"] = f"Failed to click on movie card"
                         continue
 
-                    time.sleep(3)
                     self._close_popups()
 
                     # Extract video URL
@@ -390,7 +364,7 @@ class ImprovedOperaScraper:
         return result
 
     def _extract_video_from_page(self) -> str:
-        """Extrai URL do vídeo com retry"""
+        """Extrai URL do vídeo interceptando a requisição do player (com retry)"""
         video_url = None
         max_attempts = 3
 
@@ -400,7 +374,7 @@ class ImprovedOperaScraper:
                 self._close_popups()
 
                 # Try to find and click play button if not on play page
-                if "/play/" not in self.page.url:
+                if "/play/" not in self.page.url and not self.video_capture.url:
                     play_selectors = [
                         "a[href*='/play/']",
                         "button:has-text('Play')",
@@ -417,48 +391,28 @@ class ImprovedOperaScraper:
                                     f"[Improved Opera] Clicking play button: {selector}"
                                 )
                                 btn.click(timeout=5000)
-                                time.sleep(3)
                                 break
                         except:
                             continue
 
-                # Wait for video
-                self.page.wait_for_selector("video", timeout=15000)
-
-                # Try to get video src
-                for _ in range(10):
-                    src = self.page.evaluate("""
-                        () => {
-                            const video = document.querySelector('video');
-                            return video ? video.src : null;
-                        }
-                    """)
-
-                    if src and src.startswith("http") and "blob" not in src:
-                        video_url = src
-                        break
-
-                    time.sleep(1)
-
+                # Resolve as soon as the player requests the .mp4/.m3u8
+                video_url = self.video_capture.wait()
                 if video_url:
                     break
 
                 # Try iframe fallback
-                if not video_url:
-                    try:
-                        iframe = self.page.query_selector("iframe")
-                        if iframe:
-                            src = iframe.get_attribute("src")
-                            if src and src.startswith("http"):
-                                video_url = src
-                                break
-                    except:
-                        pass
+                try:
+                    iframe = self.page.query_selector("iframe")
+                    if iframe:
+                        src = iframe.get_attribute("src")
+                        if src and src.startswith("http"):
+                            video_url = src
+                            break
+                except:
+                    pass
 
             except Exception as e:
                 logger.error(f"[Improved Opera] Attempt {attempt + 1} failed: {e}")
-                if attempt < max_attempts - 1:
-                    time.sleep(2)
                 continue
 
         return video_url
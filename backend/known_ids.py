@@ -0,0 +1,151 @@
+"""
+In-memory set of catalog ids the long-running scrapers already have.
+
+The continuous scrapers see hundreds of cards per scroll; instead of asking
+SQLite about each one they check this set, built once from
+links.source_video_id and updated as items are saved:
+
+    known = get_known_ids()
+    if known.has("movie", movie_id): ...
+    save_embed(...); known.add("movie", extract_source_video_id(video_url))
+    known.save()
+
+Only a miss goes to the database (one indexed lookup), so an item another
+scraper saved after this set was loaded is still skipped, and is added to
+the set.
+
+The set is an exact one (a Bloom filter's false positives would silently
+skip new titles) and is persisted as a gzipped JSON file, so a restart
+skips the rebuild. On load the file is checked against the database: if
+the number of distinct ids differs (another process saved items this set
+never saw, or rows were deleted) or the file is older than
+KNOWN_IDS_MAX_AGE, the set is rebuilt from the database.
+"""
+
+import gzip
+import json
+import logging
+import os
+import time
+
+from database import get_conn
+
+KNOWN_IDS_PATH = os.environ.get(
+    "KNOWN_IDS_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "known_ids.json.gz"),
+)
+KNOWN_IDS_MAX_AGE = int(os.environ.get("KNOWN_IDS_MAX_AGE", 24 * 3600))
+
+KINDS = ("movie",)
+# Confirms a set miss against the database
+KIND_LOOKUPS = {
+    "movie": "SELECT 1 FROM links WHERE source_video_id = ? LIMIT 1",
+}
+
+
+def db_id_counts():
+    """Distinct ids per kind currently in the database (index-only scan)."""
+    with get_conn() as conn:
+        c = conn.cursor()
+        c.execute("SELECT COUNT(DISTINCT source_video_id) FROM links")
+        return {"movie": c.fetchone()[0]}
+
+
+class KnownIds:
+    def __init__(self, path=KNOWN_IDS_PATH):
+        self.path = path
+        self.built_at = None
+        self._ids = {kind: set() for kind in KINDS}
+        self._dirty = False
+
+    def has(self, kind, item_id) -> bool:
+        item_id = str(item_id)
+        if item_id in self._ids[kind]:
+            return True
+        # Saved by another process since the set was loaded?
+        with get_conn() as conn:
+            c = conn.cursor()
+            c.execute(KIND_LOOKUPS[kind], (item_id,))
+            found = c.fetchone() is not None
+        if found:
+            self.add(kind, item_id)
+        return found
+
+    def add(self, kind, item_id):
+        if item_id is None:
+            return
+        item_id = str(item_id)
+        if item_id not in self._ids[kind]:
+            self._ids[kind].add(item_id)
+            self._dirty = True
+
+    def __len__(self):
+        return sum(len(ids) for ids in self._ids.values())
+
+    def rebuild(self):
+        """Reload every id from the database."""
+        with get_conn() as conn:
+            c = conn.cursor()
+            c.execute("SELECT source_video_id FROM links WHERE source_video_id IS NOT NULL")
+            movies = {row[0] for row in c.fetchall()}
+        self._ids = {"movie": movies}
+        self.built_at = time.time()
+        self._dirty = True
+        logging.info(f"Known ids rebuilt from DB: {len(movies)} movies")
+
+    def _load_file(self) -> bool:
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if time.time() - data.get("built_at", 0) > KNOWN_IDS_MAX_AGE:
+            return False
+        ids = {kind: set(data.get(kind, [])) for kind in KINDS}
+        # Every id in the file was saved to the DB first, so equal sizes
+        # mean nothing was added (or removed) behind this set's back
+        if {kind: len(v) for kind, v in ids.items()} != db_id_counts():
+            return False
+        self.built_at = data["built_at"]
+        self._ids = ids
+        self._dirty = False
+        return True
+
+    def save(self):
+        """Write the set atomically (no-op if nothing changed)."""
+        if not self._dirty:
+            return
+        data = {
+            "built_at": self.built_at,
+            **{kind: sorted(ids) for kind, ids in self._ids.items()},
+        }
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with gzip.open(tmp, "wt", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+            self._dirty = False
+        except OSError as e:
+            logging.warning(f"Could not save known ids to {self.path}: {e}")
+
+    @classmethod
+    def load(cls, path=KNOWN_IDS_PATH):
+        """From the persisted file when still current, else from the database."""
+        known = cls(path)
+        if known._load_file():
+            logging.info(f"Known ids loaded from {path}: {len(known)} ids")
+        else:
+            known.rebuild()
+            known.save()
+        return known
+
+
+_known = None
+
+
+def get_known_ids():
+    """Process-wide KnownIds, loaded on first use."""
+    global _known
+    if _known is None:
+        _known = KnownIds.load()
+    return _known
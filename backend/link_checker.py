@@ -0,0 +1,168 @@
+"""
+Concurrent link-health checker.
+
+Checks many embed/video URLs at once. The HTTP requests themselves are
+ordinary blocking `requests` calls running on a thread pool of
+LINK_CHECK_CONCURRENCY threads; an asyncio loop only schedules them,
+enforcing the global cap and a per-host limit so one slow CDN can't take
+every slot (and no host sees more than LINK_CHECK_PER_HOST requests at a
+time). Each host gets its own keep-alive requests.Session, shared with
+single checks (validator.validate_embed, scraper).
+
+A URL is first checked with HEAD; hosts that reject HEAD (403/405/501, or
+a dropped connection) get a GET for the first KB only
+(Range: bytes=0-1023). Results go to the link_health table that
+validator.validate_embed_cached reads:
+
+    results = check_urls(urls)           # {url: (ok, status_code, error)}
+    ok, status, error = check_url(url)   # one URL, not recorded
+
+Revalidating the catalog runs as a background job:
+
+    python link_checker.py --max-age 21600
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from database import get_conn, record_link_health_many
+
+CONCURRENCY = int(os.environ.get("LINK_CHECK_CONCURRENCY", 32))
+PER_HOST = int(os.environ.get("LINK_CHECK_PER_HOST", 4))
+REQUEST_TIMEOUT = (5, 10)
+# Results are written to link_health in batches of this size
+WRITE_BATCH = 200
+
+HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
+OK_STATUSES = (200, 206)
+# HEAD not allowed/implemented here: retry with a ranged GET
+HEAD_REJECTED = (403, 405, 501)
+RANGE_HEADER = {"Range": "bytes=0-1023"}
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def _host(url: str) -> str:
+    return (urlsplit(url).hostname or "").lower()
+
+
+def _session_for(host: str) -> requests.Session:
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(HEADERS)
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=PER_HOST)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[host] = session
+        return session
+
+
+def _ranged_get(session, url):
+    with session.get(url, headers=RANGE_HEADER, timeout=REQUEST_TIMEOUT,
+                     allow_redirects=True, stream=True) as r:
+        return r.status_code
+
+
+def check_url(url: str):
+    """Check one URL (HEAD, then ranged GET if needed) -> (ok, status_code, error)."""
+    session = _session_for(_host(url))
+    try:
+        status = session.head(url, timeout=REQUEST_TIMEOUT, allow_redirects=True).status_code
+    except requests.RequestException:
+        status = None
+    try:
+        if status is None or status in HEAD_REJECTED:
+            status = _ranged_get(session, url)
+        return status in OK_STATUSES, status, None
+    except Exception as e:
+        return False, status, str(e)[:200]
+
+
+async def check_many(urls, record=True, concurrency=CONCURRENCY, per_host=PER_HOST):
+    """Check `urls` concurrently; returns {url: (ok, status_code, error)}."""
+    urls = list(dict.fromkeys(u for u in urls if u))
+    loop = asyncio.get_running_loop()
+    limit = asyncio.Semaphore(concurrency)
+    host_limits = {}
+    results = {}
+    pending_writes = []
+
+    def flush():
+        if record and pending_writes:
+            record_link_health_many(pending_writes)
+        pending_writes.clear()
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="link-check") as pool:
+
+        async def one(url):
+            host_limit = host_limits.setdefault(_host(url), asyncio.Semaphore(per_host))
+            # Host slot first, so tasks queued behind a busy host don't hold global slots
+            async with host_limit, limit:
+                result = await loop.run_in_executor(pool, check_url, url)
+            results[url] = result
+            pending_writes.append((url, *result, time.time()))
+            if len(pending_writes) >= WRITE_BATCH:
+                flush()
+
+        await asyncio.gather(*(one(url) for url in urls))
+    flush()
+    return results
+
+
+def check_urls(urls, record=True):
+    """Blocking wrapper around check_many (for scripts and threads without a loop)."""
+    return asyncio.run(check_many(urls, record=record))
+
+
+def get_stale_links(max_age=None):
+    """Playable embed URLs never checked, or last checked more than max_age seconds ago."""
+    query = """
+        SELECT DISTINCT l.embed_url FROM links l
+        LEFT JOIN link_health h ON h.url = l.embed_url
+        WHERE l.embed_url IS NOT NULL AND l.embed_url != 'NOT_FOUND'
+    """
+    params = ()
+    if max_age is not None:
+        query += " AND (h.checked_at IS NULL OR h.checked_at < ?)"
+        params = (time.time() - max_age,)
+    with get_conn() as conn:
+        c = conn.cursor()
+        c.execute(query, params)
+        return [row[0] for row in c.fetchall()]
+
+
+def revalidate_catalog(max_age=None):
+    """Check every (stale) catalog link and record the results. Returns counts."""
+    urls = get_stale_links(max_age)
+    logging.info(f"🔗 Revalidating {len(urls)} links...")
+    started = time.time()
+    results = check_urls(urls)
+    ok = sum(1 for r in results.values() if r[0])
+    logging.info(
+        f"✅ {ok} ok, ❌ {len(results) - ok} broken in {time.time() - started:.0f}s"
+    )
+    return {"checked": len(results), "ok": ok, "broken": len(results) - ok}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Revalida os links do catálogo")
+    parser.add_argument(
+        "--max-age", type=int, default=None,
+        help="Só verifica links checados há mais de N segundos (padrão: todos)",
+    )
+    args = parser.parse_args()
+    revalidate_catalog(args.max_age)
@@ -5,9 +5,11 @@ Navega pelo catálogo diretamente e extrai links com IDs fixos
 
 import logging
 import re
-import time
 from playwright.sync_api import sync_playwright
 
+import resource_blocking
+from opera_session import SEARCH_INPUT, SEARCH_URL, new_context, open_logged_in
+
 logger = logging.getLogger(__name__)
 
 
@@ -21,6 +23,9 @@ class OperaCatalogBrowser:
     5. Extrai MP4
     """
 
+    # Requests to skip (see resource_blocking.PROFILES)
+    block_profile = "catalog"
+
     def __init__(self):
         self.playwright = None
         self.browser = None
@@ -35,29 +40,18 @@ class OperaCatalogBrowser:
             logger.info("[Catalog Browser] Starting session...")
             self.playwright = sync_playwright().start()
             self.browser = self.playwright.chromium.launch(headless=headless)
-            self.context = self.browser.new_context(
+            self.context = new_context(
+                self.browser,
                 user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
                 viewport={"width": 1920, "height": 1080},
             )
+            resource_blocking.install(self.context, self.block_profile)
             self.page = self.context.new_page()
             self.is_running = True
 
-            # Login
-            logger.info("[Catalog Browser] Navigating to home...")
-            self.page.goto(self.base_url, timeout=60000)
-            self.page.wait_for_load_state("networkidle", timeout=60000)
-
-            # Handle login
-            try:
-                if self.page.locator("input[name='username']").is_visible(timeout=5000):
-                    logger.info("[Catalog Browser] Logging in...")
-                    self.page.fill("input[name='username']", "t2TGgarYJ")
-                    self.page.fill("input[name='password']", "66e74xKRJ")
-                    self.page.click("button:has-text('Login')")
-                    self.page.wait_for_url("**/#/", timeout=30000)
-                    time.sleep(2)
-            except:
-                pass
+            # Reaproveita o login salvo; só loga de novo se o formulário aparecer
+            logger.info("[Catalog Browser] Opening search page...")
+            open_logged_in(self.page, SEARCH_URL, SEARCH_INPUT)
 
             logger.info("[Catalog Browser] Session ready!")
             return True
@@ -102,7 +96,7 @@ class OperaCatalogBrowser:
         logger.info(f"[Catalog Browser] Navigating to: {search_url}")
         self.page.goto(search_url, timeout=30000)
         self.page.wait_for_load_state("load", timeout=15000)
-        time.sleep(2)
+        self.page.wait_for_timeout(2000)
 
         # Try variations of the title
         variations = [
@@ -123,11 +117,11 @@ class OperaCatalogBrowser:
                     "input[placeholder='Search stream...']"
                 )
                 search_input.fill("")
-                time.sleep(0.3)
+                self.page.wait_for_timeout(300)
                 search_input.fill(variation)
-                time.sleep(0.3)
+                self.page.wait_for_timeout(300)
                 self.page.keyboard.press("Enter")
-                time.sleep(3)
+                self.page.wait_for_timeout(3000)
 
                 # Get results
                 cards = self.page.locator(
@@ -161,7 +155,7 @@ class OperaCatalogBrowser:
                                     f"[Catalog Browser] Navigating to play page..."
                                 )
                                 self.page.goto(play_url, timeout=15000)
-                                time.sleep(3)
+                                self.page.wait_for_timeout(3000)
 
                                 # Extract video URL
                                 video_url = None
@@ -175,7 +169,7 @@ class OperaCatalogBrowser:
                                     if src and src.startswith("http") and ".mp4" in src:
                                         video_url = src
                                         break
-                                    time.sleep(1)
+                                    self.page.wait_for_timeout(1000)
 
                                 if video_url:
                                     logger.info(
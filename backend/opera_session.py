@@ -0,0 +1,83 @@
+"""
+Shared login state for the Opera (web.operatopzera.net) scrapers.
+
+Logging in takes 10-20s per browser, so the authenticated cookies and
+localStorage are saved to STORAGE_STATE_PATH after a successful login and
+loaded into every new context. A scraper only goes through the login form
+again when the site actually shows it (expired or missing state):
+
+    context = new_context(browser, user_agent=UA)
+    page = context.new_page()
+    open_logged_in(page, SEARCH_URL, SEARCH_INPUT)
+"""
+
+import logging
+import os
+import threading
+
+BASE_URL = "http://web.operatopzera.net/#/"
+MOVIES_URL = BASE_URL + "movie/"
+SEARCH_URL = BASE_URL + "movie/search/"
+
+USER = "t2TGgarYJ"
+PASS = "66e74xKRJ"
+
+LOGIN_INPUT = "input[name='username']"
+SEARCH_INPUT = "input[placeholder='Search stream...']"
+MOVIE_CARD = "a[href*='/movie/category/'][href*='/info/']"
+
+STORAGE_STATE_PATH = os.environ.get(
+    "OPERA_STORAGE_STATE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "opera_state.json"),
+)
+
+# Serializes logins within a process so pooled sessions don't all log in at once
+_login_lock = threading.Lock()
+
+
+def new_context(browser, **options):
+    """browser.new_context() preloaded with the saved login state, if any."""
+    if os.path.exists(STORAGE_STATE_PATH):
+        try:
+            return browser.new_context(storage_state=STORAGE_STATE_PATH, **options)
+        except Exception as e:
+            logging.warning(f"Ignoring unreadable login state {STORAGE_STATE_PATH}: {e}")
+    return browser.new_context(**options)
+
+
+def save_state(context):
+    """Write the context's cookies/localStorage atomically for other scrapers."""
+    tmp = f"{STORAGE_STATE_PATH}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        context.storage_state(path=tmp)
+        os.replace(tmp, STORAGE_STATE_PATH)
+    except Exception as e:
+        logging.warning(f"Could not save login state: {e}")
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def login(page, timeout=30000):
+    logging.info("Login page detected. Logging in...")
+    page.fill("input[name='username']", USER)
+    page.fill("input[name='password']", PASS)
+    page.click("button:has-text('Login')")
+    page.wait_for_url("**/#/", timeout=timeout)
+    page.wait_for_selector(LOGIN_INPUT, state="detached", timeout=timeout)
+    save_state(page.context)
+
+
+def open_logged_in(page, url, ready_selector, timeout=30000):
+    """
+    Go to `url` and wait until `ready_selector` shows up, logging in first
+    if the site answers with its login form instead.
+    """
+    page.goto(url, timeout=60000)
+    page.wait_for_selector(f"{ready_selector}, {LOGIN_INPUT}", state="visible", timeout=timeout)
+    if not page.locator(LOGIN_INPUT).is_visible():
+        return
+
+    with _login_lock:
+        login(page, timeout=timeout)
+    page.goto(url, timeout=60000)
+    page.wait_for_selector(ready_selector, state="visible", timeout=timeout)
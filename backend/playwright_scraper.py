@@ -1,74 +1,48 @@
 import logging
 import urllib.parse
-import time
 from playwright.sync_api import sync_playwright
 
+import resource_blocking
+from opera_session import SEARCH_INPUT, SEARCH_URL, new_context, open_logged_in
+from video_capture import VideoCapture
+
 # Configure logging to show in terminal
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 class OperaScraper:
+    # Requests to skip (see resource_blocking.PROFILES)
+    block_profile = "scrape"
+
     def __init__(self):
         self.playwright = None
         self.browser = None
         self.context = None
         self.page = None
+        self.video_capture = None
         self.is_running = False
 
     def start_session(self, headless=True):
         """
-        Launches browser, logs in, and navigates to the search page.
+        Launches browser, restores (or refreshes) the login and opens the search page.
         Must be called once before scraping.
         """
         try:
             logging.info("Starting Playwright session...")
             self.playwright = sync_playwright().start()
             self.browser = self.playwright.chromium.launch(headless=headless)
-            self.context = self.browser.new_context(
+            self.context = new_context(
+                self.browser,
                 user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
             )
+            resource_blocking.install(self.context, self.block_profile)
             self.page = self.context.new_page()
+            self.video_capture = VideoCapture(self.page)
             self.is_running = True
 
-            # 1. Go to Home Page & Login
-            base_url = "http://web.operatopzera.net/#/"
-            logging.info(f"Navigating to home: {base_url}")
-            self.page.goto(base_url, timeout=60000)
-            self.page.wait_for_load_state("networkidle", timeout=60000)
-
-            # Check for login
-            try:
-                login_selector = "input[name='username']"
-                if self.page.locator(login_selector).is_visible(timeout=5000):
-                    logging.info("Login page detected. Logging in...")
-                    USER = "t2TGgarYJ"
-                    PASS = "66e74xKRJ"
-                    
-                    self.page.fill("input[name='username']", USER)
-                    self.page.fill("input[name='password']", PASS)
-                    self.page.click("button:has-text('Login')")
-                    
-                    logging.info("Login submitted. Waiting for home/dashboard...")
-                    self.page.wait_for_url("**/#/", timeout=30000)
-                    time.sleep(2) 
-                else:
-                    logging.info("Already logged in or no login form found.")
-            except Exception as e:
-                logging.warning(f"Login check encountered error: {e}")
-
-            # 2. Go to Movies Page
-            movies_url = "http://web.operatopzera.net/#/movie/"
-            logging.info(f"Navigating to movies: {movies_url}")
-            self.page.goto(movies_url, timeout=30000)
-            time.sleep(2)
-
-            # 3. Go to Search Page (Stay here!)
-            search_page_url = "http://web.operatopzera.net/#/movie/search/"
-            logging.info(f"Navigating to search page: {search_page_url}")
-            self.page.goto(search_page_url, timeout=30000)
-            
-            # Verify we are ready to search
-            INPUT_SELECTOR = "input[placeholder='Search stream...']"
-            self.page.wait_for_selector(INPUT_SELECTOR, state="visible", timeout=15000)
+            # Go straight to the search page (stay here!); the saved login
+            # state usually makes the login form unnecessary
+            logging.info(f"Navigating to search page: {SEARCH_URL}")
+            open_logged_in(self.page, SEARCH_URL, SEARCH_INPUT)
             logging.info("Session started successfully. Ready to scrape.")
 
         except Exception as e:
@@ -107,7 +81,7 @@ class OperaScraper:
             self.page.wait_for_selector(INPUT_SELECTOR, state="visible", timeout=5000)
             self.page.fill(INPUT_SELECTOR, "")
             self.page.fill(INPUT_SELECTOR, title)
-            time.sleep(0.5)
+            self.page.wait_for_timeout(500)
             
             logging.info(f"Searching for: {title}")
             self.page.keyboard.press("Enter")
@@ -127,7 +101,7 @@ class OperaScraper:
                         break
                     except:
                         self.page.mouse.wheel(0, 500)
-                        time.sleep(1)
+                        self.page.wait_for_timeout(1000)
                 
                 # Final wait check
                 self.page.locator(f"a[href*='/movie/']").filter(has_text=title).first.wait_for(state="visible", timeout=5000)
@@ -170,37 +144,23 @@ class OperaScraper:
             # and then GO BACK to search for the next movie.
             
             logging.info("Clicking movie link...")
+            self.video_capture.reset()
             target_link.scroll_into_view_if_needed()
             target_link.click()
             
-            # On Movie Page
-            time.sleep(2)
-            
-            # Play button logic
-            if "/play/" not in self.page.url:
+            # On Movie Page: Play button logic
+            if "/play/" not in self.page.url and not self.video_capture.url:
                 try:
                     play_btn = self.page.locator("a[href*='/play/'], button:has-text('Play'), button:has-text('Assistir')").first
-                    if play_btn.is_visible(timeout=5000):
-                        play_btn.click()
-                    else:
-                        logging.warning("Play button not found.")
-                except: pass
+                    play_btn.wait_for(state="visible", timeout=5000)
+                    play_btn.click()
+                except:
+                    logging.warning("Play button not found.")
 
-            # Extract Video
-            video_src = None
-            try:
-                self.page.wait_for_selector("video", timeout=20000)
-                # Force play
-                self.page.evaluate("document.querySelector('video').play().catch(() => {})")
-                
-                for _ in range(10):
-                    src = self.page.evaluate("document.querySelector('video').src")
-                    if src and src.startswith("http") and "blob" not in src:
-                        video_src = src
-                        break
-                    time.sleep(1)
-            except Exception as e:
-                logging.error(f"Error extracting video: {e}")
+            # Extract Video: resolves as soon as the player requests the media
+            video_src = self.video_capture.wait()
+            if not video_src:
+                logging.error("Error extracting video: no media request before the deadline")
 
             # RESET FOR NEXT SEARCH: Go back to search page
             logging.info("Returning to search page...")
@@ -294,13 +254,9 @@ class OperaScraper:
             # Navigate Logic
             # Force reload if we are 'stuck' on the timestamp or if hash didn't trigger load
             logging.info(f"Navigating to detail page: {full_url}")
+            self.video_capture.reset()
             self.page.goto(full_url, timeout=45000)
             
-            try:
-                self.page.wait_for_load_state("networkidle", timeout=5000)
-            except: pass
-            time.sleep(2)
-            
             # TITLE VALIDATION (CRITICAL FIX)
             if expected_title:
                 # Clean title for fuzzy matching (remove year, special chars)
@@ -317,8 +273,8 @@ class OperaScraper:
                     logging.warning(f"  -> Page validation FAILED. Title '{short_title}' not found in DOM.")
                     # Try a reload once
                     logging.info("  -> Retrying with RELOAD...")
+                    self.video_capture.reset()
                     self.page.reload()
-                    time.sleep(5)
                     try:
                         self.page.wait_for_selector(f"text={short_title}", timeout=10000)
                         logging.info("  -> Reload validation PASSED.")
@@ -326,39 +282,31 @@ class OperaScraper:
                         logging.error("  -> Validation FAILED after reload. Aborting to prevent mismatch.")
                         return None
             
-            # Play button logic
-            try:
-                play_btn = self.page.locator("a[href*='/play/'], button:has-text('Play'), button:has-text('Assistir')").first
-                if play_btn.is_visible(timeout=5000):
+            # Play button logic (the /play/ page starts the player by itself)
+            if "/play/" not in self.page.url and not self.video_capture.url:
+                try:
+                    play_btn = self.page.locator("a[href*='/play/'], button:has-text('Play'), button:has-text('Assistir')").first
+                    play_btn.wait_for(state="visible", timeout=5000)
                     logging.info("Clicking Play button (Forced)...")
                     play_btn.click(force=True)
-                    time.sleep(3) # Wait for player to init
-            except: pass
+                except: pass
 
-            # Extract Video
-            video_src = None
-            try:
-                # Increased timeout to 45s for slow loaders
-                self.page.wait_for_selector("video, iframe", timeout=45000)
-                
-                # Check video tag first
-                video_src = self.page.evaluate("document.querySelector('video') ? document.querySelector('video').src : null")
-                
-                if not video_src:
-                     # Fallback to iframe
-                     iframe = self.page.query_selector("iframe")
-                     if iframe:
-                         video_src = iframe.get_attribute("src")
-                         
-            except Exception as e:
-                logging.error(f"Error extracting video from page: {e}")
+            # Extract Video: first media request (or <video> src), iframe as fallback
+            video_src = self.video_capture.wait()
+            if not video_src:
+                try:
+                    iframe = self.page.query_selector("iframe")
+                    if iframe:
+                        video_src = iframe.get_attribute("src")
+                except Exception as e:
+                    logging.error(f"Error extracting video from page: {e}")
 
             return video_src
         except Exception as e:
             logging.error(f"Failed to get video source from {detail_url}: {e}")
             return None
 
-# Global instance
+# Global instance (single-threaded scripts; concurrent callers use browser_pool)
 _scraper_instance = None
 
 def get_scraper():
@@ -368,11 +316,17 @@ def get_scraper():
     return _scraper_instance
 
 def scrape_operatopzera(title: str, year: str = None) -> str | None:
-    """Wrapper to maintain compatibility or simple usage"""
-    s = get_scraper()
-    if not s.is_running:
-        s.start_session()
-    return s.scrape_title(title, year)
+    """
+    Scrape one title on a pooled browser session (see browser_pool).
+
+    Safe to call from any thread, including Flask request/worker threads.
+    """
+    from browser_pool import get_pool
+    try:
+        return get_pool().scrape_title(title, year)
+    except TimeoutError as e:
+        logging.error(f"Opera scrape timed out for {title}: {e}")
+        return None
 
 if __name__ == "__main__":
     # Test block
@@ -1,18 +1,23 @@
 import sqlite3
-import requests
 import re
 import time
 import logging
-import unicodedata
-from difflib import SequenceMatcher
-from datetime import datetime
 from database import get_conn, save_embed
+from title_match import best_candidate
+from tmdb_client import search_many
+from enrichment import (
+    backoff_delay,
+    claim_enrichment,
+    enqueue_enrichment,
+    finish_attempt,
+    init_enrichment_tables,
+)
+from work_items import worker_name
 
 # Configuration
-TMDB_API_KEY = "909fc389a150847bdd4ffcd92809cff7"
-BASE_URL = "https://api.themoviedb.org/3"
 MIN_SIMILARITY_SCORE = 0.85 # High threshold for safety
 CHECK_INTERVAL_SECONDS = 60 # Check every minute
+BATCH_SIZE = 20 # Titles claimed per TMDB batch
 
 logging.basicConfig(
     level=logging.INFO, 
@@ -24,28 +29,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def normalize_title(title):
-    """Normalize title for comparison (remove accents, lowercase)"""
-    # Remove accents
-    normalized = unicodedata.normalize("NFKD", title)
-    normalized = "".join([c for c in normalized if not unicodedata.combining(c)])
-    # Remove special chars and lowercase
-    normalized = re.sub(r"[^\w\s]", "", normalized.lower())
-    return normalized.strip()
-
-def calculate_similarity(str1, str2):
-    """Calculates string similarity (0-1)"""
-    s1 = normalize_title(str1)
-    s2 = normalize_title(str2)
-    
-    # Check for direct containment
-    if s1 == s2: return 1.0
-    if s1 in s2 or s2 in s1:
-        # If one is a subtitle of other, check length ratio
-        return max(len(s1), len(s2)) / max(len(s1), len(s2)) * 0.95
-        
-    return SequenceMatcher(None, s1, s2).ratio()
-
 def clean_search_title(title):
     title = re.sub(r'\(\d{4}\)', '', title)
     title = re.sub(r'\[.*?\]', '', title)
@@ -54,101 +37,117 @@ def clean_search_title(title):
         title = title.split(":")[0] # Try main title only
     return title.strip()
 
-def search_tmdb(title, year=None):
-    try:
-        search_query = clean_search_title(title)
-        url = f"{BASE_URL}/search/movie"
-        params = {"api_key": TMDB_API_KEY, "query": search_query, "language": "pt-BR", "page": 1}
-        if year: params["year"] = year
-        
-        res = requests.get(url, params=params, timeout=10)
-        data = res.json()
-        
-        if not data.get("results") and year:
-            del params["year"]
-            res = requests.get(url, params=params, timeout=10)
-            data = res.json()
-            
-        return data.get("results", [])
-    except Exception as e:
-        logger.error(f"TMDB API Error: {e}")
-    return []
+# One catalog_raw row per link even when several share its canonical_key
+PENDING_QUERY = """
+    SELECT l.title, l.tmdb_id, l.embed_url, c.year, c.raw_title
+    FROM links l
+    LEFT JOIN catalog_raw c ON c.id = (
+        SELECT MIN(id) FROM catalog_raw WHERE canonical_key = l.canonical_key
+    )
+    WHERE (l.poster_path IS NULL OR l.poster_path = '')
+      AND l.embed_url IS NOT NULL 
+      AND l.embed_url != 'NOT_FOUND'
+"""
 
 def get_pending_movies():
     with get_conn() as conn:
         conn.row_factory = sqlite3.Row
         c = conn.cursor()
-        query = """
-            SELECT l.title, l.tmdb_id, l.embed_url, c.year, c.raw_title
-            FROM links l
-            LEFT JOIN catalog_raw c ON (l.title = c.raw_title OR l.original_raw_title = c.raw_title)
-            WHERE (l.poster_path IS NULL OR l.poster_path = '')
-              AND l.embed_url IS NOT NULL 
-              AND l.embed_url != 'NOT_FOUND'
-        """
-        c.execute(query)
+        c.execute(PENDING_QUERY)
         return c.fetchall()
 
+def get_pending_movie(title):
+    """Row of one queued title, or None if it no longer needs a poster."""
+    with get_conn() as conn:
+        conn.row_factory = sqlite3.Row
+        c = conn.cursor()
+        c.execute(PENDING_QUERY + " AND l.title = ?", (title,))
+        return c.fetchone()
+
+def seed_queue():
+    """Queue rows written outside save_embed (run once at startup)."""
+    return enqueue_enrichment([m['title'] for m in get_pending_movies()])
+
+def match_movie(movie, results):
+    """Apply the best TMDB candidate; returns (outcome, score, tmdb_id)."""
+    title = movie['title']
+    raw_title = movie['raw_title'] or title
+    
+    # Score both titles; the movie title is normalized once per candidate list
+    best_match, highest_score = best_candidate(
+        title, results, key=lambda c: (c.get('title', ''), c.get('original_title', ''))
+    )
+    
+    if best_match and highest_score >= MIN_SIMILARITY_SCORE:
+        poster_path = best_match.get('poster_path')
+        tid = str(best_match['id'])
+        if poster_path:
+            logger.info(f"✅ Match Found for '{title}': '{best_match['title']}' (Score: {highest_score:.2f})")
+            save_embed(
+                title=title,
+                embed_url=movie['embed_url'],
+                tmdb_id=tid,
+                poster_path=poster_path,
+                backdrop_path=best_match.get('backdrop_path'),
+                overview=best_match.get('overview'),
+                original_raw_title=raw_title
+            )
+            return "matched", highest_score, tid
+        logger.warning(f"⚠️  Match found for '{title}' but no poster available on TMDB.")
+        return "no_poster", highest_score, tid
+    if best_match:
+        logger.warning(f"❌ REJECTED '{title}': Best match '{best_match['title']}' score too low ({highest_score:.2f})")
+        return "low_score", highest_score, str(best_match['id'])
+    logger.warning(f"❌ NO RESULTS for '{title}'")
+    return "no_results", None, None
+
+def process_batch(owner):
+    """Claim due titles and try to enrich them; returns how many were claimed."""
+    items = claim_enrichment(owner, limit=BATCH_SIZE)
+    if not items:
+        return 0
+    
+    pending = []
+    for item in items:
+        movie = get_pending_movie(item['key'])
+        if movie is None:
+            # Poster filled (or link removed) since it was queued
+            finish_attempt(item, owner, "resolved")
+        else:
+            pending.append((item, movie))
+    if not pending:
+        return len(items)
+    
+    logger.info(f"Processing {len(pending)} movies missing posters...")
+    # All lookups of the batch at once; repeats come from the TMDB cache
+    all_results = search_many(
+        [(clean_search_title(m['title']), m['year']) for _, m in pending], first_only=False
+    )
+    
+    for (item, movie), results in zip(pending, all_results):
+        try:
+            outcome, score, tid = match_movie(movie, results)
+        except Exception as e:
+            logger.error(f"Error enriching '{item['key']}': {e}")
+            outcome, score, tid = "error", None, None
+        finish_attempt(item, owner, outcome, score, tid)
+        if outcome not in ("matched", "resolved"):
+            logger.info(f"   Retry for '{item['key']}' in {backoff_delay(item['attempts']) // 60} min")
+    return len(items)
+
 def run_poster_daemon():
     logger.info("Poster Enforcement Daemon started.")
     logger.info(f"Threshold-Safety: {MIN_SIMILARITY_SCORE*100}% | Interval: {CHECK_INTERVAL_SECONDS}s")
     
+    init_enrichment_tables()
+    owner = worker_name("poster")
+    logger.info(f"Queued {seed_queue()} titles missing posters.")
+    
     while True:
         try:
-            pending = get_pending_movies()
-            if not pending:
+            # Only new or retry-due titles; an idle check is one indexed query
+            if not process_batch(owner):
                 time.sleep(CHECK_INTERVAL_SECONDS)
-                continue
-                
-            logger.info(f"Found {len(pending)} movies missing posters. Processing...")
-            
-            for movie in pending:
-                title = movie['title']
-                year = movie['year']
-                raw_title = movie['raw_title'] or title
-                
-                results = search_tmdb(title, year)
-                
-                best_match = None
-                highest_score = 0
-                
-                for candidate in results:
-                    c_title = candidate.get('title', '')
-                    c_original = candidate.get('original_title', '')
-                    
-                    # Score both titles
-                    score1 = calculate_similarity(title, c_title)
-                    score2 = calculate_similarity(title, c_original)
-                    score = max(score1, score2)
-                    
-                    if score > highest_score:
-                        highest_score = score
-                        best_match = candidate
-                
-                if best_match and highest_score >= MIN_SIMILARITY_SCORE:
-                    poster_path = best_match.get('poster_path')
-                    if poster_path:
-                        tid = str(best_match['id'])
-                        logger.info(f"✅ Match Found for '{title}': '{best_match['title']}' (Score: {highest_score:.2f})")
-                        save_embed(
-                            title=title,
-                            embed_url=movie['embed_url'],
-                            tmdb_id=tid,
-                            poster_path=poster_path,
-                            backdrop_path=best_match.get('backdrop_path'),
-                            overview=best_match.get('overview'),
-                            original_raw_title=raw_title
-                        )
-                    else:
-                        logger.warning(f"⚠️  Match found for '{title}' but no poster available on TMDB.")
-                else:
-                    if best_match:
-                        logger.warning(f"❌ REJECTED '{title}': Best match '{best_match['title']}' score too low ({highest_score:.2f})")
-                    else:
-                        logger.warning(f"❌ NO RESULTS for '{title}'")
-            
-            logger.info("Cycle completed. Sleeping...")
-            time.sleep(CHECK_INTERVAL_SECONDS)
             
         except Exception as e:
             logger.error(f"Critical error in daemon loop: {e}")
@@ -0,0 +1,138 @@
+"""
+Request blocking for scraper browser contexts.
+
+The scrapers only need the Opera SPA (documents, scripts, XHR) and the
+player's media URL; posters, fonts, media previews and trackers are
+downloaded and thrown away. install() routes a context through a profile
+that aborts those requests:
+
+    context = new_context(browser, ...)
+    resource_blocking.install(context, "catalog")
+
+Only URLs that can be blocked (a blocked file extension or tracker host)
+are routed, through one regex the browser matches itself; everything else
+never reaches the Python handler. With the sync API a routed request waits
+until the scraper thread is back inside a Playwright call, so scrapers
+using a blocking context wait with page.wait_for_timeout(), not
+time.sleep().
+
+Documents, scripts, stylesheets and XHR/fetch are never blocked by type, so
+login keeps working, and anything that looks like a video URL (.mp4/.m3u8)
+always goes through so VideoCapture can resolve it. Set
+SCRAPER_BLOCK_PROFILE to override every scraper's profile (e.g. "off" to
+debug a page with all resources loaded).
+"""
+
+import logging
+import os
+import re
+import threading
+from urllib.parse import urlsplit
+
+from video_capture import is_video_url
+
+PROFILES = {
+    "off": frozenset(),
+    # Search/detail/play pages: keep everything the player might need
+    "scrape": frozenset({"image", "font", "media"}),
+    # Catalog scrolling: hundreds of poster images per page
+    "catalog": frozenset({"image", "font", "media", "imageset", "texttrack"}),
+}
+DEFAULT_PROFILE = "scrape"
+PROFILE_OVERRIDE = os.environ.get("SCRAPER_BLOCK_PROFILE")
+
+# Third-party hosts (and their subdomains) that are never needed
+BLOCKED_HOSTS = frozenset(
+    h.strip()
+    for h in os.environ.get(
+        "SCRAPER_BLOCKED_HOSTS",
+        "google-analytics.com,googletagmanager.com,doubleclick.net,googlesyndication.com,"
+        "adservice.google.com,facebook.net,facebook.com,hotjar.com,clarity.ms,"
+        "scorecardresearch.com,popads.net,popcash.net,adsterra.com,onclickads.net",
+    ).split(",")
+    if h.strip()
+)
+
+# File extensions routed for each blocked resource type (.mp4/.m3u8 are
+# never listed: the player needs them)
+TYPE_EXTENSIONS = {
+    "image": ("png", "jpe?g", "gif", "webp", "avif", "svg", "ico", "bmp"),
+    "imageset": ("png", "jpe?g", "webp", "avif"),
+    "font": ("woff2?", "ttf", "otf", "eot"),
+    "media": ("webm", "ogv", "ogg", "mp3", "m4a", "aac", "wav"),
+    "texttrack": ("vtt", "srt"),
+}
+
+_lock = threading.Lock()
+_counters = {"allowed": 0, "blocked": 0, "by_type": {}, "by_profile": {}}
+
+
+def _blocked_host(url: str) -> bool:
+    host = (urlsplit(url).hostname or "").lower()
+    return any(host == h or host.endswith("." + h) for h in BLOCKED_HOSTS)
+
+
+def should_block(url: str, resource_type: str, blocked_types) -> bool:
+    if is_video_url(url):
+        return False
+    if resource_type in blocked_types:
+        return True
+    return _blocked_host(url)
+
+
+def route_pattern(blocked_types):
+    """Regex of the URLs worth routing for `blocked_types` (tracker hosts included)."""
+    extensions = sorted({e for t in blocked_types for e in TYPE_EXTENSIONS.get(t, ())})
+    hosts = "|".join(re.escape(h) for h in sorted(BLOCKED_HOSTS))
+    parts = []
+    if hosts:
+        parts.append(rf"^https?://(?:[^/?#]*\.)?(?:{hosts})(?::\d+)?(?:[/?#]|$)")
+    if extensions:
+        parts.append(rf"\.(?:{'|'.join(extensions)})(?:[?#]|$)")
+    return re.compile("|".join(parts), re.IGNORECASE) if parts else None
+
+
+def _count(profile, resource_type, blocked):
+    with _lock:
+        if not blocked:
+            _counters["allowed"] += 1
+            return
+        _counters["blocked"] += 1
+        _counters["by_type"][resource_type] = _counters["by_type"].get(resource_type, 0) + 1
+        _counters["by_profile"][profile] = _counters["by_profile"].get(profile, 0) + 1
+
+
+def install(context, profile: str = DEFAULT_PROFILE):
+    """Route the blockable requests of `context` through the blocking profile."""
+    profile = PROFILE_OVERRIDE or profile
+    blocked_types = PROFILES.get(profile)
+    if blocked_types is None:
+        logging.warning(f"Unknown block profile '{profile}', using '{DEFAULT_PROFILE}'")
+        profile, blocked_types = DEFAULT_PROFILE, PROFILES[DEFAULT_PROFILE]
+    pattern = route_pattern(blocked_types) if blocked_types else None
+    if pattern is None:
+        return
+
+    def handle(route):
+        req = route.request
+        blocked = should_block(req.url, req.resource_type, blocked_types)
+        _count(profile, req.resource_type, blocked)
+        try:
+            if blocked:
+                route.abort("blockedbyclient")
+            else:
+                route.continue_()
+        except Exception:
+            pass  # page closed while the request was in flight
+
+    context.route(pattern, handle)
+
+
+def stats():
+    with _lock:
+        return {
+            "allowed": _counters["allowed"],
+            "blocked": _counters["blocked"],
+            "by_type": dict(_counters["by_type"]),
+            "by_profile": dict(_counters["by_profile"]),
+        }
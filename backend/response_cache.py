@@ -0,0 +1,130 @@
+"""
+In-process TTL + LRU cache for the read-only API endpoints.
+
+Entries are keyed on (endpoint, args, catalog generation). Every write to
+links, series, seasons or episodes bumps the generation stored in SQLite
+(triggers installed by init_db, so plain-SQL maintenance scripts count
+too), so a write from any process - API, scraper, daemon or script - makes
+all older entries unreachable; they then age out through LRU eviction or
+their TTL.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from database import get_catalog_generation
+
+CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", 512))
+CACHE_TTL_SECONDS = float(os.environ.get("RESPONSE_CACHE_TTL", 300))
+# How long a generation read from SQLite is trusted before re-checking
+GENERATION_CHECK_INTERVAL = float(os.environ.get("RESPONSE_CACHE_GENERATION_CHECK", 1.0))
+
+
+class TTLCache:
+    """Thread-safe bounded LRU cache whose entries also expire after `ttl` seconds."""
+
+    def __init__(self, maxsize=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "max_entries": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+_cache = TTLCache()
+# Marks a miss in get_or_set, so a cached None payload still counts as a hit
+_MISSING = object()
+_generation = {"value": None, "checked_at": 0.0}
+_generation_lock = threading.Lock()
+
+
+def current_generation():
+    """Catalog generation, re-read from SQLite at most every GENERATION_CHECK_INTERVAL."""
+    now = time.monotonic()
+    with _generation_lock:
+        if _generation["value"] is not None and now - _generation["checked_at"] < GENERATION_CHECK_INTERVAL:
+            return _generation["value"]
+    value = get_catalog_generation()
+    with _generation_lock:
+        _generation["value"] = value
+        _generation["checked_at"] = now
+    return value
+
+
+def invalidate():
+    """Force the next lookup to re-read the generation (call after an in-process write)."""
+    with _generation_lock:
+        _generation["value"] = None
+
+
+def make_etag(endpoint, args, generation):
+    """Strong validator for endpoint+args at a catalog generation (unquoted)."""
+    digest = hashlib.sha1(repr((endpoint, args)).encode()).hexdigest()[:12]
+    return f"{endpoint}-{generation}-{digest}"
+
+
+def get_or_set(endpoint, args, loader, generation=None):
+    """Return the cached payload for endpoint+args, calling loader() on a miss."""
+    if generation is None:
+        generation = current_generation()
+    key = (endpoint, args, generation)
+    value = _cache.get(key, _MISSING)
+    if value is _MISSING:
+        value = loader()
+        _cache.set(key, value)
+    return value
+
+
+def stats():
+    stats = _cache.stats()
+    stats["generation"] = _generation["value"]
+    return stats
@@ -11,21 +11,13 @@ import os
 from playwright.sync_api import sync_playwright
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from database import save_embed, get_conn
+from database import save_embed, existing_source_video_ids
 
 
 def check_movie_exists_in_db(movie_id):
     """Verifica se o filme já existe no banco de dados pelo Opera ID"""
     try:
-        conn = get_conn()
-        c = conn.cursor()
-        # Procura pelo movie_id no embed_url (ex: .../movie/t2TGgarYJ/66e74xKRJ/217376.mp4)
-        c.execute(
-            "SELECT title FROM links WHERE embed_url LIKE ?", (f"%/{movie_id}.mp4%",)
-        )
-        result = c.fetchone()
-        conn.close()
-        return result is not None
+        return str(movie_id) in existing_source_video_ids([movie_id])
     except Exception as e:
         logger.error(f"[Scraper] Error checking database: {e}")
         return False  # Se der erro, assume que não existe e tenta processar
@@ -0,0 +1,254 @@
+"""
+Persistent scrape job queue behind /api/get-embed.
+
+A cache miss enqueues a job in the scrape_jobs table and returns right away;
+a small pool of worker threads claims jobs atomically (UPDATE ... RETURNING),
+runs scrape_for_title and stores the result. Only one queued/running job may
+exist per title/tmdb_id (partial unique index), so a burst of requests for
+the same uncached title shares a single job.
+"""
+
+import logging
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows dev setup: a single process, no lock needed
+    fcntl = None
+
+from database import (
+    DB_PATH,
+    clear_scrape_failure,
+    get_cached_embed,
+    get_cached_embed_by_id,
+    get_conn,
+    record_scrape_failure,
+    save_embed,
+    scrape_failure_key,
+)
+from browser_pool import POOL_SIZE
+from singleflight import SingleFlight
+
+# One job worker per pooled browser session by default
+SCRAPE_WORKERS = int(os.environ.get("SCRAPE_WORKERS", POOL_SIZE))
+# A running job whose worker stopped updating it for this long is picked up again
+JOB_STALE_SECONDS = int(os.environ.get("SCRAPE_JOB_STALE_SECONDS", 300))
+IDLE_POLL_SECONDS = 2.0
+# Longest a caller waits on someone else's in-flight scrape of the same title
+SCRAPE_SHARE_TIMEOUT = int(os.environ.get("SCRAPE_SHARE_TIMEOUT", 180))
+# Every gunicorn worker imports app; only the process holding this lock runs
+# the scrape workers (and their browser pool)
+WORKER_LOCK_PATH = os.environ.get("SCRAPE_WORKER_LOCK", f"{DB_PATH}.scrape-workers.lock")
+
+# In-process coalescing on top of the queue's per-key dedupe: two workers
+# (or a stale-job reclaim) never run the same scrape at the same time
+scrapes = SingleFlight(timeout=SCRAPE_SHARE_TIMEOUT)
+
+ACTIVE_STATUSES = ("queued", "running")
+TERMINAL_STATUSES = ("done", "failed")
+
+_wakeup = threading.Event()
+_workers = []
+_workers_lock = threading.Lock()
+_process_lock = None
+
+
+def init_jobs_table():
+    with get_conn() as conn:
+        c = conn.cursor()
+        c.execute(
+            """CREATE TABLE IF NOT EXISTS scrape_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                key TEXT NOT NULL,
+                title TEXT NOT NULL,
+                tmdb_id TEXT,
+                year TEXT,
+                status TEXT NOT NULL DEFAULT 'queued',
+                embed_url TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        c.execute(
+            """CREATE UNIQUE INDEX IF NOT EXISTS idx_scrape_jobs_active
+               ON scrape_jobs(key) WHERE status IN ('queued', 'running')"""
+        )
+        c.execute("CREATE INDEX IF NOT EXISTS idx_scrape_jobs_status ON scrape_jobs(status, created_at)")
+        conn.commit()
+
+
+def _job_dict(row):
+    return {
+        "id": row["id"],
+        "status": row["status"],
+        "title": row["title"],
+        "tmdbId": row["tmdb_id"],
+        "embedUrl": row["embed_url"],
+        "error": row["error"],
+    }
+
+
+def enqueue(title, tmdb_id=None, year=None):
+    """Queue a scrape (or join the one already queued/running). Returns the job dict."""
+    key = scrape_failure_key(title, tmdb_id)
+    now = time.time()
+    with get_conn() as conn:
+        c = conn.cursor()
+        c.execute(
+            """INSERT INTO scrape_jobs (key, title, tmdb_id, year, status, created_at, updated_at)
+               VALUES (?, ?, ?, ?, 'queued', ?, ?)
+               ON CONFLICT DO NOTHING""",
+            (key, title, str(tmdb_id) if tmdb_id else None, str(year) if year else None, now, now),
+        )
+        c.execute(
+            "SELECT * FROM scrape_jobs WHERE key = ? ORDER BY id DESC LIMIT 1",
+            (key,),
+        )
+        row = c.fetchone()
+        conn.commit()
+    _wakeup.set()
+    return _job_dict(row)
+
+
+def get_job(job_id):
+    with get_conn() as conn:
+        c = conn.cursor()
+        c.execute("SELECT * FROM scrape_jobs WHERE id = ?", (job_id,))
+        row = c.fetchone()
+        return _job_dict(row) if row else None
+
+
+def claim_next():
+    """Atomically take the oldest queued (or stale running) job, or None."""
+    now = time.time()
+    with get_conn() as conn:
+        c = conn.cursor()
+        c.execute(
+            """UPDATE scrape_jobs
+               SET status = 'running', attempts = attempts + 1, updated_at = ?
+               WHERE id = (
+                   SELECT id FROM scrape_jobs
+                   WHERE status = 'queued' OR (status = 'running' AND updated_at < ?)
+                   ORDER BY created_at
+                   LIMIT 1
+               )
+               RETURNING id, title, tmdb_id, year""",
+            (now, now - JOB_STALE_SECONDS),
+        )
+        row = c.fetchone()
+        conn.commit()
+        return dict(row) if row else None
+
+
+def finish(job_id, status, embed_url=None, error=None):
+    with get_conn() as conn:
+        conn.execute(
+            "UPDATE scrape_jobs SET status = ?, embed_url = ?, error = ?, updated_at = ? WHERE id = ?",
+            (status, embed_url, error, time.time(), job_id),
+        )
+        conn.commit()
+
+
+def requeue(job_id):
+    """Put a running job back at the end of the queue."""
+    now = time.time()
+    with get_conn() as conn:
+        conn.execute(
+            "UPDATE scrape_jobs SET status = 'queued', created_at = ?, updated_at = ? WHERE id = ?",
+            (now, now, job_id),
+        )
+        conn.commit()
+
+
+def run_job(job, on_saved=None):
+    # Imported lazily: scraper pulls in Playwright
+    from scraper import scrape_for_title
+    from validator import validate_embed_cached
+
+    title, tmdb_id = job["title"], job["tmdb_id"]
+    try:
+        embed = scrapes.do(
+            scrape_failure_key(title, tmdb_id),
+            lambda: scrape_for_title(title, tmdb_id, year=job["year"]),
+        )
+    except TimeoutError:
+        # Someone else's scrape of this title is still running and may yet
+        # succeed: take its result if it landed, else queue the job again
+        # (never record a failure for it)
+        embed = get_cached_embed_by_id(tmdb_id) or get_cached_embed(title)
+        if embed and embed != "NOT_FOUND":
+            finish(job["id"], "done", embed_url=embed)
+        else:
+            requeue(job["id"])
+        return
+    except Exception as e:
+        logging.error(f"Scrape job {job['id']} crashed: {e}")
+        embed = None
+
+    if embed and validate_embed_cached(embed):
+        save_embed(title, embed, tmdb_id)
+        clear_scrape_failure(title, tmdb_id)
+        finish(job["id"], "done", embed_url=embed)
+        if on_saved:
+            on_saved()
+    else:
+        record_scrape_failure(title, tmdb_id)
+        finish(job["id"], "failed", error="Embed não encontrado")
+
+
+def _worker_loop(on_saved):
+    while True:
+        try:
+            job = claim_next()
+        except Exception as e:
+            logging.error(f"Scrape queue error: {e}")
+            job = None
+        if job is None:
+            _wakeup.wait(IDLE_POLL_SECONDS)
+            _wakeup.clear()
+            continue
+        run_job(job, on_saved)
+
+
+def _acquire_process_lock() -> bool:
+    """
+    Take the worker lock file without blocking. The lock is held until this
+    process exits, so a restarted gunicorn worker can take over.
+    """
+    global _process_lock
+    if fcntl is None or _process_lock is not None:
+        return True
+    lock_file = open(WORKER_LOCK_PATH, "a")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+    _process_lock = lock_file
+    return True
+
+
+def start_workers(count=SCRAPE_WORKERS, on_saved=None):
+    """Start the worker threads, in one process per host (see WORKER_LOCK_PATH)."""
+    with _workers_lock:
+        if _workers:
+            return
+        if not _acquire_process_lock():
+            logging.info("Scrape workers already running in another process")
+            return
+        init_jobs_table()
+        for i in range(count):
+            t = threading.Thread(target=_worker_loop, args=(on_saved,), name=f"scrape-worker-{i}", daemon=True)
+            t.start()
+            _workers.append(t)
+
+
+if __name__ == "__main__":
+    # Standalone worker process (run the API with SCRAPE_WORKERS=0 to use only these)
+    logging.basicConfig(level=logging.INFO)
+    init_jobs_table()
+    _worker_loop(None)
@@ -10,7 +10,7 @@ import os
 from playwright.sync_api import sync_playwright
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from database import save_embed, get_conn
+from database import save_embed, existing_source_video_ids
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -32,14 +32,7 @@ LOW_QUALITY_KEYWORDS = [
 def check_movie_exists_in_db(movie_id):
     """Verifica se o filme já existe no banco pelo Opera ID"""
     try:
-        conn = get_conn()
-        c = conn.cursor()
-        c.execute(
-            "SELECT title FROM links WHERE embed_url LIKE ?", (f"%/{movie_id}.mp4%",)
-        )
-        result = c.fetchone()
-        conn.close()
-        return result is not None
+        return str(movie_id) in existing_source_video_ids([movie_id])
     except Exception as e:
         logger.error(f"Error checking DB: {e}")
         return False
@@ -12,7 +12,7 @@ except ImportError:
     save_embed = lambda *a, **k: print("DB(Movie) Missing", a)
 
 try:
-    from database_series import save_series, save_season, save_episode
+    from database_series import save_series, save_seasons_bulk, save_episodes_bulk
     HAS_SERIES_DB = True
 except ImportError:
     HAS_SERIES_DB = False
@@ -165,6 +165,8 @@ async def join_and_scrape_content(app, invite_link, series_title, limit, max_suc
         
         count_series = 0
         count_movies = 0
+        # (season, episode) -> campos do episódio; gravados em lote no fim
+        found_episodes = {}
         
         async for message in app.get_chat_history(chat_id, limit=limit):
             # Same parsing logic as before, but focused on this chat
@@ -200,22 +202,30 @@ async def join_and_scrape_content(app, invite_link, series_title, limit, max_suc
                 if season and episode and HAS_SERIES_DB:
                     print(f"   📺 [S{season:02}E{episode:02}] Found in content channel")
                     
-                    opera_id = slugify(series_title)
-                    s_id = save_series(opera_id, series_title, overview=f"Imported from {chat.title}")
-                    if s_id:
-                         ses_id = save_season(s_id, season, title=f"Temporada {season}")
-                         if ses_id:
-                              save_episode(s_id, ses_id, episode, 
-                                         title=ep_title, 
-                                         video_url=video_url,
-                                         video_type='tg_file' if 'tg_file_id' in video_url else 'mp4')
-                              count_series += 1
+                    found_episodes[(season, episode)] = {
+                        "title": ep_title,
+                        "video_url": video_url,
+                        "video_type": 'tg_file' if 'tg_file_id' in video_url else 'mp4',
+                    }
+                    count_series += 1
                 else:
                     # Maybe it's a movie inside a collection channel?
                     pass
 
             except Exception as e:
                 print(f"Error parsing msg {message.id}: {e}")
+
+        if found_episodes:
+            # Série, temporadas e episódios em três upserts em lote
+            s_id = save_series(slugify(series_title), series_title, overview=f"Imported from {chat.title}")
+            season_ids = save_seasons_bulk(
+                {"series_id": s_id, "season_number": season, "title": f"Temporada {season}"}
+                for season in sorted({season for season, _ in found_episodes})
+            )
+            save_episodes_bulk(
+                {"series_id": s_id, "season_id": season_ids[(s_id, season)], "episode_number": episode, **fields}
+                for (season, episode), fields in found_episodes.items()
+            )
                 
         return count_movies, count_series
 
@@ -4,6 +4,9 @@ from bs4 import BeautifulSoup
 import re
 import logging
 
+# HEAD (ranged GET fallback) on link_checker's per-host keep-alive sessions
+from validator import validate_embed
+
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 }
@@ -24,14 +27,6 @@ SOURCES = [
 ]
 
 
-def validate_embed(url: str) -> bool:
-    try:
-        r = requests.head(url, headers=HEADERS, timeout=8, allow_redirects=True)
-        return r.status_code == 200
-    except Exception:
-        return False
-
-
 def extract_embeds_from_html(html: str) -> list:
     embeds = []
     for m in EMBED_REGEX.finditer(html):
@@ -12,7 +12,10 @@ from datetime import datetime
 from playwright.sync_api import sync_playwright
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from database import save_embed, get_conn, get_catalog_movies
+from database import extract_source_video_id, save_embed, get_catalog_movies
+import resource_blocking
+from known_ids import get_known_ids
+from opera_session import MOVIE_CARD, MOVIES_URL, new_context, open_logged_in
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -22,6 +25,9 @@ logger = logging.getLogger(__name__)
 # Meta total de filmes
 TARGET_MOVIES = 250
 
+# Catalog scrolling only needs the cards' links/text, not the posters
+BLOCK_PROFILE = "catalog"
+
 # SCROLL INICIAL - posiciona em filmes diferentes do scraper #1
 # Scraper #1 começa do início, este começa depois de N scrolls
 INITIAL_SCROLL_COUNT = 50
@@ -38,22 +44,6 @@ LOW_QUALITY_KEYWORDS = [
 ]
 
 
-def check_movie_exists_in_db(movie_id):
-    """Verifica se o filme já existe no banco pelo Opera ID"""
-    try:
-        conn = get_conn()
-        c = conn.cursor()
-        c.execute(
-            "SELECT title FROM links WHERE embed_url LIKE ?", (f"%/{movie_id}.mp4%",)
-        )
-        result = c.fetchone()
-        conn.close()
-        return result is not None
-    except Exception as e:
-        logger.error(f"Error checking DB: {e}")
-        return False
-
-
 def is_low_quality(title):
     title_lower = title.lower()
     return any(keyword in title_lower for keyword in LOW_QUALITY_KEYWORDS)
@@ -72,29 +62,13 @@ def scrape_batch(browser_context, max_movies=10):
     """Processa um lote de filmes"""
     page = browser_context.new_page()
 
-    try:
-        # Login
-        logger.info("Navigating to home...")
-        page.goto("http://web.operatopzera.net/#/", timeout=60000)
-        page.wait_for_load_state("networkidle", timeout=60000)
-        time.sleep(2)
+    # Cards already in links/series are skipped without querying SQLite
+    known = get_known_ids()
 
-        try:
-            if page.locator("input[name='username']").is_visible(timeout=5000):
-                logger.info("Logging in...")
-                page.fill("input[name='username']", "t2TGgarYJ")
-                page.fill("input[name='password']", "66e74xKRJ")
-                page.click("button:has-text('Login')")
-                page.wait_for_url("**/#/", timeout=30000)
-                time.sleep(2)
-                logger.info("Logged in!")
-        except:
-            logger.info("Already logged in")
-
-        # Go to movies
+    try:
+        # Login only if the saved session state is missing/expired
         logger.info("Going to movies page...")
-        page.goto("http://web.operatopzera.net/#/movie/", timeout=30000)
-        time.sleep(3)
+        open_logged_in(page, MOVIES_URL, MOVIE_CARD)
 
         # SCROLL INICIAL - posiciona em filmes diferentes
         logger.info(
@@ -102,11 +76,11 @@ def scrape_batch(browser_context, max_movies=10):
         )
         for i in range(INITIAL_SCROLL_COUNT):
             page.mouse.wheel(0, 800)
-            time.sleep(0.5)
+            page.wait_for_timeout(500)
             if (i + 1) % 10 == 0:
                 logger.info(f"   Scrolled {i + 1}/{INITIAL_SCROLL_COUNT}")
         logger.info(f"✅ Initial scroll complete! Now at different position in list.")
-        time.sleep(2)
+        page.wait_for_timeout(2000)
 
         results = []
         processed_ids = set()
@@ -125,7 +99,7 @@ def scrape_batch(browser_context, max_movies=10):
                 if len(cards) == 0:
                     logger.warning("No cards found, scrolling more...")
                     page.mouse.wheel(0, 1000)
-                    time.sleep(2)
+                    page.wait_for_timeout(2000)
                     scroll_count += 1
                     continue
 
@@ -152,7 +126,7 @@ def scrape_batch(browser_context, max_movies=10):
                         processed_ids.add(movie_id)
 
                         # Check DB
-                        if check_movie_exists_in_db(movie_id):
+                        if known.has("movie", movie_id):
                             logger.info(
                                 f"⏭️  SKIP (already in DB): {title} (ID: {movie_id})"
                             )
@@ -167,7 +141,7 @@ def scrape_batch(browser_context, max_movies=10):
                         # Go to play page
                         play_url = f"http://web.operatopzera.net/#/movie/category/{category_id}/{movie_id}/play/"
                         page.goto(play_url, timeout=15000)
-                        time.sleep(2)
+                        page.wait_for_timeout(2000)
 
                         # Extract video
                         video_url = None
@@ -187,7 +161,7 @@ def scrape_batch(browser_context, max_movies=10):
                             """)
                             if video_url:
                                 break
-                            time.sleep(1)
+                            page.wait_for_timeout(1000)
 
                         if video_url:
                             try:
@@ -197,6 +171,8 @@ def scrape_batch(browser_context, max_movies=10):
                                     tmdb_id=None,
                                     original_raw_title=title,
                                 )
+                                # Same id links.source_video_id holds (None for iframe embeds)
+                                known.add("movie", extract_source_video_id(video_url))
                                 logger.info(f"✅ SAVED: {title}")
                                 results.append(
                                     {
@@ -216,12 +192,12 @@ def scrape_batch(browser_context, max_movies=10):
                             page.goto(
                                 "http://web.operatopzera.net/#/movie/", timeout=15000
                             )
-                            time.sleep(2)
+                            page.wait_for_timeout(2000)
                             # SCROLL INICIAL ao retornar - mantém posição diferente
                             for _ in range(INITIAL_SCROLL_COUNT + scroll_count):
                                 page.mouse.wheel(0, 800)
-                                time.sleep(0.3)
-                            time.sleep(1)
+                                page.wait_for_timeout(300)
+                            page.wait_for_timeout(1000)
                             break  # Re-fetch cards
 
                     except Exception as e:
@@ -235,7 +211,7 @@ def scrape_batch(browser_context, max_movies=10):
                 if len(results) < max_movies:
                     logger.info("Scrolling for more...")
                     page.mouse.wheel(0, 800)
-                    time.sleep(2)
+                    page.wait_for_timeout(2000)
                     scroll_count += 1
 
             except Exception as e:
@@ -247,6 +223,7 @@ def scrape_batch(browser_context, max_movies=10):
         return results
 
     finally:
+        known.save()
         page.close()
 
 
@@ -267,10 +244,12 @@ def run_continuous_scraper():
 
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=True)
-        context = browser.new_context(
+        context = new_context(
+            browser,
             user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
             viewport={"width": 1920, "height": 1080},
         )
+        resource_blocking.install(context, BLOCK_PROFILE)
 
         try:
             while True:
@@ -2,17 +2,32 @@
 """
 Scraper de Séries via API Xtream Codes
 Extrai todas as séries da API do jt0x
+
+A sincronização é incremental: xtream_sync_state guarda o last_modified e
+um hash do conteúdo de cada série, então só séries novas ou alteradas têm
+get_series_info buscado de novo, e séries que sumiram da API ficam
+inativas. Use --full para rebuscar tudo.
 """
 
-import sqlite3
+import hashlib
 import os
 import sys
 import time
 import json
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from database_series import (
+    get_conn,
+    init_series_tables,
+    save_episodes_bulk,
+    save_seasons_bulk,
+    save_series_bulk,
+)
 
-DB_PATH = os.path.join(os.path.dirname(__file__), "links.db")
 BASE_API = "http://jt0x.com/player_api.php"
 USERNAME = "t2TGgarYJ"
 PASSWORD = "66e74xKRJ"
@@ -21,73 +36,53 @@ PASSWORD = "66e74xKRJ"
 # Formato: http://jt0x.com:80/series/{username}/{password}/{stream_id}.mp4
 SERIES_STREAM_BASE = f"http://jt0x.com:80/series/{USERNAME}/{PASSWORD}"
 
+# Requisições get_series_info simultâneas
+WORKERS = int(os.environ.get("XTREAM_WORKERS", 8))
+# Séries gravadas por transação
+WRITE_BATCH = int(os.environ.get("XTREAM_WRITE_BATCH", 200))
+# Não desativa mais que esta fração das séries numa sync (lista truncada pela API)
+MAX_REMOVE_RATIO = float(os.environ.get("XTREAM_MAX_REMOVE_RATIO", 0.5))
+# (connect, read) em segundos
+API_TIMEOUT = (5, 30)
+
+_session = None
+
+
+def get_session():
+    """Sessão HTTP compartilhada (keep-alive + retry) dimensionada para os workers"""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=WORKERS, max_retries=retry)
+        _session.mount("http://", adapter)
+        _session.mount("https://", adapter)
+    return _session
+
 
 def init_db():
     """Inicializa o banco de dados se necessário"""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    
-    # Tabela de séries
-    c.execute('''CREATE TABLE IF NOT EXISTS series (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        opera_id TEXT,
-        tmdb_id TEXT,
-        title TEXT NOT NULL,
-        overview TEXT,
-        poster_path TEXT,
-        backdrop_path TEXT,
-        year TEXT,
-        genres TEXT,
-        rating REAL,
-        status TEXT,
-        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-    )''')
-    
-    # Tabela de temporadas
-    c.execute('''CREATE TABLE IF NOT EXISTS seasons (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        series_id INTEGER,
-        season_number INTEGER,
-        title TEXT,
-        overview TEXT,
-        poster_path TEXT,
-        episode_count INTEGER,
-        air_date TEXT,
-        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (series_id) REFERENCES series(id)
-    )''')
-    
-    # Tabela de episódios
-    c.execute('''CREATE TABLE IF NOT EXISTS episodes (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        season_id INTEGER,
-        series_id INTEGER,
-        episode_number INTEGER,
-        title TEXT,
-        overview TEXT,
-        still_path TEXT,
-        video_url TEXT,
-        video_type TEXT,
-        duration INTEGER,
-        air_date TEXT,
-        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (season_id) REFERENCES seasons(id),
-        FOREIGN KEY (series_id) REFERENCES series(id)
-    )''')
-    
-    conn.commit()
-    conn.close()
+    # Mesmo schema do app (com as chaves UNIQUE usadas nos upserts)
+    init_series_tables()
+    with get_conn() as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS xtream_sync_state (
+                opera_id TEXT PRIMARY KEY,
+                last_modified TEXT,
+                content_hash TEXT,
+                active INTEGER NOT NULL DEFAULT 1,
+                synced_at REAL
+            )
+        """)
+        conn.commit()
     print("✅ Banco de dados inicializado")
 
 
 def api_request(action, **params):
     """Faz uma requisição à API Xtream Codes"""
-    url = f"{BASE_API}?username={USERNAME}&password={PASSWORD}&action={action}"
-    for key, value in params.items():
-        url += f"&{key}={value}"
-    
+    query = {"username": USERNAME, "password": PASSWORD, "action": action, **params}
     try:
-        response = requests.get(url, timeout=30)
+        response = get_session().get(BASE_API, params=query, timeout=API_TIMEOUT)
         response.raise_for_status()
         return response.json()
     except Exception as e:
@@ -111,134 +106,238 @@ def get_series_info(series_id):
     return data
 
 
-def extract_series_data(series_list, max_series=None):
-    """Extrai dados completos das séries"""
-    conn = sqlite3.connect(DB_PATH)
+def parse_series(series, info):
+    """Converte a resposta da API em linhas para series/seasons/episodes"""
+    series_id = str(series.get("series_id"))
+    backdrop_path = series.get("backdrop_path", [])
+    if isinstance(backdrop_path, list) and len(backdrop_path) > 0:
+        backdrop = backdrop_path[0]
+    elif isinstance(backdrop_path, str):
+        backdrop = backdrop_path
+    else:
+        backdrop = ""
+    genre = series.get("genre", "")
+    genres = ", ".join(genre) if isinstance(genre, list) else genre
+
+    row = (
+        series_id,
+        series.get("name", "Sem Título"),
+        series.get("plot", ""),
+        series.get("cover", ""),
+        backdrop,
+        str(series.get("year", "")),
+        genres,
+        series.get("rating", 0),
+    )
+
+    seasons = []
+    episodes = []
+    for season_num, eps in (info.get("episodes") or {}).items():
+        season_int = int(season_num) if str(season_num).isdigit() else 0
+        seasons.append((season_int, len(eps)))
+        for ep in eps:
+            ep_num = ep.get("episode_num", 0)
+            ep_info = ep.get("info") or {}
+            # URL do vídeo (formato Xtream Codes)
+            video_url = f"{SERIES_STREAM_BASE}/{ep.get('id')}.{ep.get('container_extension', 'mp4')}"
+            episodes.append((
+                season_int,
+                ep_num,
+                ep.get("title", f"Episódio {ep_num}"),
+                ep_info.get("plot", ""),
+                ep_info.get("movie_image", ""),
+                video_url,
+                "mp4",
+                ep_info.get("duration_secs", 0),
+                ep_info.get("release_date", ""),
+            ))
+
+    # Hash do que gravamos: muda só se a série ou algum episódio mudou
+    content_hash = hashlib.sha1(
+        json.dumps([row, seasons, episodes], sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+    return {
+        "opera_id": series_id,
+        "row": row,
+        "seasons": seasons,
+        "episodes": episodes,
+        "last_modified": str(series.get("last_modified") or ""),
+        "content_hash": content_hash,
+    }
+
+
+def save_sync_state(c, items):
+    """Registra last_modified/hash das séries sincronizadas (sem commit)"""
+    c.executemany("""
+        INSERT INTO xtream_sync_state (opera_id, last_modified, content_hash, active, synced_at)
+        VALUES (?, ?, ?, 1, ?)
+        ON CONFLICT(opera_id) DO UPDATE SET
+            last_modified=excluded.last_modified,
+            content_hash=excluded.content_hash,
+            active=1,
+            synced_at=excluded.synced_at
+    """, [(item["opera_id"], item["last_modified"], item["content_hash"], time.time()) for item in items])
+
+
+def load_sync_state(conn):
     c = conn.cursor()
-    
+    c.execute("SELECT opera_id, last_modified, content_hash, active FROM xtream_sync_state")
+    return {row[0]: (row[1], row[2], row[3]) for row in c.fetchall()}
+
+
+def deactivate_removed(conn, state, listed_ids):
+    """Marca como inativas as séries sincronizadas que sumiram da API"""
+    removed = [oid for oid, (_, _, active) in state.items() if active and oid not in listed_ids]
+    tracked = sum(1 for _, _, active in state.values() if active)
+    if not removed:
+        return 0
+    if len(removed) > tracked * MAX_REMOVE_RATIO:
+        print(f"⚠️  {len(removed)} de {tracked} séries sumiram da API; lista incompleta? Nada desativado.")
+        return 0
+
+    c = conn.cursor()
+    for i in range(0, len(removed), 500):
+        chunk = removed[i:i + 500]
+        marks = ",".join("?" * len(chunk))
+        c.execute(f"UPDATE series SET status = 'inactive', updated_at = ? WHERE opera_id IN ({marks})",
+                  [datetime.utcnow(), *chunk])
+        c.execute(f"UPDATE xtream_sync_state SET active = 0 WHERE opera_id IN ({marks})", chunk)
+    conn.commit()
+    return len(removed)
+
+
+# Ordem dos campos nas tuplas geradas por parse_series
+SERIES_COLUMNS = ("opera_id", "title", "overview", "poster_path", "backdrop_path", "year", "genres", "rating")
+EPISODE_COLUMNS = ("episode_number", "title", "overview", "still_path", "video_url", "video_type", "duration", "air_date")
+
+
+def write_batch(conn, batch):
+    """Grava um lote de séries parseadas numa única transação (upserts em lote)"""
+    if not batch:
+        return 0
+
+    series_ids = save_series_bulk(
+        (dict(zip(SERIES_COLUMNS, item["row"]), status="active") for item in batch),
+        conn=conn,
+    )
+    season_ids = save_seasons_bulk(
+        (
+            {"series_id": series_ids[item["opera_id"]], "season_number": season_num, "episode_count": count}
+            for item in batch
+            for season_num, count in item["seasons"]
+        ),
+        conn=conn,
+    )
+
+    episodes = []
+    for item in batch:
+        db_series_id = series_ids[item["opera_id"]]
+        for season_num, *fields in item["episodes"]:
+            episode = dict(zip(EPISODE_COLUMNS, fields))
+            episode["series_id"] = db_series_id
+            episode["season_id"] = season_ids[(db_series_id, season_num)]
+            episodes.append(episode)
+    save_episodes_bulk(episodes, conn=conn)
+
+    save_sync_state(conn.cursor(), batch)
+    conn.commit()
+    return len(episodes)
+
+
+def extract_series_data(series_list, max_series=None, full=False):
+    """
+    Extrai dados completos das séries novas ou alteradas.
+
+    Os get_series_info rodam em paralelo (WORKERS threads, sessão HTTP
+    compartilhada) e só esta thread escreve no banco, em lotes de
+    WRITE_BATCH séries por transação. Uma série só é buscada se não está
+    em xtream_sync_state, se o last_modified mudou ou se estava inativa;
+    se o hash do conteúdo bater com o salvo, nada é regravado.
+    """
+    conn = get_conn()
+    state = load_sync_state(conn)
+
+    selected = series_list[:max_series] if max_series else series_list
+    pending = []
+    for series in selected:
+        known = state.get(str(series.get("series_id")))
+        if full or known is None or not known[2] or known[0] != str(series.get("last_modified") or ""):
+            pending.append(series)
+
+    print(f"⚙️  {len(pending)} séries novas/alteradas ({len(selected) - len(pending)} sem mudança), {WORKERS} workers")
+
     total_episodes = 0
     series_count = 0
-    
-    for series in series_list[:max_series] if max_series else series_list:
-        series_id = series.get("series_id")
-        title = series.get("name", "Sem Título")
-        
-        print(f"\n{'='*60}")
-        print(f"📺 [{series_count + 1}] {title}")
-        print(f"   ID: {series_id}")
-        
-        # Verificar se série já existe
-        c.execute("SELECT id FROM series WHERE opera_id = ?", (str(series_id),))
-        existing = c.fetchone()
-        if existing:
-            print(f"   ⚠️  Série já existe, pulando...")
-            continue
-        
-        # Buscar info detalhada
-        info = get_series_info(series_id)
-        if not info:
-            print(f"   ❌ Erro ao buscar info")
-            continue
-        
-        # Inserir série
-        poster = series.get("cover", "")
-        backdrop_path = series.get("backdrop_path", [])
-        if isinstance(backdrop_path, list) and len(backdrop_path) > 0:
-            backdrop = backdrop_path[0]
-        elif isinstance(backdrop_path, str):
-            backdrop = backdrop_path
-        else:
-            backdrop = ""
-        year = str(series.get("year", ""))
-        genres = ", ".join(series.get("genre", [])) if isinstance(series.get("genre"), list) else series.get("genre", "")
-        rating = series.get("rating", 0)
-        plot = series.get("plot", "")
-        
-        c.execute("""
-            INSERT INTO series (opera_id, title, overview, poster_path, backdrop_path, year, genres, rating, status)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (str(series_id), title, plot, poster, backdrop, year, genres, rating, "active"))
-        
-        db_series_id = c.lastrowid
-        
-        # Processar episódios
-        episodes = info.get("episodes", {})
-        if not episodes:
-            print(f"   ⚠️  Sem episódios")
-            conn.commit()
-            continue
-        
-        for season_num, eps in episodes.items():
-            season_int = int(season_num) if season_num.isdigit() else 0
-            
-            print(f"   📁 Temporada {season_int}: {len(eps)} episódios")
-            
-            # Inserir temporada
-            c.execute("""
-                INSERT INTO seasons (series_id, season_number, episode_count)
-                VALUES (?, ?, ?)
-            """, (db_series_id, season_int, len(eps)))
-            
-            db_season_id = c.lastrowid
-            
-            # Inserir episódios
-            for ep in eps:
-                ep_num = ep.get("episode_num", 0)
-                ep_title = ep.get("title", f"Episódio {ep_num}")
-                stream_id = ep.get("id")
-                container = ep.get("container_extension", "mp4")
-                
-                # URL do vídeo (formato Xtream Codes)
-                video_url = f"{SERIES_STREAM_BASE}/{stream_id}.{container}"
-                
-                # Info adicional
-                ep_info = ep.get("info", {})
-                still_path = ep_info.get("movie_image", "")
-                duration = ep_info.get("duration_secs", 0)
-                air_date = ep_info.get("release_date", "")
-                ep_plot = ep_info.get("plot", "")
-                
-                # Verificar se episódio já existe
-                c.execute("""
-                    SELECT id FROM episodes 
-                    WHERE series_id = ? AND season_id = ? AND episode_number = ?
-                """, (db_series_id, db_season_id, ep_num))
-                
-                if c.fetchone():
-                    # Atualizar episódio existente
-                    c.execute("""
-                        UPDATE episodes SET
-                            title = ?, overview = ?, still_path = ?, video_url = ?,
-                            video_type = ?, duration = ?, air_date = ?
-                        WHERE series_id = ? AND season_id = ? AND episode_number = ?
-                    """, (ep_title, ep_plot, still_path, video_url, "mp4", duration, air_date,
-                          db_series_id, db_season_id, ep_num))
-                else:
-                    # Inserir novo episódio
-                    c.execute("""
-                        INSERT INTO episodes 
-                        (season_id, series_id, episode_number, title, overview, still_path, 
-                         video_url, video_type, duration, air_date)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (db_season_id, db_series_id, ep_num, ep_title, ep_plot, still_path,
-                          video_url, "mp4", duration, air_date))
-                
-                total_episodes += 1
-        
+    unchanged_count = 0
+    errors = 0
+    batch = []
+    unchanged = []
+    started = time.time()
+
+    def fetch(series):
+        return series, get_series_info(series.get("series_id"))
+
+    def flush_unchanged():
+        # last_modified mudou mas o conteúdo não: só atualiza o estado
+        c = conn.cursor()
+        save_sync_state(c, unchanged)
         conn.commit()
-        series_count += 1
-        print(f"   ✅ Série salva (DB ID: {db_series_id})")
-        
-        # Delay para não sobrecarregar a API
-        time.sleep(0.5)
-    
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        # Janela limitada de requisições em voo para não segurar o catálogo inteiro na memória
+        window = WORKERS * 4
+        futures = [pool.submit(fetch, s) for s in pending[:window]]
+        next_index = len(futures)
+
+        while futures:
+            series, info = futures.pop(0).result()
+            if next_index < len(pending):
+                futures.append(pool.submit(fetch, pending[next_index]))
+                next_index += 1
+
+            if not info:
+                errors += 1
+                print(f"   ❌ Erro ao buscar info: {series.get('name')} (ID: {series.get('series_id')})")
+                continue
+
+            item = parse_series(series, info)
+            known = state.get(item["opera_id"])
+            if not full and known and known[2] and known[1] == item["content_hash"]:
+                unchanged.append(item)
+                unchanged_count += 1
+                if len(unchanged) >= WRITE_BATCH:
+                    flush_unchanged()
+                    unchanged = []
+                continue
+
+            batch.append(item)
+            if len(batch) >= WRITE_BATCH:
+                total_episodes += write_batch(conn, batch)
+                series_count += len(batch)
+                batch = []
+                elapsed = time.time() - started
+                print(f"   💾 {series_count}/{len(pending)} séries salvas ({series_count / elapsed:.1f}/s)")
+
+    total_episodes += write_batch(conn, batch)
+    series_count += len(batch)
+    if unchanged:
+        flush_unchanged()
+
+    removed = 0
+    if not max_series:
+        removed = deactivate_removed(conn, state, {str(s.get("series_id")) for s in series_list})
     conn.close()
-    
+
     print(f"\n{'='*60}")
     print(f"✅ SCRAPER COMPLETO!")
     print(f"   Séries: {series_count}")
     print(f"   Episódios: {total_episodes}")
-    
+    print(f"   Sem mudança: {unchanged_count}")
+    print(f"   Desativadas: {removed}")
+    print(f"   Erros: {errors}")
+    print(f"   Tempo: {time.time() - started:.0f}s")
+
     return series_count, total_episodes
 
 
@@ -259,7 +358,7 @@ def main():
     # Extrair todas as séries
     total_series = len(series_list)
     print(f"\n⚙️  Iniciando extração de {total_series} séries...")
-    extract_series_data(series_list, max_series=None)
+    extract_series_data(series_list, max_series=None, full="--full" in sys.argv)
 
 
 if __name__ == "__main__":
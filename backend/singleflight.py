@@ -0,0 +1,72 @@
+"""
+Request coalescing ("single-flight") for expensive lookups.
+
+When several threads ask for the same key at once, only the first one runs
+the work; the others wait for it and share its result (or its exception).
+"""
+
+import threading
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self, timeout=None):
+        self.timeout = timeout
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.shared = 0
+        self.timeouts = 0
+
+    def do(self, key, fn, timeout=None):
+        """
+        Run fn() for `key`, or wait for the call already in flight.
+
+        Followers wait at most `timeout` seconds (default: the instance's)
+        and raise TimeoutError if the leader has not finished by then.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            if not call.event.wait(self.timeout if timeout is None else timeout):
+                with self._lock:
+                    self.timeouts += 1
+                raise TimeoutError(f"single-flight wait timed out for {key!r}")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "leaders": self.leaders,
+                "shared": self.shared,
+                "timeouts": self.timeouts,
+            }
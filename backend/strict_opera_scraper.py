@@ -7,9 +7,12 @@ import logging
 import urllib.parse
 import time
 import re
-from difflib import SequenceMatcher
 from playwright.sync_api import sync_playwright
 
+import resource_blocking
+from opera_session import SEARCH_INPUT, SEARCH_URL, new_context, open_logged_in
+from title_match import similarity
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,6 +21,9 @@ class StrictOperaScraper:
     Scraper with strict validation to prevent title-link mismatches
     """
 
+    # Requests to skip (see resource_blocking.PROFILES)
+    block_profile = "scrape"
+
     def __init__(self):
         self.playwright = None
         self.browser = None
@@ -32,47 +38,19 @@ class StrictOperaScraper:
             logger.info("[Strict Opera] Starting session...")
             self.playwright = sync_playwright().start()
             self.browser = self.playwright.chromium.launch(headless=headless)
-            self.context = self.browser.new_context(
+            self.context = new_context(
+                self.browser,
                 user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
                 viewport={"width": 1920, "height": 1080},
             )
+            resource_blocking.install(self.context, self.block_profile)
             self.page = self.context.new_page()
             self.is_running = True
             self.session_start_time = time.time()
 
-            # Login
-            base_url = "http://web.operatopzera.net/#/"
-            logger.info(f"[Strict Opera] Navigating to {base_url}")
-            self.page.goto(base_url, timeout=60000)
-            self.page.wait_for_load_state("networkidle", timeout=60000)
-
-            # Check for login form
-            try:
-                login_selector = "input[name='username']"
-                if self.page.locator(login_selector).is_visible(timeout=5000):
-                    logger.info("[Strict Opera] Login page detected. Logging in...")
-                    USER = "t2TGgarYJ"
-                    PASS = "66e74xKRJ"
-
-                    self.page.fill("input[name='username']", USER)
-                    self.page.fill("input[name='password']", PASS)
-                    self.page.click("button:has-text('Login')")
-
-                    self.page.wait_for_url("**/#/", timeout=30000)
-                    time.sleep(2)
-                    logger.info("[Strict Opera] Login successful")
-                else:
-                    logger.info("[Strict Opera] Already logged in")
-            except Exception as e:
-                logger.warning(f"[Strict Opera] Login check warning: {e}")
-
-            # Navigate to search page
-            search_url = "http://web.operatopzera.net/#/movie/search/"
-            logger.info(f"[Strict Opera] Navigating to search page")
-            self.page.goto(search_url, timeout=30000)
-
-            INPUT_SELECTOR = "input[placeholder='Search stream...']"
-            self.page.wait_for_selector(INPUT_SELECTOR, state="visible", timeout=15000)
+            # Saved login state is reused; the form is only filled if it shows up
+            logger.info("[Strict Opera] Navigating to search page")
+            open_logged_in(self.page, SEARCH_URL, SEARCH_INPUT)
             logger.info("[Strict Opera] Session ready")
 
         except Exception as e:
@@ -106,13 +84,11 @@ class StrictOperaScraper:
         self.is_running = False
 
     def _calculate_similarity(self, str1, str2):
-        """Calcula similaridade entre duas strings (0-1)"""
-        # Limpar strings
+        """Calcula similaridade entre duas strings (0-1), sem atalho de contenção"""
+        # Normalização estrita de antes (sem remover acentos)
         s1 = re.sub(r"[^\w\s]", "", str1.lower().strip())
         s2 = re.sub(r"[^\w\s]", "", str2.lower().strip())
-
-        # Usar SequenceMatcher
-        return SequenceMatcher(None, s1, s2).ratio()
+        return similarity(s1, s2, containment_score=None, normalized=True)
 
     def _extract_video_id(self, url):
         """Extrai ID do vídeo do URL jt0x"""
@@ -163,11 +139,11 @@ class StrictOperaScraper:
             # Clear and type search
             self.page.fill(INPUT_SELECTOR, "")
             self.page.fill(INPUT_SELECTOR, expected_title)
-            time.sleep(0.5)
+            self.page.wait_for_timeout(500)
 
             logger.info(f"[Strict Opera] Searching for: {expected_title}")
             self.page.keyboard.press("Enter")
-            time.sleep(2)
+            self.page.wait_for_timeout(2000)
 
             # Wait for results
             try:
@@ -234,7 +210,7 @@ class StrictOperaScraper:
             # Click on the best match
             best_match.scroll_into_view_if_needed()
             best_match.click()
-            time.sleep(2)
+            self.page.wait_for_timeout(2000)
 
             # Validate we're on the correct page
             try:
@@ -309,7 +285,7 @@ class StrictOperaScraper:
                 if play_btn.is_visible(timeout=5000):
                     logger.info("[Strict Opera] Clicking play button...")
                     play_btn.click()
-                    time.sleep(3)
+                    self.page.wait_for_timeout(3000)
 
             # Extract video source
             self.page.wait_for_selector("video", timeout=20000)
@@ -322,7 +298,7 @@ class StrictOperaScraper:
                 if src and src.startswith("http") and "blob" not in src:
                     video_url = src
                     break
-                time.sleep(1)
+                self.page.wait_for_timeout(1000)
 
             # Fallback: try to find iframe
             if not video_url:
@@ -0,0 +1,29 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Modules that run init_db() at import (app) must never touch the real links.db
+os.environ.setdefault("DB_FILE_PATH", os.path.join(tempfile.mkdtemp(prefix="cinevibe-tests-"), "links.db"))
+
+import database  # noqa: E402
+import database_series  # noqa: E402
+import db_pool  # noqa: E402
+import response_cache  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Fresh, initialized database for one test."""
+    path = str(tmp_path / "links.db")
+    monkeypatch.setattr(database, "DB_PATH", path)
+    monkeypatch.setattr(database_series, "DB_PATH", path)
+    database.init_db()
+    response_cache.invalidate()
+    response_cache._cache.clear()
+    yield path
+    db_pool.close_conn(path)
@@ -0,0 +1,41 @@
+import database
+from database import canonical_key, get_conn, link_canonical_key, save_embed
+
+
+def test_canonical_key_normalizes():
+    assert canonical_key("Coração Valente (1995)") == "coracao valente 1995"
+    assert canonical_key("  CORACAO   valente 1995 ") == "coracao valente 1995"
+
+
+def test_canonical_key_empty_is_none():
+    assert canonical_key(None) is None
+    assert canonical_key("") is None
+    assert canonical_key("!!!") is None
+
+
+def test_link_key_prefers_original_raw_title():
+    assert link_canonical_key("Interestelar", "Interestelar (2014) [Dublado]") == "interestelar 2014 dublado"
+    assert link_canonical_key("Interestelar") == "interestelar"
+
+
+def test_save_embed_stores_key_matching_catalog_raw(db):
+    save_embed("Interestelar", "https://cdn.example/i.mp4", original_raw_title="Interestelar (2014)")
+    with get_conn() as conn:
+        conn.execute("INSERT INTO catalog_raw (raw_title, year) VALUES ('INTERESTELAR (2014)', '2014')")
+        conn.commit()
+        database.init_db()  # backfills catalog_raw.canonical_key
+
+        rows = conn.execute(
+            """SELECT l.title, c.year FROM links l
+               JOIN catalog_raw c ON c.canonical_key = l.canonical_key"""
+        ).fetchall()
+    assert [tuple(r) for r in rows] == [("Interestelar", "2014")]
+
+
+def test_init_db_backfills_links(db):
+    with get_conn() as conn:
+        conn.execute("INSERT INTO links (title, embed_url) VALUES ('Duna: Parte Dois', 'x')")
+        conn.commit()
+        database.init_db()
+        key = conn.execute("SELECT canonical_key FROM links WHERE title = 'Duna: Parte Dois'").fetchone()[0]
+    assert key == "duna parte dois"
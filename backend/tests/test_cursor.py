@@ -0,0 +1,52 @@
+import pytest
+
+from database import decode_cursor, encode_cursor, get_catalog_movies_page, get_conn, save_embed
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("2024-05-01 12:00:00", 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == ("2024-05-01 12:00:00", 42)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", encode_cursor(1, 2), encode_cursor("x", "y")])
+def test_decode_cursor_rejects_malformed(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_cursor_pages_match_offset_pages(db):
+    for i in range(7):
+        save_embed(f"Filme {i}", f"https://cdn.example/{i}.mp4")
+
+    by_offset = [m["title"] for m in get_catalog_movies_page(limit=100)[0]]
+
+    seen, cursor = [], None
+    while True:
+        movies, cursor = get_catalog_movies_page(limit=3, cursor=cursor)
+        seen += [m["title"] for m in movies]
+        if cursor is None:
+            break
+    assert seen == by_offset
+    assert len(seen) == 7
+
+
+def test_cursor_pages_through_null_timestamps(db):
+    for i in range(3):
+        save_embed(f"Novo {i}", f"https://cdn.example/n{i}.mp4")
+    with get_conn() as conn:
+        # Legacy rows written before added_at was set
+        conn.executemany(
+            "INSERT INTO links (title, embed_url, added_at) VALUES (?, ?, NULL)",
+            [(f"Antigo {i}", f"https://cdn.example/a{i}.mp4") for i in range(4)],
+        )
+        conn.commit()
+
+    seen, cursor = [], None
+    while True:
+        movies, cursor = get_catalog_movies_page(limit=2, cursor=cursor)
+        seen += [m["title"] for m in movies]
+        if cursor is None:
+            break
+    assert seen == [m["title"] for m in get_catalog_movies_page(limit=100)[0]]
+    assert seen[3:] == ["Antigo 3", "Antigo 2", "Antigo 1", "Antigo 0"]
@@ -0,0 +1,36 @@
+from database import get_conn, save_embed
+
+
+def _titles():
+    with get_conn() as conn:
+        return [r[0] for r in conn.execute("SELECT title FROM links ORDER BY id")]
+
+
+def test_nested_close_keeps_callers_transaction(db):
+    conn = get_conn()
+    conn.execute("INSERT INTO links (title, embed_url) VALUES ('Outer', 'x')")
+
+    helper = get_conn()
+    assert helper is conn
+    helper.close()
+
+    assert conn.in_transaction
+    conn.commit()
+    conn.close()
+    assert _titles() == ["Outer"]
+
+
+def test_last_close_rolls_back(db):
+    conn = get_conn()
+    conn.execute("INSERT INTO links (title, embed_url) VALUES ('Dropped', 'x')")
+    conn.close()
+    assert not conn.in_transaction
+    assert _titles() == []
+
+
+def test_with_block_inside_plain_handle(db):
+    conn = get_conn()
+    save_embed("Interestelar", "https://cdn.example/i.mp4")
+    conn.close()
+    assert _titles() == ["Interestelar"]
+    assert conn.holders == 0
@@ -0,0 +1,73 @@
+import time
+
+import pytest
+
+import enrichment
+import work_items
+from database import get_conn, save_embed
+
+
+@pytest.fixture
+def backoff(monkeypatch):
+    monkeypatch.setattr(enrichment, "ENRICH_BACKOFF_BASE", 60)
+    monkeypatch.setattr(enrichment, "ENRICH_BACKOFF_MAX", 600)
+
+
+def test_backoff_delay_doubles_up_to_max(backoff):
+    assert [enrichment.backoff_delay(n) for n in range(6)] == [60, 60, 120, 240, 480, 600]
+    assert enrichment.backoff_delay(50) == 600
+
+
+def test_save_embed_without_poster_is_queued(db):
+    save_embed("Interestelar", "https://cdn.example/i.mp4")
+    save_embed("Duna", "https://cdn.example/d.mp4", poster_path="/duna.jpg")
+    save_embed("Perdido", "NOT_FOUND")
+    assert [i["key"] for i in enrichment.claim_enrichment("w1", limit=5)] == ["Interestelar"]
+
+
+def _available_at(title):
+    with get_conn() as conn:
+        return conn.execute(
+            "SELECT available_at FROM work_items WHERE kind = ? AND key = ?",
+            (enrichment.ENRICH_KIND, title),
+        ).fetchone()[0]
+
+
+def test_failed_attempts_back_off(db, backoff):
+    enrichment.enqueue_enrichment("Interestelar")
+
+    for attempt, delay in ((1, 60), (2, 120), (3, 240)):
+        [item] = enrichment.claim_enrichment("w1")
+        assert item["attempts"] == attempt
+        started = time.time()
+        enrichment.finish_attempt(item, "w1", "no_match", score=0.4)
+        assert _available_at("Interestelar") == pytest.approx(started + delay, abs=5)
+        assert enrichment.claim_enrichment("w1") == []
+
+        # Jump to the retry time
+        with get_conn() as conn:
+            conn.execute("UPDATE work_items SET available_at = 0")
+            conn.commit()
+
+    outcomes = [(a["attempt"], a["outcome"]) for a in enrichment.get_attempts("Interestelar")]
+    assert outcomes == [(1, "no_match"), (2, "no_match"), (3, "no_match")]
+
+
+def test_success_completes_item(db):
+    enrichment.enqueue_enrichment("Interestelar")
+    [item] = enrichment.claim_enrichment("w1")
+    enrichment.finish_attempt(item, "w1", "matched", score=0.97, tmdb_id="157336")
+
+    assert work_items.counts(enrichment.ENRICH_KIND) == {"done": 1}
+    [attempt] = enrichment.get_attempts("Interestelar")
+    assert attempt["tmdb_id"] == "157336"
+
+
+def test_enqueue_keeps_pending_backoff(db, backoff):
+    enrichment.enqueue_enrichment("Interestelar")
+    [item] = enrichment.claim_enrichment("w1")
+    enrichment.finish_attempt(item, "w1", "no_match")
+
+    # A later save_embed of the same title must not reset the retry time
+    enrichment.enqueue_enrichment("Interestelar")
+    assert enrichment.claim_enrichment("w1") == []
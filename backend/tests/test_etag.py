@@ -0,0 +1,74 @@
+import pytest
+
+import response_cache
+from database import get_catalog_generation, get_conn, save_embed
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    import app
+
+    # Re-read the generation on every request instead of once a second
+    monkeypatch.setattr(response_cache, "GENERATION_CHECK_INTERVAL", 0)
+    return app.app.test_client()
+
+
+def test_matching_etag_gets_304(client):
+    first = client.get("/api/catalog?limit=10")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    again = client.get("/api/catalog?limit=10", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.data == b""
+    assert again.headers["ETag"] == etag
+
+
+def test_etag_differs_per_query(client):
+    a = client.get("/api/catalog?limit=10").headers["ETag"]
+    b = client.get("/api/catalog?limit=20").headers["ETag"]
+    assert a != b
+
+
+def test_save_embed_changes_etag(client):
+    etag = client.get("/api/catalog?limit=10").headers["ETag"]
+    save_embed("Interestelar", "https://cdn.example/interestelar.mp4")
+
+    response = client.get("/api/catalog?limit=10", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert [m["title"] for m in response.get_json()["results"]] == ["Interestelar"]
+
+
+def test_plain_sql_write_changes_etag(client):
+    save_embed("Interestelar", "https://cdn.example/interestelar.mp4")
+    etag = client.get("/api/catalog?limit=10").headers["ETag"]
+
+    # Maintenance scripts write links directly; the triggers still bump the generation
+    with get_conn() as conn:
+        conn.execute("UPDATE links SET embed_url = 'NOT_FOUND' WHERE title = 'Interestelar'")
+        conn.commit()
+
+    response = client.get("/api/catalog?limit=10", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+
+def test_compressed_etag_gets_304(client):
+    for i in range(30):
+        save_embed(f"Filme {i}", f"https://cdn.example/{i}.mp4", overview="x" * 100)
+    first = client.get("/api/catalog?limit=50", headers={"Accept-Encoding": "gzip"})
+    assert first.headers["Content-Encoding"] == "gzip"
+    etag = first.headers["ETag"]
+    assert etag.endswith('-gzip"')
+
+    again = client.get(
+        "/api/catalog?limit=50", headers={"Accept-Encoding": "gzip", "If-None-Match": etag}
+    )
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+
+
+def test_save_embed_bumps_generation_once(db):
+    before = get_catalog_generation()
+    save_embed("Interestelar", "https://cdn.example/interestelar.mp4")
+    assert get_catalog_generation() == before + 1
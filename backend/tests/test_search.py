@@ -0,0 +1,96 @@
+import pytest
+
+import database
+import response_cache
+from database import get_conn, save_embed, search_movies_locally, search_series_locally
+from database_series import init_series_tables, save_episodes_bulk, save_seasons_bulk, save_series_bulk
+
+
+@pytest.fixture
+def search_db(db):
+    init_series_tables()
+    with get_conn() as conn:
+        assert database._has_fts(conn, "links_fts")
+        assert database._has_fts(conn, "series_fts")
+    return db
+
+
+def _titles(results):
+    return [r["title"] for r in results]
+
+
+def _add_series(opera_id, title, overview=None):
+    ids = save_series_bulk([{"opera_id": opera_id, "title": title, "overview": overview}])
+    series_id = ids[opera_id]
+    seasons = save_seasons_bulk([{"series_id": series_id, "season_number": 1}])
+    save_episodes_bulk([{
+        "series_id": series_id,
+        "season_id": seasons[(series_id, 1)],
+        "episode_number": 1,
+        "video_url": "https://cdn.example/e1.mp4",
+    }])
+    return series_id
+
+
+def test_insert_is_searchable_with_prefix_and_accents(search_db):
+    save_embed("Ação Mortal", "https://cdn.example/1.mp4")
+    save_embed("Interestelar", "https://cdn.example/2.mp4", overview="Viagem além das estrelas")
+
+    assert _titles(search_movies_locally("acao mor")) == ["Ação Mortal"]
+    assert _titles(search_movies_locally("inter")) == ["Interestelar"]
+    # Overview is indexed too
+    assert _titles(search_movies_locally("estrelas")) == ["Interestelar"]
+
+
+def test_title_prefix_ranks_first(search_db):
+    save_embed("O Rei Leão", "https://cdn.example/1.mp4")
+    save_embed("Rei Arthur", "https://cdn.example/2.mp4")
+    assert _titles(search_movies_locally("rei")) == ["Rei Arthur", "O Rei Leão"]
+
+
+def test_update_and_delete_keep_index_in_sync(search_db):
+    save_embed("Duna", "https://cdn.example/1.mp4")
+    with get_conn() as conn:
+        conn.execute("UPDATE links SET title = 'Matrix' WHERE title = 'Duna'")
+        conn.commit()
+    assert search_movies_locally("duna") == []
+    assert _titles(search_movies_locally("matrix")) == ["Matrix"]
+
+    with get_conn() as conn:
+        conn.execute("DELETE FROM links WHERE title = 'Matrix'")
+        conn.commit()
+    assert search_movies_locally("matrix") == []
+
+
+def test_series_index_follows_writes(search_db):
+    series_id = _add_series("10", "Dark", overview="Viagens no tempo")
+    assert _titles(search_series_locally("dark")) == ["Dark"]
+    assert _titles(search_series_locally("tempo")) == ["Dark"]
+
+    save_series_bulk([{"opera_id": "10", "title": "1899"}])
+    assert search_series_locally("dark") == []
+    assert _titles(search_series_locally("1899")) == ["1899"]
+
+    with get_conn() as conn:
+        conn.execute("DELETE FROM episodes WHERE series_id = ?", (series_id,))
+        conn.execute("DELETE FROM series WHERE id = ?", (series_id,))
+        conn.commit()
+    assert search_series_locally("1899") == []
+
+
+def test_search_endpoint_sees_writes(search_db, monkeypatch):
+    import app
+
+    monkeypatch.setattr(response_cache, "GENERATION_CHECK_INTERVAL", 0)
+    client = app.app.test_client()
+
+    save_embed("Dark Knight", "https://cdn.example/1.mp4")
+    _add_series("10", "Dark")
+    results = client.get("/api/search/all?q=dark").get_json()["results"]
+    assert sorted(_titles(results)) == ["Dark", "Dark Knight"]
+
+    with get_conn() as conn:
+        conn.execute("UPDATE links SET title = 'Batman' WHERE title = 'Dark Knight'")
+        conn.commit()
+    results = client.get("/api/search/all?q=dark").get_json()["results"]
+    assert _titles(results) == ["Dark"]
@@ -0,0 +1,33 @@
+import pytest
+
+from database import get_conn
+from database_series import init_series_tables, save_series_bulk
+
+
+@pytest.fixture
+def series_db(db):
+    init_series_tables()
+    return db
+
+
+def _series():
+    with get_conn() as conn:
+        rows = conn.execute("SELECT opera_id, title, tmdb_id, year FROM series ORDER BY opera_id")
+        return [tuple(r) for r in rows]
+
+
+def test_mixed_shapes_keep_every_field(series_db):
+    save_series_bulk([{"opera_id": "1", "title": "Dark", "tmdb_id": "70523"}])
+    ids = save_series_bulk([
+        {"opera_id": "1", "title": "Dark (2017)"},
+        {"opera_id": "2", "title": "1899", "year": "2022"},
+    ])
+    assert set(ids) == {"1", "2"}
+    # tmdb_id omitted in the second batch is preserved, year of the later record is written
+    assert _series() == [("1", "Dark (2017)", "70523", None), ("2", "1899", None, 2022)]
+
+
+def test_unknown_field_in_any_record_is_rejected(series_db):
+    with pytest.raises(ValueError, match="bogus"):
+        save_series_bulk([{"opera_id": "1", "title": "Dark"}, {"opera_id": "2", "bogus": 1}])
+    assert _series() == []
@@ -0,0 +1,45 @@
+import pytest
+
+from title_match import TitleIndex, best_candidate, normalize_title, similarity
+
+
+def test_normalize_title_folds_accents_and_punctuation():
+    assert normalize_title("  Ação:  O Filme! ") == "acao o filme"
+    assert normalize_title(None) == ""
+
+
+def test_similarity_identical_after_normalization():
+    assert similarity("Interestelar", "INTERESTELAR!") == 1.0
+    assert similarity("Coração Valente", "Coracao Valente") == 1.0
+
+
+def test_similarity_containment_score():
+    assert similarity("Duna", "Duna Parte Dois") == 0.95
+    assert similarity("Duna", "Duna Parte Dois", containment_score=0.8) == 0.8
+    assert similarity("Duna", "Duna Parte Dois", containment_score=None) < 0.8
+
+
+def test_similarity_unrelated_titles_score_low():
+    assert similarity("Interestelar", "O Poderoso Chefão") < 0.5
+
+
+def test_similarity_normalized_inputs_used_as_is():
+    assert similarity("Ação", "acao", containment_score=None, normalized=True) < 1.0
+
+
+def test_best_candidate_picks_highest_score():
+    results = [
+        {"title": "Interstellar", "original_title": "Interstellar"},
+        {"title": "Interestelar", "original_title": "Interstellar"},
+    ]
+    best, score = best_candidate(
+        "Interestelar (2014)", results, key=lambda r: (r["title"], r["original_title"])
+    )
+    assert best is results[1]
+    assert score == pytest.approx(0.95)
+
+
+def test_title_index_best_match():
+    index = TitleIndex(["Interestelar", "O Poderoso Chefão", "Duna"])
+    assert index.best_match("o poderoso chefao") == ("O Poderoso Chefão", 1.0)
+    assert index.best_match("Matrix") == (None, 0.0)
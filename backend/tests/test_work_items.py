@@ -0,0 +1,65 @@
+import work_items
+
+
+def test_claim_best_priority_first(db):
+    work_items.enqueue("repair", [("a", 1), ("b", 5), ("c", 3)])
+    keys = [work_items.claim("repair", "w1")["key"] for _ in range(3)]
+    assert keys == ["b", "c", "a"]
+    assert work_items.claim("repair", "w1") is None
+
+
+def test_leased_item_is_not_claimed_twice(db):
+    work_items.enqueue("repair", [("a", 0)])
+    item = work_items.claim("repair", "w1")
+    assert item["attempts"] == 1
+    assert work_items.claim("repair", "w2") is None
+    assert work_items.counts("repair") == {"running": 1}
+
+
+def test_expired_lease_is_reclaimed(db):
+    work_items.enqueue("repair", [("a", 0)])
+    first = work_items.claim("repair", "w1", lease_seconds=-1)
+
+    second = work_items.claim("repair", "w2")
+    assert second["id"] == first["id"]
+    assert second["attempts"] == 2
+    assert not work_items.renew(first, "w1")
+
+    # The worker that lost the lease can't finish the item anymore
+    work_items.complete(first, "w1")
+    assert work_items.counts("repair") == {"running": 1}
+    work_items.complete(second, "w2")
+    assert work_items.counts("repair") == {"done": 1}
+
+
+def test_retry_waits_for_delay(db):
+    work_items.enqueue("repair", [("a", 0)])
+    item = work_items.claim("repair", "w1")
+    work_items.retry(item, "w1", delay=3600, error="boom")
+    assert work_items.claim("repair", "w1") is None
+
+    with work_items.get_conn() as conn:
+        conn.execute("UPDATE work_items SET available_at = 0")
+        conn.commit()
+    item = work_items.claim("repair", "w1")
+    assert item["attempts"] == 2
+
+
+def test_enqueue_requeues_done_and_keeps_running(db):
+    work_items.enqueue("repair", [("done", 0), ("running", 0)])
+    done = work_items.claim("repair", "w1")
+    work_items.complete(done, "w1")
+    running = work_items.claim("repair", "w1")
+
+    touched = work_items.enqueue("repair", [(done["key"], 2), (running["key"], 2)])
+    assert touched == 1
+    item = work_items.claim("repair", "w2")
+    assert item["key"] == done["key"]
+    assert item["attempts"] == 1
+
+
+def test_enqueue_respects_requeue_done_after(db):
+    work_items.enqueue("repair", [("a", 0)])
+    work_items.complete(work_items.claim("repair", "w1"), "w1")
+    assert work_items.enqueue("repair", [("a", 0)], requeue_done_after=3600) == 0
+    assert work_items.counts("repair") == {"done": 1}
@@ -0,0 +1,176 @@
+"""
+Shared fuzzy title matching.
+
+normalize_title() is the accent-folded, lowercase, punctuation-free form
+stored in links.title_norm at write time. similarity() is the pairwise
+score the scrapers and daemons used to compute on their own (difflib
+ratio, with a fixed score when one title contains the other).
+
+For one-against-many matching, TitleIndex keeps a character trigram index
+of normalized titles. A query first gets a Dice score against every
+indexed title in one vectorized pass (NumPy bincount over the trigram
+postings), and only the few best candidates are rescored with
+similarity():
+
+    index = TitleIndex.from_links()
+    title, score = index.best_match("Interestelar (2014)", threshold=0.85)
+
+NumPy is in requirements.txt; environments without it (one-off scripts)
+fall back to a pure-Python dict count for the Dice pass.
+"""
+
+import re
+import unicodedata
+from collections import Counter
+from difflib import SequenceMatcher
+
+try:
+    import numpy as np
+except ImportError:  # pure-Python fallback below
+    np = None
+
+NGRAM = 3
+# Candidates rescored with SequenceMatcher after the trigram pass
+RESCORE_TOP = 20
+
+
+def normalize_title(title) -> str:
+    """Accent-folded, lowercase title without punctuation or extra spaces."""
+    if not title:
+        return ""
+    normalized = unicodedata.normalize("NFKD", str(title))
+    normalized = "".join(c for c in normalized if not unicodedata.combining(c))
+    normalized = re.sub(r"[^\w\s]", "", normalized.lower())
+    return re.sub(r"\s+", " ", normalized).strip()
+
+
+def similarity(str1, str2, containment_score=0.95, normalized=False) -> float:
+    """
+    Similarity between two titles (0-1).
+
+    When one normalized title contains the other the score is
+    `containment_score` (None disables that shortcut).
+    """
+    s1 = str1 if normalized else normalize_title(str1)
+    s2 = str2 if normalized else normalize_title(str2)
+    if s1 == s2:
+        return 1.0
+    if containment_score is not None and s1 and s2 and (s1 in s2 or s2 in s1):
+        return containment_score
+    return SequenceMatcher(None, s1, s2).ratio()
+
+
+def ngrams(norm: str, n=NGRAM) -> set:
+    padded = f" {norm} "
+    if len(padded) < n:
+        return {padded}
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+class TitleIndex:
+    def __init__(self, titles, keys=None, n=NGRAM):
+        """
+        Index `titles` (any objects, returned by the lookups) under their
+        normalized `keys` (computed from the titles when not given).
+        """
+        self.titles = list(titles)
+        self.keys = list(keys) if keys is not None else [normalize_title(t) for t in self.titles]
+        self.n = n
+
+        postings = {}
+        sizes = []
+        for i, key in enumerate(self.keys):
+            grams = ngrams(key, n)
+            sizes.append(len(grams))
+            for g in grams:
+                postings.setdefault(g, []).append(i)
+
+        if np is not None:
+            self._postings = {g: np.asarray(ids, dtype=np.int32) for g, ids in postings.items()}
+            self._sizes = np.asarray(sizes, dtype=np.float32)
+        else:
+            self._postings = postings
+            self._sizes = sizes
+
+    def __len__(self):
+        return len(self.titles)
+
+    @classmethod
+    def from_links(cls, where="embed_url IS NOT NULL AND embed_url != 'NOT_FOUND'"):
+        """Index of links titles, using the stored title_norm column."""
+        from database import get_conn
+
+        with get_conn() as conn:
+            c = conn.cursor()
+            c.execute(f"SELECT title, title_norm FROM links WHERE {where}")
+            rows = c.fetchall()
+        return cls([r[0] for r in rows], [r[1] or normalize_title(r[0]) for r in rows])
+
+    def dice_scores(self, query_norm: str):
+        """Trigram Dice coefficient of the query against every indexed title."""
+        grams = [g for g in ngrams(query_norm, self.n) if g in self._postings]
+        q_size = len(ngrams(query_norm, self.n))
+
+        if np is not None:
+            if not grams or not len(self.titles):
+                return np.zeros(len(self.titles), dtype=np.float32)
+            hits = np.concatenate([self._postings[g] for g in grams])
+            shared = np.bincount(hits, minlength=len(self.titles)).astype(np.float32)
+            return 2.0 * shared / (self._sizes + q_size)
+
+        shared = Counter()
+        for g in grams:
+            shared.update(self._postings[g])
+        scores = [0.0] * len(self.titles)
+        for i, count in shared.items():
+            scores[i] = 2.0 * count / (self._sizes[i] + q_size)
+        return scores
+
+    def candidates(self, query, limit=RESCORE_TOP, min_dice=0.2, normalized=False):
+        """Indexes of the `limit` best trigram matches, best first, as (i, dice)."""
+        query_norm = query if normalized else normalize_title(query)
+        scores = self.dice_scores(query_norm)
+        if np is not None:
+            if not len(scores):
+                return []
+            top = np.argpartition(-scores, min(limit, len(scores) - 1))[:limit]
+            top = top[np.argsort(-scores[top])]
+            return [(int(i), float(scores[i])) for i in top if scores[i] >= min_dice]
+        ranked = sorted(range(len(scores)), key=lambda i: -scores[i])[:limit]
+        return [(i, scores[i]) for i in ranked if scores[i] >= min_dice]
+
+    def matches(self, query, threshold=0.85, limit=RESCORE_TOP, containment_score=0.95):
+        """(title, score) pairs scoring >= threshold with similarity(), best first."""
+        query_norm = normalize_title(query)
+        scored = []
+        for i, _ in self.candidates(query_norm, limit=limit, normalized=True):
+            score = similarity(query_norm, self.keys[i], containment_score, normalized=True)
+            if score >= threshold:
+                scored.append((self.titles[i], score))
+        scored.sort(key=lambda pair: -pair[1])
+        return scored
+
+    def best_match(self, query, threshold=0.85, **kwargs):
+        """Best (title, score) at or above threshold, or (None, 0.0)."""
+        found = self.matches(query, threshold, **kwargs)
+        return found[0] if found else (None, 0.0)
+
+
+def best_candidate(title, candidates, key=lambda c: c, containment_score=0.95):
+    """
+    Highest-scoring item of a small candidate list (e.g. one TMDB results
+    page) as (candidate, score); `key` returns the strings to compare.
+    """
+    norm = normalize_title(title)
+    best, best_score = None, 0.0
+    for candidate in candidates:
+        values = key(candidate)
+        if isinstance(values, str):
+            values = (values,)
+        score = max(
+            (similarity(norm, normalize_title(v), containment_score, normalized=True) for v in values if v),
+            default=0.0,
+        )
+        if score > best_score:
+            best, best_score = candidate, score
+    return best, best_score
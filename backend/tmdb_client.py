@@ -0,0 +1,293 @@
+"""
+Shared TMDB client for the scripts and daemons.
+
+One keep-alive requests.Session (with retries on 429/5xx), a token-bucket
+rate limiter shared by every thread, and an on-disk SQLite response cache
+with TTL, so daemons that ask about the same titles every cycle only hit
+the network when an answer has expired:
+
+    from tmdb_client import search_movies, search_many
+
+    results = search_movies("Interestelar", year="2014")
+    firsts = search_many([("Matrix", "1999"), ("Duna", None)])
+
+Search keys are the normalized query + year + language; empty answers are
+cached too, for a shorter time (TMDB_EMPTY_TTL).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from db_pool import get_conn
+
+TMDB_API_KEY = os.environ.get("TMDB_API_KEY", "909fc389a150847bdd4ffcd92809cff7")
+BASE_URL = "https://api.themoviedb.org/3"
+DEFAULT_LANGUAGE = "pt-BR"
+
+# TMDB allows roughly 50 req/s per IP; stay well below it across all threads
+RATE_PER_SECOND = float(os.environ.get("TMDB_RATE_PER_SECOND", 20))
+BURST = int(os.environ.get("TMDB_BURST", 20))
+MAX_WORKERS = int(os.environ.get("TMDB_WORKERS", 8))
+REQUEST_TIMEOUT = (5, 10)
+
+CACHE_PATH = os.environ.get(
+    "TMDB_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "tmdb_cache.db"),
+)
+CACHE_TTL = int(os.environ.get("TMDB_CACHE_TTL", 7 * 24 * 3600))
+EMPTY_TTL = int(os.environ.get("TMDB_EMPTY_TTL", 24 * 3600))
+# Trending/popular lists change daily
+LIST_TTL = int(os.environ.get("TMDB_LIST_TTL", 6 * 3600))
+
+
+class TokenBucket:
+    """Blocking token bucket: `rate` tokens/s, up to `capacity` banked."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def normalize_query(query: str) -> str:
+    """Cache-key form of a search query: accents, case and spacing removed."""
+    query = unicodedata.normalize("NFKD", query or "")
+    query = "".join(ch for ch in query if not unicodedata.combining(ch))
+    return re.sub(r"\s+", " ", query).strip().casefold()
+
+
+class TMDBClient:
+    def __init__(self, api_key=TMDB_API_KEY, language=DEFAULT_LANGUAGE, rate=RATE_PER_SECOND,
+                 burst=BURST, cache_path=CACHE_PATH, cache_ttl=CACHE_TTL, empty_ttl=EMPTY_TTL):
+        self.api_key = api_key
+        self.language = language
+        self.cache_path = cache_path
+        self.cache_ttl = cache_ttl
+        self.empty_ttl = empty_ttl
+        self.bucket = TokenBucket(rate, burst)
+
+        self.session = requests.Session()
+        retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                      respect_retry_after_header=True)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_WORKERS * 2, max_retries=retry)
+        self.session.mount("https://", adapter)
+
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._init_cache()
+
+    # ---------- cache ----------
+
+    def _init_cache(self):
+        with get_conn(self.cache_path) as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS tmdb_cache (
+                    key TEXT PRIMARY KEY,
+                    body TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )"""
+            )
+            conn.commit()
+
+    def _cache_get(self, key):
+        with get_conn(self.cache_path) as conn:
+            row = conn.execute(
+                "SELECT body FROM tmdb_cache WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _cache_set(self, key, body, ttl):
+        with get_conn(self.cache_path) as conn:
+            conn.execute(
+                """INSERT INTO tmdb_cache (key, body, expires_at) VALUES (?, ?, ?)
+                   ON CONFLICT(key) DO UPDATE SET body = excluded.body, expires_at = excluded.expires_at""",
+                (key, json.dumps(body), time.time() + ttl),
+            )
+            conn.commit()
+
+    def purge_expired(self):
+        with get_conn(self.cache_path) as conn:
+            deleted = conn.execute("DELETE FROM tmdb_cache WHERE expires_at <= ?", (time.time(),)).rowcount
+            conn.commit()
+        return deleted
+
+    # ---------- HTTP ----------
+
+    def get(self, path, params=None, cache_key=None, is_empty=None, ttl=None):
+        """
+        GET BASE_URL + path and return the decoded JSON (None on error).
+
+        Answers are cached under `cache_key` (default: path + sorted params);
+        `is_empty(body)` decides whether the shorter empty-answer TTL applies;
+        `ttl` overrides the TTL for non-empty answers.
+        """
+        params = dict(params or {})
+        params.setdefault("language", self.language)
+        if cache_key is None:
+            cache_key = path + "?" + "&".join(f"{k}={params[k]}" for k in sorted(params))
+        key = hashlib.sha1(cache_key.encode()).hexdigest()
+
+        cached = self._cache_get(key)
+        if cached is not None:
+            with self._stats_lock:
+                self.hits += 1
+            return cached
+
+        with self._stats_lock:
+            self.misses += 1
+        self.bucket.acquire()
+        try:
+            res = self.session.get(f"{BASE_URL}{path}", params={**params, "api_key": self.api_key},
+                                   timeout=REQUEST_TIMEOUT)
+            if res.status_code == 404:
+                body = {}
+            else:
+                res.raise_for_status()
+                body = res.json()
+        except Exception as e:
+            with self._stats_lock:
+                self.errors += 1
+            logging.error(f"TMDB API Error ({path}): {e}")
+            return None
+
+        empty = is_empty(body) if is_empty else not body
+        self._cache_set(key, body, self.empty_ttl if empty else (ttl or self.cache_ttl))
+        return body
+
+    # ---------- endpoints ----------
+
+    def search_movies(self, query, year=None, language=None, fallback_without_year=True):
+        """
+        /search/movie results for `query`, trying with `year` first and
+        (by default) again without it when nothing matches.
+        """
+        language = language or self.language
+        norm = normalize_query(query)
+        if not norm:
+            return []
+
+        def search(y):
+            params = {"query": query, "language": language, "page": 1}
+            if y:
+                params["year"] = y
+            body = self.get(
+                "/search/movie",
+                params,
+                cache_key=f"search/movie|{norm}|{y or ''}|{language}",
+                is_empty=lambda b: not b.get("results"),
+            )
+            return (body or {}).get("results", [])
+
+        results = search(year)
+        if not results and year and fallback_without_year:
+            results = search(None)
+        return results
+
+    def search_movie(self, query, year=None, language=None):
+        """First search result or None."""
+        results = self.search_movies(query, year, language)
+        return results[0] if results else None
+
+    def movie_details(self, tmdb_id, language=None):
+        body = self.get(f"/movie/{tmdb_id}", {"language": language or self.language})
+        return body or None
+
+    def list_movies(self, endpoint, page=1, language=None):
+        """Results of a list endpoint such as /movie/popular or /trending/all/week."""
+        body = self.get(endpoint, {"language": language or self.language, "page": page}, ttl=LIST_TTL)
+        return (body or {}).get("results", [])
+
+    def search_many(self, queries, max_workers=MAX_WORKERS, first_only=True):
+        """
+        Run many (query, year) searches concurrently, in input order.
+
+        Returns the first result (or None) per query, or the full result
+        lists with first_only=False. The rate limit still applies.
+        """
+        queries = list(queries)
+        # Same normalized question asked twice in one batch -> one lookup
+        keys = [(normalize_query(q), str(y or "")) for q, y in queries]
+        unique = {}
+        for key, item in zip(keys, queries):
+            unique.setdefault(key, item)
+
+        def one(item):
+            query, year = item
+            return self.search_movies(query, year)
+
+        items = list(unique.values())
+        if len(items) <= 1:
+            answers = [one(item) for item in items]
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+                answers = list(pool.map(one, items))
+        by_key = dict(zip(unique, answers))
+
+        results = [by_key[key] for key in keys]
+        if first_only:
+            return [r[0] if r else None for r in results]
+        return results
+
+    def stats(self):
+        with self._stats_lock:
+            return {"hits": self.hits, "misses": self.misses, "errors": self.errors}
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Process-wide client (shared session, rate limit and cache)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = TMDBClient()
+        return _client
+
+
+def search_movies(query, year=None, language=None):
+    return get_client().search_movies(query, year, language)
+
+
+def search_movie(query, year=None, language=None):
+    return get_client().search_movie(query, year, language)
+
+
+def movie_details(tmdb_id, language=None):
+    return get_client().movie_details(tmdb_id, language)
+
+
+def list_movies(endpoint, page=1, language=None):
+    return get_client().list_movies(endpoint, page, language)
+
+
+def search_many(queries, max_workers=MAX_WORKERS, first_only=True):
+    return get_client().search_many(queries, max_workers, first_only)
@@ -10,32 +10,20 @@ import os
 sys.path.insert(0, os.path.dirname(__file__))
 
 from database import get_conn
-import requests
-import time
-
-TMDB_API_KEY = "909fc389a150847bdd4ffcd92809cff7"
+from tmdb_client import movie_details
 
 
 def get_movie_details(tmdb_id):
-    """Busca detalhes do filme no TMDB"""
-    try:
-        url = f"https://api.themoviedb.org/3/movie/{tmdb_id}"
-        params = {"api_key": TMDB_API_KEY, "language": "pt-BR"}
-
-        response = requests.get(url, params=params, timeout=10)
-
-        if response.status_code == 200:
-            data = response.json()
-            return {
-                "poster_path": data.get("poster_path"),
-                "backdrop_path": data.get("backdrop_path"),
-                "overview": data.get("overview"),
-                "vote_average": data.get("vote_average"),
-                "title": data.get("title"),
-            }
-    except Exception as e:
-        print(f"   ⚠️  Erro TMDB: {e}")
-
+    """Busca detalhes do filme no TMDB (cache + rate limit em tmdb_client)"""
+    data = movie_details(tmdb_id)
+    if data:
+        return {
+            "poster_path": data.get("poster_path"),
+            "backdrop_path": data.get("backdrop_path"),
+            "overview": data.get("overview"),
+            "vote_average": data.get("vote_average"),
+            "title": data.get("title"),
+        }
     return None
 
 
@@ -124,11 +112,6 @@ def update_posters():
             print(f"   ❌ Erro: {e}")
             fail_count += 1
 
-        # Pausa para não sobrecarregar API
-        if i % 10 == 0:
-            print(f"\n   😴 Pausa de 1s...")
-            time.sleep(1)
-
     # Resumo
     print("\n" + "=" * 80)
     print("📊 RESUMO")
@@ -1,9 +1,46 @@
-import requests
+import os
+import time
+
+from database import get_link_health, record_link_health
+from link_checker import check_url
+from singleflight import SingleFlight
+
+# How long a recorded check stays trustworthy before hitting the network again
+VALID_FRESH_SECONDS = int(os.environ.get("EMBED_VALID_TTL", 6 * 3600))
+INVALID_FRESH_SECONDS = int(os.environ.get("EMBED_INVALID_TTL", 10 * 60))
+
+# Concurrent checks of the same URL share one request
+checks = SingleFlight(timeout=10)
+
+
+def check_embed(url: str):
+    """Check the URL (HEAD, ranged GET fallback) and return (ok, status_code, error)."""
+    return check_url(url)
 
 
 def validate_embed(url: str) -> bool:
+    return check_embed(url)[0]
+
+
+def validate_embed_cached(url: str) -> bool:
+    """
+    validate_embed backed by the link_health table.
+
+    A good result is reused for VALID_FRESH_SECONDS and a bad one for
+    INVALID_FRESH_SECONDS, so repeat plays skip the network round trip.
+    """
+    health = get_link_health(url)
+    if health:
+        window = VALID_FRESH_SECONDS if health["ok"] else INVALID_FRESH_SECONDS
+        if time.time() - health["checked_at"] < window:
+            return bool(health["ok"])
+
+    def check_and_record():
+        ok, status_code, error = check_embed(url)
+        record_link_health(url, ok, status_code, error)
+        return ok
+
     try:
-        r = requests.head(url, timeout=8, allow_redirects=True)
-        return r.status_code == 200
-    except Exception:
-        return False
+        return checks.do(url, check_and_record)
+    except TimeoutError:
+        return check_embed(url)[0]
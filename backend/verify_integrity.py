@@ -10,7 +10,8 @@ import os
 
 sys.path.insert(0, os.path.dirname(__file__))
 
-from database import get_conn
+from database import extract_source_video_id, get_conn
+from link_checker import check_url, check_urls
 from playwright_scraper import get_scraper
 import re
 
@@ -41,9 +42,10 @@ def extract_video_id_from_url(url):
     return None
 
 
-def verify_link_integrity(link_data, scraper):
+def verify_link_integrity(link_data, scraper, health=None):
     """
     Verifica se o link ainda é válido e se corresponde ao título correto
+    `health` é o resultado (ok, status_code, error) já obtido por check_urls
     Returns: (is_valid, details)
     """
     link_id, title, tmdb_id, embed_url, raw_title, added_at = link_data
@@ -52,15 +54,12 @@ def verify_link_integrity(link_data, scraper):
     if not video_id:
         return False, f"❌ URL inválida: {embed_url}"
 
-    # Verificar se o link ainda responde (HEAD request)
-    import requests
-
-    try:
-        response = requests.head(embed_url, timeout=10, allow_redirects=True)
-        if response.status_code not in [200, 301, 302]:
-            return False, f"❌ Link offline (HTTP {response.status_code})"
-    except Exception as e:
-        return False, f"❌ Erro de conexão: {str(e)[:50]}"
+    # Verificar se o link ainda responde (HEAD, ou GET parcial se o host recusar HEAD)
+    ok, status_code, error = health or check_url(embed_url)
+    if error:
+        return False, f"❌ Erro de conexão: {error[:50]}"
+    if not ok:
+        return False, f"❌ Link offline (HTTP {status_code})"
 
     # Se tiveros o raw_title, podemos fazer uma verificação cruzada
     # Mas o melhor é verificar se o TMDB ID ainda existe e bate com o título
@@ -89,6 +88,9 @@ def full_revalidation_sample(sample_size=10):
     print("🔗 INICIANDO VERIFICAÇÃO...")
     print("-" * 80)
 
+    # Todos os links da amostra verificados em paralelo (e salvos em link_health)
+    health = check_urls([link_data[3] for link_data in sample])
+
     valid_count = 0
     invalid_count = 0
 
@@ -100,7 +102,7 @@ def full_revalidation_sample(sample_size=10):
         print(f"   Link: {embed_url}")
 
         # Verificação básica
-        is_valid, message = verify_link_integrity(link_data, None)
+        is_valid, message = verify_link_integrity(link_data, None, health.get(embed_url))
         print(f"   Status: {message}")
 
         if is_valid:
@@ -176,8 +178,8 @@ def deep_revalidation(title_to_check):
                 conn = get_conn()
                 c = conn.cursor()
                 c.execute(
-                    "UPDATE links SET embed_url = ? WHERE title = ?",
-                    (new_url, title_to_check),
+                    "UPDATE links SET embed_url = ?, source_video_id = ? WHERE title = ?",
+                    (new_url, extract_source_video_id(new_url), title_to_check),
                 )
                 conn.commit()
                 conn.close()
@@ -0,0 +1,75 @@
+"""
+Catch the player's video URL from network traffic instead of polling the DOM.
+
+The Opera player requests its .mp4/.m3u8 as soon as it initializes, often
+before <video>.src is set (and with HLS the src is only a blob: URL). A
+VideoCapture listens to a page's requests and resolves on the first media
+URL, so a title costs as long as the player takes rather than fixed sleeps:
+
+    capture = VideoCapture(page)   # once per page
+    capture.reset()                # before clicking Play / opening the title
+    ...
+    url = capture.wait()           # media URL, or None after the deadline
+"""
+
+import os
+import re
+import time
+
+# Longest to wait for the player to request its media
+VIDEO_CAPTURE_DEADLINE = float(os.environ.get("VIDEO_CAPTURE_DEADLINE", 30))
+POLL_MS = 100
+
+VIDEO_URL_RE = re.compile(r"\.(mp4|m3u8)(\?|$)", re.IGNORECASE)
+
+# <video>.src fallback for players that set it without a request we can match;
+# also nudges a paused player, since some only fetch media once playing
+_DOM_SRC_JS = """() => {
+    const v = document.querySelector('video');
+    if (v && v.paused) v.play().catch(() => {});
+    const src = v && (v.currentSrc || v.src);
+    return src && src.startsWith('http') ? src : null;
+}"""
+
+
+def is_video_url(url: str) -> bool:
+    return url.startswith("http") and bool(VIDEO_URL_RE.search(url.split("#")[0]))
+
+
+class VideoCapture:
+    def __init__(self, page):
+        self.page = page
+        self.url = None
+        page.on("request", self._on_request)
+
+    def _on_request(self, request):
+        if self.url is None and is_video_url(request.url):
+            self.url = request.url
+
+    def reset(self):
+        self.url = None
+
+    def detach(self):
+        try:
+            self.page.remove_listener("request", self._on_request)
+        except Exception:
+            pass
+
+    def wait(self, deadline: float = None) -> str | None:
+        """
+        Block until the page requests a video URL (or <video> gets an http
+        src), for at most `deadline` seconds. Returns None on timeout.
+        """
+        end = time.monotonic() + (VIDEO_CAPTURE_DEADLINE if deadline is None else deadline)
+        while self.url is None:
+            try:
+                src = self.page.evaluate(_DOM_SRC_JS)
+            except Exception:
+                src = None  # page navigating between polls
+            if src:
+                return src
+            if time.monotonic() >= end:
+                return None
+            # Also lets Playwright dispatch pending request events
+            self.page.wait_for_timeout(POLL_MS)
+        return self.url
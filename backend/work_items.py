@@ -0,0 +1,196 @@
+"""
+Lease-based work queue shared by background workers.
+
+Work is a row in work_items keyed by (kind, key). A worker claims the
+highest-priority available item atomically (UPDATE ... RETURNING) and owns
+it until its lease expires; a heartbeat thread keeps extending the lease
+while the item is being processed. An item whose worker died is simply
+claimed again by someone else once the lease runs out, so any number of
+workers can pull from the same kind without sharding:
+
+    item = claim("repair", owner)
+    with heartbeat(item, owner):
+        ...
+    complete(item, owner)
+
+Items stay in the table after completion ('done'); enqueue() of a done key
+queues it again, so producers can re-add everything they still see as
+pending on every refresh.
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+
+from database import get_conn
+
+DEFAULT_LEASE_SECONDS = int(os.environ.get("WORK_LEASE_SECONDS", 120))
+
+
+def init_work_items_table():
+    with get_conn() as conn:
+        c = conn.cursor()
+        c.execute(
+            """CREATE TABLE IF NOT EXISTS work_items (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                priority INTEGER NOT NULL DEFAULT 0,
+                status TEXT NOT NULL DEFAULT 'queued',
+                owner TEXT,
+                lease_expires REAL,
+                available_at REAL NOT NULL DEFAULT 0,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                UNIQUE (kind, key)
+            )"""
+        )
+        c.execute(
+            """CREATE INDEX IF NOT EXISTS idx_work_items_claim
+               ON work_items(kind, status, priority DESC, available_at)"""
+        )
+        conn.commit()
+
+
+def worker_name(label=None) -> str:
+    """Owner id written on claimed items (host:pid[:label])."""
+    name = f"{socket.gethostname()}:{os.getpid()}"
+    return f"{name}:{label}" if label is not None else name
+
+
+def enqueue(kind, items, requeue_done_after=0):
+    """
+    Queue (key, priority) pairs. New keys are inserted; queued ones get the
+    new priority; keys finished at least `requeue_done_after` seconds ago are
+    queued again. Items currently leased are left alone. Returns rows touched.
+    """
+    now = time.time()
+    rows = [(kind, str(key), int(priority), now, now) for key, priority in items]
+    if not rows:
+        return 0
+    with get_conn() as conn:
+        c = conn.cursor()
+        c.executemany(
+            """INSERT INTO work_items (kind, key, priority, status, created_at, updated_at)
+               VALUES (?, ?, ?, 'queued', ?, ?)
+               ON CONFLICT(kind, key) DO UPDATE SET
+                   priority = excluded.priority,
+                   attempts = CASE WHEN status = 'done' THEN 0 ELSE attempts END,
+                   status = 'queued',
+                   updated_at = excluded.updated_at
+               WHERE status = 'queued'
+                  OR (status = 'done' AND updated_at <= excluded.updated_at - ?)""",
+            [row + (requeue_done_after,) for row in rows],
+        )
+        touched = c.rowcount
+        conn.commit()
+    return touched
+
+
+def claim(kind, owner, lease_seconds=DEFAULT_LEASE_SECONDS):
+    """
+    Atomically lease the best available item of `kind` (queued and due, or
+    running with an expired lease). Returns a dict or None.
+    """
+    now = time.time()
+    with get_conn() as conn:
+        c = conn.cursor()
+        c.execute(
+            """UPDATE work_items
+               SET status = 'running', owner = ?, lease_expires = ?,
+                   attempts = attempts + 1, updated_at = ?
+               WHERE id = (
+                   SELECT id FROM work_items
+                   WHERE kind = ?
+                     AND ((status = 'queued' AND available_at <= ?)
+                          OR (status = 'running' AND lease_expires < ?))
+                   ORDER BY priority DESC, available_at, id
+                   LIMIT 1
+               )
+               RETURNING id, kind, key, priority, attempts""",
+            (owner, now + lease_seconds, now, kind, now, now),
+        )
+        row = c.fetchone()
+        conn.commit()
+    return dict(row) if row else None
+
+
+def renew(item, owner, lease_seconds=DEFAULT_LEASE_SECONDS) -> bool:
+    """Extend the lease; False if the item is no longer ours (lease lost)."""
+    now = time.time()
+    with get_conn() as conn:
+        c = conn.cursor()
+        c.execute(
+            """UPDATE work_items SET lease_expires = ?, updated_at = ?
+               WHERE id = ? AND owner = ? AND status = 'running'""",
+            (now + lease_seconds, now, item["id"], owner),
+        )
+        ok = c.rowcount > 0
+        conn.commit()
+    return ok
+
+
+def complete(item, owner):
+    """Mark the item done (no-op if the lease was lost to another worker)."""
+    _finish(item, owner, "done", available_at=0, error=None)
+
+
+def retry(item, owner, delay=0, error=None):
+    """Give the item back to the queue, due again after `delay` seconds."""
+    _finish(item, owner, "queued", available_at=time.time() + delay, error=error)
+
+
+def _finish(item, owner, status, available_at, error):
+    with get_conn() as conn:
+        conn.execute(
+            """UPDATE work_items
+               SET status = ?, owner = NULL, lease_expires = NULL,
+                   available_at = ?, last_error = ?, updated_at = ?
+               WHERE id = ? AND owner = ?""",
+            (status, available_at, error, time.time(), item["id"], owner),
+        )
+        conn.commit()
+
+
+class heartbeat:
+    """Context manager renewing an item's lease in the background."""
+
+    def __init__(self, item, owner, lease_seconds=DEFAULT_LEASE_SECONDS):
+        self.item = item
+        self.owner = owner
+        self.lease_seconds = lease_seconds
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.lease_seconds / 3):
+            try:
+                if not renew(self.item, self.owner, self.lease_seconds):
+                    logging.warning(f"Lease lost on work item {self.item['id']} ({self.item['key']})")
+                    return
+            except Exception as e:
+                logging.error(f"Heartbeat error on work item {self.item['id']}: {e}")
+
+    def __enter__(self):
+        self._thread = threading.Thread(
+            target=self._run, name=f"lease-{self.item['id']}", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+
+def counts(kind):
+    """{status: count} for one kind."""
+    with get_conn() as conn:
+        c = conn.cursor()
+        c.execute("SELECT status, COUNT(*) FROM work_items WHERE kind = ? GROUP BY status", (kind,))
+        return {status: n for status, n in c.fetchall()}
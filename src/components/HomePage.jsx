@@ -1,5 +1,5 @@
 import React, { useEffect, useState, useRef } from 'react';
-import { API_BASE_URL } from '../config';
+import { API_BASE_URL, requestEmbed } from '../config';
 import { motion, AnimatePresence } from 'framer-motion';
 import { useNavigate } from 'react-router-dom';
 import { 
@@ -392,20 +392,12 @@ const WatchModal = ({ movie, onClose }) => {
     setError(null);
     
     try {
-        const response = await fetch(`${API_BASE_URL}/get-embed`, {
-          method: 'POST',
-          headers: {
-            'Content-Type': 'application/json',
-          },
-          body: JSON.stringify({
-            title: movie.title || movie.name,
-            tmdbId: movie.id
-          }),
+        const { ok, data } = await requestEmbed({
+          title: movie.title || movie.name,
+          tmdbId: movie.id
         });
 
-        const data = await response.json();
-
-        if (response.ok && data.embedUrl) {
+        if (ok && data.embedUrl) {
            setFoundLink(data.embedUrl);
            setEmbedUrl(data.embedUrl);
            setLoading(false);
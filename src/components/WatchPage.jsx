@@ -1,4 +1,4 @@
-import { API_BASE_URL } from '../config';
+import { API_BASE_URL, requestEmbed } from '../config';
 import React, { useEffect, useState } from 'react';
 import { useParams, useNavigate, useLocation } from 'react-router-dom';
 import { ArrowLeft, AlertCircle, Play, Info, Star, Calendar, Clock } from 'lucide-react';
@@ -97,14 +97,8 @@ const WatchPage = () => {
             const title = currentMovie.title || currentMovie.name;
             const year = (currentMovie.release_date || currentMovie.first_air_date)?.split('-')[0];
 
-            const response = await fetch(`${API_BASE_URL}/get-embed`, {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ title, tmdbId: id, year }),
-            });
-
-            const data = await response.json();
-            if (response.ok && data.embedUrl && data.embedUrl !== "NOT_FOUND") {
+            const { ok, data } = await requestEmbed({ title, tmdbId: id, year });
+            if (ok && data.embedUrl && data.embedUrl !== "NOT_FOUND") {
                 setEmbedUrl(data.embedUrl);
                 await saveVideoLink(id, data.embedUrl);
             } else {
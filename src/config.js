@@ -12,3 +12,31 @@ export const isLocalBackend = () => {
 export const getHealthUrl = () => {
   return API_BASE_URL.replace('/api', '') + '/api/health';
 };
+
+// Ask the backend for a movie's embed. A cache miss answers 202 with a scrape
+// job id; poll /jobs/<id> until it finishes. Resolves to { ok, data }.
+export const requestEmbed = async (payload, { pollMs = 2000, timeoutMs = 120000 } = {}) => {
+  const response = await fetch(`${API_BASE_URL}/get-embed`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(payload),
+  });
+  const data = await response.json();
+  if (response.status !== 202) {
+    return { ok: response.ok, data };
+  }
+
+  const deadline = Date.now() + timeoutMs;
+  while (Date.now() < deadline) {
+    await new Promise((resolve) => setTimeout(resolve, pollMs));
+    const jobResponse = await fetch(`${API_BASE_URL}/jobs/${data.jobId}`);
+    const job = await jobResponse.json();
+    if (job.status === 'done') {
+      return { ok: true, data: { embedUrl: job.embedUrl, cached: false } };
+    }
+    if (job.status === 'failed') {
+      return { ok: false, data: { error: job.error } };
+    }
+  }
+  return { ok: false, data: { error: 'Tempo esgotado buscando o link.' } };
+};
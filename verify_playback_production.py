@@ -1,7 +1,22 @@
 import requests
 import time
+from urllib.parse import urljoin
 
 API_URL = "https://frontend-videos-api-production.up.railway.app/api/get-embed"
+# A cache miss answers 202 + Location: /api/jobs/<id>; poll it this long
+JOB_POLL_SECONDS = 2
+JOB_TIMEOUT_SECONDS = 180
+
+
+def wait_for_job(job_url):
+    """Poll a scrape job until it is done/failed; returns the job or None on timeout."""
+    deadline = time.time() + JOB_TIMEOUT_SECONDS
+    while time.time() < deadline:
+        time.sleep(JOB_POLL_SECONDS)
+        job = requests.get(job_url, timeout=30).json()
+        if job.get("status") in ("done", "failed"):
+            return job
+    return None
 
 # List of Barbie movies to pre-warm
 MOVIES = [
@@ -34,7 +49,18 @@ for movie in MOVIES:
         response = requests.post(API_URL, json=payload, timeout=60)
         elapsed = time.time() - start
         
-        if response.status_code == 200:
+        if response.status_code == 202:
+            job_url = urljoin(API_URL, response.headers["Location"])
+            print(f"⏳ ACCEPTED: scrape job queued, polling {job_url}")
+            job = wait_for_job(job_url)
+            elapsed = time.time() - start
+            if job is None:
+                print(f"⌛ TIMEOUT ({elapsed:.1f}s): job still running")
+            elif job["status"] == "done" and job.get("embedUrl"):
+                print(f"✅ SUCCESS ({elapsed:.1f}s): {job['embedUrl']} [NEWLY INDEXED]")
+            else:
+                print(f"❌ FAILED ({elapsed:.1f}s): {job.get('error')}")
+        elif response.status_code == 200:
             data = response.json()
             if data.get("embedUrl"):
                 cached_msg = " [CACHED]" if data.get("cached") else " [NEWLY INDEXED]"